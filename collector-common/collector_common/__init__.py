@@ -0,0 +1,7 @@
+"""
+Building blocks shared by the collectors: the pooled HTTP client, response
+caching and conditional GETs, keyset pagination, the ingest pipeline, bulk
+upserts, index declarations, the worker lease and the health and
+metrics endpoints. Each collector keeps its own settings in its
+app/config.py and passes them in.
+"""
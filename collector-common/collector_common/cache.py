@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+from functools import wraps
+from flask import Response, make_response, request
+from pymongo import ReturnDocument
+import logging
+import os
+import pickle
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one SharedGeneration document per collector
+GENERATION_COLLECTION = "cache-generations"
+
+load_dotenv('keys.env')
+
+def normalized_query():
+    """The request's query parameters, stripped, without empty values and sorted"""
+    params = sorted(
+        (name, value.strip())
+        for name, value in request.args.items(multi=True)
+        if value.strip()
+    )
+    return "&".join(f"{name}={value}" for name, value in params)
+
+class LocalBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+class RedisBackend:
+    """Redis-compatible backend, shared by every process pointing at the same server"""
+
+    def __init__(self, url, namespace):
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key):
+        value = self.client.get(f"{self.namespace}:{key}")
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.setex(f"{self.namespace}:{key}", ttl, pickle.dumps(value))
+
+class SharedGeneration:
+    """
+    A generation counter stored in MongoDB. The ingest worker bumps it after
+    new documents land, and every web process reads it (at most once every
+    `refresh_seconds`), so one bump invalidates the cached responses and
+    ETags of all of them.
+    """
+
+    def __init__(self, collection, name, refresh_seconds=1):
+        self.collection = collection
+        self.name = name
+        self.refresh_seconds = refresh_seconds
+        self.value = None
+        self.checked = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        if self.value is None or time.monotonic() - self.checked > self.refresh_seconds:
+            document = self.collection.find_one({"_id": self.name})
+            with self.lock:
+                self.value = document["generation"] if document else 0
+                self.checked = time.monotonic()
+        return self.value
+
+    def bump(self):
+        document = self.collection.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        with self.lock:
+            self.value = document["generation"]
+            self.checked = time.monotonic()
+
+class ResponseCache:
+    """
+    Caches successful view responses keyed on the path, the normalized query
+    parameters and a SharedGeneration. The worker's store jobs call bump()
+    after new documents land, so cached reads stay valid until the next
+    ingest; entries of older generations are never hit again and age out.
+    """
+
+    def __init__(self, backend, ttl, generation):
+        self.backend = backend
+        self.ttl = ttl
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, namespace, generation):
+        ttl = int(os.getenv("CACHE_TTL_SECONDS", 300))
+        redis_url = os.getenv("CACHE_REDIS_URL")
+        if redis_url and redis is not None:
+            logger.info(f"🧠 Response cache backed by Redis at {redis_url}")
+            return cls(RedisBackend(redis_url, namespace), ttl, generation)
+        if redis_url:
+            logger.warning("⚠️  CACHE_REDIS_URL is set but redis is not installed, using the in-process cache")
+        return cls(LocalBackend(int(os.getenv("CACHE_MAXSIZE", 1024))), ttl, generation)
+
+    def key(self):
+        return f"{self.generation.current()}:{request.path}?{normalized_query()}"
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                key = self.key()
+                entry = self.backend.get(key)
+            except Exception as e:
+                logger.error(f"❌ Response cache unavailable, serving uncached: {str(e)}")
+                return view(*args, **kwargs)
+
+            if entry is not None:
+                self._count(hit=True)
+                body, status, mimetype = entry
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            self._count(hit=False)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                try:
+                    self.backend.set(key, (response.get_data(), response.status_code, response.mimetype), self.ttl)
+                except Exception as e:
+                    logger.error(f"❌ Failed to cache response: {str(e)}")
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+
+    def bump(self):
+        self.generation.bump()
+        logger.info("🧹 Response cache invalidated")
+
+    def _count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "generation": self.generation.current()
+            }
@@ -0,0 +1,107 @@
+from .cache import normalized_query
+from flask import make_response, request
+from functools import wraps
+import gzip
+import hashlib
+import logging
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MIN_COMPRESS_BYTES = 500
+
+class FeedVersion:
+    """
+    Remembers the newest document's (sort key, _id) so ETags can be computed
+    without querying MongoDB on every request. The marker is prefixed with
+    the response cache's SharedGeneration and re-read as soon as another
+    process bumps it, so ETags change together with the cached bodies;
+    otherwise it is refreshed at most every `refresh_seconds`.
+    """
+
+    def __init__(self, collection, sort_field, generation, refresh_seconds=30):
+        self.collection = collection
+        self.sort_field = sort_field
+        self.generation = generation
+        self.refresh_seconds = refresh_seconds
+        self.marker = None
+        self.marker_generation = None
+        self.checked = 0
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        generation = self.generation.current()
+        newest = self.collection.find_one({}, {self.sort_field: 1}, sort=[(self.sort_field, -1), ("_id", -1)])
+        with self.lock:
+            self.marker = f"{newest.get(self.sort_field)}:{newest['_id']}" if newest else "empty"
+            self.marker_generation = generation
+            self.checked = time.monotonic()
+
+    def current(self):
+        if (self.marker is None or time.monotonic() - self.checked > self.refresh_seconds
+                or self.generation.current() != self.marker_generation):
+            self.refresh()
+        return f"{self.marker_generation}:{self.marker}"
+
+def negotiate_encoding():
+    """Best content coding the client accepts: br, gzip or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+def compress_response(response, encoding):
+    """Brotli or gzip encode a successful response body"""
+    if encoding is None or response.status_code != 200 or response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+
+    response.set_data(brotli.compress(body) if encoding == "br" else gzip.compress(body))
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+def conditional_get(feed_version, max_age=30):
+    """
+    Gives a JSON feed view a strong ETag built from the newest document and
+    the normalized query parameters. A matching If-None-Match is answered
+    with 304 before the view (and its MongoDB query) runs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            encoding = negotiate_encoding()
+            try:
+                marker = feed_version.current()
+            except Exception as e:
+                logger.error(f"❌ Could not determine feed version, skipping ETag: {str(e)}")
+                return compress_response(make_response(view(*args, **kwargs)), encoding)
+
+            # Each content coding is a distinct representation, so it is part of the strong ETag
+            fingerprint = f"{marker}|{encoding}|{request.path}?{normalized_query()}"
+            etag = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = compress_response(make_response(view(*args, **kwargs)), encoding)
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = f"public, max-age={max_age}"
+            response.vary.add("Accept-Encoding")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from datetime import datetime, timezone
+import logging
+import random
+import requests
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class LatencyHistogram:
+    """Cumulative request latency counts per bucket, Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, seconds):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.total += seconds
+        self.observations += 1
+
+    def snapshot(self):
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {"buckets": cumulative, "count": self.observations, "sum_seconds": round(self.total, 3)}
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client shared by a collector's fetchers. Every
+    request gets connect/read timeouts and a per-host concurrency limit.
+    Throttled or failed requests are retried with jittered exponential
+    backoff that honours Retry-After. Per-host latency histograms are kept.
+    With conditional=True, GETs revalidate with the ETag/Last-Modified of
+    the previous response and return the 304 as-is.
+    """
+
+    def __init__(self, user_agent, pool_size=10, per_host_limit=4, connect_timeout=3.05, read_timeout=10,
+                 max_attempts=4, backoff_base=1, backoff_cap=60):
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.timeout = (connect_timeout, read_timeout)
+        self.per_host_limit = per_host_limit
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self.validators = {}
+        self.histograms = defaultdict(LatencyHistogram)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, conditional=False, timeout=None, stream=False):
+        """
+        GET with retries; returns the final response, raising only if no
+        response was ever received. With stream=True the body is left unread
+        for the caller to consume from response.raw.
+        """
+        request = requests.Request("GET", url, params=params, headers=headers or {})
+        prepared = self.session.prepare_request(request)
+        host = urlsplit(prepared.url).netloc
+
+        if conditional:
+            with self.lock:
+                etag, last_modified = self.validators.get(prepared.url, (None, None))
+            if etag:
+                prepared.headers["If-None-Match"] = etag
+            if last_modified:
+                prepared.headers["If-Modified-Since"] = last_modified
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = self._send(prepared, host, timeout or self.timeout, stream)
+            except requests.RequestException as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"🔁 {host} request failed ({e.__class__.__name__}), retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRYABLE_STATUSES or attempt == self.max_attempts:
+                break
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            elif delay > self.backoff_cap:
+                logger.warning(f"⏳ {host} asked to wait {delay:.0f}s, more than we are willing to block")
+                break
+            logger.warning(f"🔁 {host} answered {response.status_code}, retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s")
+            # Hand the connection back to the pool before waiting
+            response.close()
+            time.sleep(delay)
+
+        if conditional and response.status_code == 200:
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            if any(validators):
+                with self.lock:
+                    self.validators[prepared.url] = validators
+        return response
+
+    def _send(self, prepared, host, timeout, stream=False):
+        with self.lock:
+            slot = self.host_slots[host]
+        with slot:
+            started = time.perf_counter()
+            try:
+                response = self.session.send(prepared, timeout=timeout, stream=stream)
+            except requests.RequestException:
+                self._record(host, "error", time.perf_counter() - started)
+                raise
+        self._record(host, response.status_code, time.perf_counter() - started)
+        return response
+
+    def _record(self, host, status, seconds):
+        with self.lock:
+            self.histograms[host].observe(seconds)
+            self.statuses[host][str(status)] += 1
+
+    def _backoff(self, attempt):
+        """Full jitter: uniform between 0 and the capped exponential delay"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds requested by a Retry-After header (delta or HTTP date), or None"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self):
+        with self.lock:
+            return {
+                host: {"latency": histogram.snapshot(), "statuses": dict(self.statuses[host])}
+                for host, histogram in self.histograms.items()
+            }
@@ -0,0 +1,71 @@
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY_ERROR = 11000
+
+def bulk_upsert(collection, documents, key_fields, update_fields=()):
+    """
+    Writes documents in a single unordered bulk_write, inserting only those
+    whose key_fields are not already present. update_fields are overwritten
+    on documents that already exist as well.
+
+    Returns a (inserted, duplicates) tuple. An upsert that loses a race to a
+    concurrent writer on the unique index fails with a duplicate-key error;
+    those are retried once, so they match the winner's document and still
+    apply their update_fields, and are counted as duplicates.
+    """
+    if not documents:
+        return 0, 0
+
+    operations = []
+    for document in documents:
+        update = {"$setOnInsert": {field: value for field, value in document.items() if field not in update_fields}}
+        if update_fields:
+            update["$set"] = {field: document[field] for field in update_fields if field in document}
+        operations.append(UpdateOne({field: document[field] for field in key_fields}, update, upsert=True))
+
+    inserted, raced = _write_upserts(collection, operations)
+    if raced:
+        retried, _ = _write_upserts(collection, raced)
+        inserted += retried
+
+    return inserted, len(operations) - inserted
+
+def _write_upserts(collection, operations):
+    """Runs unordered upserts; returns (inserted, the operations that hit a duplicate key)"""
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        return result.upserted_count, []
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+            raise
+        return e.details.get("nUpserted", 0), [operations[err["index"]] for err in errors]
+
+def merge_duplicates(collection, key_fields, match=None):
+    """
+    One-off cleanup before a unique index over key_fields can be built: for
+    each key stored more than once, keeps the oldest document, fills its
+    empty fields from the newer copies and deletes them. `match` limits the
+    cleanup to the documents a partial index covers. Returns the number
+    removed.
+    """
+    removed = 0
+    groups = collection.aggregate([
+        {"$match": match or {}},
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": {field: f"${field}" for field in key_fields}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    for group in groups:
+        keep_id, duplicate_ids = group["ids"][0], group["ids"][1:]
+        kept = collection.find_one({"_id": keep_id})
+        missing = {}
+        for duplicate in collection.find({"_id": {"$in": duplicate_ids}}):
+            for field, value in duplicate.items():
+                if field != "_id" and value and not kept.get(field) and field not in missing:
+                    missing[field] = value
+        if missing:
+            collection.update_one({"_id": keep_id}, {"$set": missing})
+        removed += collection.delete_many({"_id": {"$in": duplicate_ids}}).deleted_count
+    return removed
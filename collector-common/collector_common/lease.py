@@ -0,0 +1,183 @@
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one lease document per exclusive worker role
+LEASE_COLLECTION = "worker-leases"
+
+class MongoLease:
+    """
+    An expiring, exclusive lock stored as one MongoDB document. The holder
+    renews it well before ttl_seconds run out; if the holder dies, the lease
+    expires and a standby takes it over. Expiry is compared against the
+    server clock ($$NOW), so worker clocks do not need to agree.
+    """
+
+    def __init__(self, collection, name, ttl_seconds=60):
+        self.collection = collection
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.document = None
+
+    def acquire(self, status=None):
+        """
+        Takes the lease if it is free or expired, or extends it if already
+        held, storing `status` alongside. Returns True while we hold it.
+        """
+        update = {
+            "owner": self.owner,
+            "renewedAt": "$$NOW",
+            "expiresAt": {"$add": ["$$NOW", self.ttl_seconds * 1000]}
+        }
+        if status is not None:
+            # Stored as JSON: metric keys are hosts and URLs, which contain dots
+            update["status"] = {"$literal": json.dumps(status, default=str)}
+        try:
+            document = self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"$expr": {"$lt": ["$expiresAt", "$$NOW"]}}]},
+                [{"$set": update}],
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another owner holds a live lease, so the upsert collided with its document
+            return False
+        self.document = document
+        return document is not None and document["owner"] == self.owner
+
+    def run_requests(self):
+        """When each job was last requested through request_run, as of the last acquire()"""
+        return dict((self.document or {}).get("runRequests") or {})
+
+    def release(self):
+        self.collection.delete_one({"_id": self.name, "owner": self.owner})
+
+def lease_status(collection, name):
+    """The current holder of a lease and the status it last reported, or None"""
+    document = collection.find_one({"_id": name})
+    if document is None:
+        return None
+    return {
+        "owner": document.get("owner"),
+        "renewed_at": document.get("renewedAt"),
+        "expires_at": document.get("expiresAt"),
+        "status": json.loads(document["status"]) if document.get("status") else None
+    }
+
+def request_run(collection, name, job):
+    """
+    Asks the worker holding the lease `name` to run `job` now. The holder
+    sees the request at its next renewal. Returns False if no worker holds
+    a live lease.
+    """
+    result = collection.update_one(
+        {"_id": name, "$expr": {"$gt": ["$expiresAt", "$$NOW"]}},
+        {"$currentDate": {f"runRequests.{job}": True}}
+    )
+    return result.matched_count == 1
+
+def keep_renewed(lease, work):
+    """
+    Runs work() while a background thread renews the lease every third of
+    its ttl, so one-off work longer than the ttl (migrations, index builds)
+    does not let a standby take the lease over halfway through. Returns
+    False if the lease was lost while work() ran.
+    """
+    done = threading.Event()
+    lost = threading.Event()
+
+    def renew():
+        renewed = time.monotonic()
+        while not done.wait(lease.ttl_seconds / 3):
+            try:
+                if not lease.acquire():
+                    lost.set()
+                    return
+                renewed = time.monotonic()
+            except PyMongoError as e:
+                logger.error(f"❌ Could not renew the {lease.name} lease: {str(e)}")
+                if time.monotonic() - renewed >= lease.ttl_seconds:
+                    lost.set()
+                    return
+
+    renewer = threading.Thread(target=renew, name=f"{lease.name}-renewer", daemon=True)
+    renewer.start()
+    try:
+        work()
+    finally:
+        done.set()
+        renewer.join()
+    return not lost.is_set()
+
+def run_exclusively(lease, start, stop, status=lambda: None, stop_event=None, on_request=lambda job: None):
+    """
+    Stands by until the lease is acquired, calls start() while renewing the
+    lease in the background, then renews it every third of its ttl until
+    stop_event is set or the lease is lost. Jobs requested through
+    request_run since the previous renewal are passed to on_request(). A
+    lease that cannot be renewed for a full ttl (e.g. MongoDB is
+    unreachable) counts as lost, since a standby may have taken it over.
+    Calls stop() and releases the lease on the way out, also when start()
+    raises. Returns True if the lease was lost.
+    """
+    stop_event = stop_event or threading.Event()
+    interval = lease.ttl_seconds / 3
+
+    while not stop_event.is_set():
+        try:
+            if lease.acquire():
+                break
+            logger.info(f"💤 The {lease.name} lease is held by another worker, standing by")
+        except PyMongoError as e:
+            logger.error(f"❌ Could not reach MongoDB for the {lease.name} lease: {str(e)}")
+        stop_event.wait(interval)
+    else:
+        return False
+
+    logger.info(f"🔐 Acquired the {lease.name} lease as {lease.owner}")
+    lost = False
+    # Requests made before we took over were meant for the previous holder
+    requests = lease.run_requests()
+    try:
+        lost = not keep_renewed(lease, start)
+        renewed = time.monotonic()
+        while not lost and not stop_event.wait(interval):
+            try:
+                if not lease.acquire(status()):
+                    lost = True
+                    break
+                renewed = time.monotonic()
+                current = lease.run_requests()
+                for job, requested_at in current.items():
+                    if requests.get(job) != requested_at:
+                        logger.info(f"▶️  Running {job} on request")
+                        on_request(job)
+                requests = current
+            except PyMongoError as e:
+                logger.error(f"❌ Could not renew the {lease.name} lease: {str(e)}")
+                if time.monotonic() - renewed >= lease.ttl_seconds:
+                    lost = True
+                    break
+        if lost:
+            logger.error(f"🔓 Lost the {lease.name} lease, stopping")
+    finally:
+        try:
+            stop()
+        except Exception as e:
+            logger.error(f"❌ Could not stop cleanly: {str(e)}")
+        if not lost:
+            try:
+                lease.release()
+                logger.info(f"🔓 Released the {lease.name} lease")
+            except PyMongoError as e:
+                logger.error(f"❌ Could not release the {lease.name} lease: {str(e)}")
+    return lost
@@ -0,0 +1,17 @@
+import logging
+
+def configure_logging(log_file=None):
+    """
+    Logs to stderr and, given log_file, to that file as well. Called from
+    entry points (create_app, worker main) rather than at import time, so
+    importing a collector's modules never creates log files.
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    logging.basicConfig(
+        level=logging.INFO,
+        format="🕒 %(asctime)s - 📍 %(name)s - [%(levelname)s]  %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        handlers=handlers
+    )
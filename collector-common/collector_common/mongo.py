@@ -0,0 +1,33 @@
+from pymongo import MongoClient
+import os
+
+def client_options(appname):
+    """
+    Settings of the one MongoClient each collector process shares. The pool
+    covers the web server threads plus the ingest jobs; the short selection
+    and connect timeouts make a MongoDB outage fail requests fast instead of
+    hanging them, and primaryPreferred keeps the feeds readable from a
+    secondary during a failover (writes always go to the primary). Read when
+    the client is built, so settings loaded from keys.env apply.
+    """
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 20)),
+        "minPoolSize": 0,
+        "maxIdleTimeMS": 60000,
+        "connectTimeoutMS": 5000,
+        "serverSelectionTimeoutMS": 5000,
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 60000)),
+        "waitQueueTimeoutMS": 10000,
+        "retryWrites": True,
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred"),
+        "appname": appname,
+    }
+
+def mongo_client(uri, appname):
+    """
+    The process-wide client. connect=False defers every socket and monitor
+    thread to the first operation, so creating it at import time (or forking
+    a gunicorn worker afterwards) opens no connections; each worker connects
+    on its own first query.
+    """
+    return MongoClient(uri, connect=False, **client_options(appname))
@@ -0,0 +1,40 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from bson import json_util
+from pymongo import DESCENDING
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+
+def encode_cursor(document, sort_field):
+    """Opaque cursor holding the (sort key, _id) of the last document on a page"""
+    payload = json_util.dumps([document[sort_field], document["_id"]])
+    return urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    try:
+        sort_value, last_id = json_util.loads(urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise InvalidCursor(f"Malformed cursor: {cursor}") from e
+    return sort_value, last_id
+
+def keyset_filter(sort_field, cursor):
+    """
+    Filter matching the documents after `cursor` in (sort_field, _id)
+    descending order, answered from the matching compound index.
+    """
+    if not cursor:
+        return {}
+    sort_value, last_id = decode_cursor(cursor)
+    return {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "_id": {"$lt": last_id}}
+    ]}
+
+def keyset_sort(sort_field):
+    return [(sort_field, DESCENDING), ("_id", DESCENDING)]
+
+def next_cursor(documents, sort_field, per_page):
+    """Cursor for the page after `documents`, or None on the last page"""
+    if len(documents) < per_page:
+        return None
+    return encode_cursor(documents[-1], sort_field)
@@ -0,0 +1,198 @@
+from bson import json_util
+from collections import deque
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class MemorySpool:
+    """In-process FIFO of pending batches. Lost on restart."""
+
+    def __init__(self):
+        self.batches = deque()
+        self.dead = []
+        self.ids = itertools.count(1)
+
+    def push(self, items):
+        self.batches.append((next(self.ids), items))
+
+    def peek(self, limit):
+        return list(itertools.islice(self.batches, limit))
+
+    def ack(self, batch_ids):
+        acked = set(batch_ids)
+        self.batches = deque(batch for batch in self.batches if batch[0] not in acked)
+
+    def dead_letter(self, batch_id, error):
+        """Moves a pending batch aside, with the error that kept failing its store"""
+        for pending_id, items in self.batches:
+            if pending_id == batch_id:
+                self.dead.append((batch_id, items, error))
+        self.ack([batch_id])
+
+    def dead_letters(self):
+        return list(self.dead)
+
+    def dead_count(self):
+        return len(self.dead)
+
+    def __len__(self):
+        return len(self.batches)
+
+class SqliteSpool:
+    """
+    FIFO of pending batches persisted to a SQLite file, so batches that were
+    fetched but not yet stored survive a crash or a MongoDB outage.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS batches (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS dead_batches (id INTEGER PRIMARY KEY, payload TEXT NOT NULL, error TEXT, failed_at REAL)")
+        self.conn.commit()
+
+    def push(self, items):
+        with self.conn:
+            self.conn.execute("INSERT INTO batches (payload) VALUES (?)", (json_util.dumps(items),))
+
+    def peek(self, limit):
+        rows = self.conn.execute("SELECT id, payload FROM batches ORDER BY id LIMIT ?", (limit,))
+        return [(batch_id, json_util.loads(payload)) for batch_id, payload in rows]
+
+    def ack(self, batch_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM batches WHERE id = ?", [(batch_id,) for batch_id in batch_ids])
+
+    def dead_letter(self, batch_id, error):
+        """Moves a pending batch to dead_batches, with the error that kept failing its store"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO dead_batches (id, payload, error, failed_at) SELECT id, payload, ?, ? FROM batches WHERE id = ?",
+                (error, time.time(), batch_id)
+            )
+            self.conn.execute("DELETE FROM batches WHERE id = ?", (batch_id,))
+
+    def dead_letters(self):
+        rows = self.conn.execute("SELECT id, payload, error FROM dead_batches ORDER BY id")
+        return [(batch_id, json_util.loads(payload), error) for batch_id, payload, error in rows]
+
+    def dead_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM dead_batches").fetchone()[0]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM batches").fetchone()[0]
+
+class BatchPipeline:
+    """
+    Bounded producer/consumer handoff between a fetch job and a store
+    function. Producers block once `max_batches` are pending; a consumer
+    thread stores batches as soon as they land, coalescing up to
+    `store_batches` pending batches per store call, and keeps a batch
+    spooled until its store succeeds. After a failed store, the oldest batch
+    is retried on its own; once it has failed `max_attempts` times it is
+    moved to the spool's dead letters, so one batch that can never be
+    stored does not block every batch behind it.
+    """
+
+    def __init__(self, store, max_batches=50, store_batches=5, spool_path=None, retry_delay=5, max_retry_delay=300, max_attempts=5):
+        self.store = store
+        self.max_batches = max_batches
+        self.store_batches = store_batches
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+        self.spool = SqliteSpool(spool_path) if spool_path else MemorySpool()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+        pending = len(self.spool)
+        if pending:
+            logger.info(f"📼 Recovered {pending} spooled batches awaiting storage")
+        dead = self.spool.dead_count()
+        if dead:
+            logger.warning(f"☠️  {dead} dead-lettered batches are kept in the spool")
+
+    def put(self, items, timeout=None):
+        """
+        Hand a fetched batch to the consumer, blocking while the pipeline is
+        full. Returns False if the batch could not be queued within timeout.
+        """
+        if not items:
+            return True
+
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.spool) < self.max_batches, timeout):
+                logger.error(f"🚧 Pipeline full ({self.max_batches} batches pending), dropping {len(items)} items")
+                return False
+            self.spool.push(items)
+            self.condition.notify_all()
+        return True
+
+    def pending(self):
+        with self.condition:
+            return len(self.spool)
+
+    def dead_lettered(self):
+        """Batches given up on after max_attempts failed stores"""
+        with self.condition:
+            return self.spool.dead_count()
+
+    def drain(self, timeout=None):
+        """Waits until every pending batch is stored; returns False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.spool) == 0, timeout)
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._consume, name="store-consumer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _consume(self):
+        delay = self.retry_delay
+        # Failed stores in a row; after the first, the oldest batch is stored on its own
+        attempts = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: not self.running or len(self.spool) > 0)
+                if not self.running:
+                    return
+                batches = self.spool.peek(1 if attempts else self.store_batches)
+
+            items = [item for _, batch in batches for item in batch]
+            try:
+                self.store(items)
+            except Exception as e:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    batch_id, batch = batches[0]
+                    logger.error(f"☠️  Giving up on a batch of {len(batch)} items after {attempts} failed stores, dead-lettering it: {str(e)}")
+                    with self.condition:
+                        self.spool.dead_letter(batch_id, str(e))
+                        self.condition.notify_all()
+                    attempts = 0
+                    delay = self.retry_delay
+                    continue
+                logger.error(f"❌ Storing {len(items)} items failed, retrying in {delay}s: {str(e)}")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+
+            attempts = 0
+            delay = self.retry_delay
+            with self.condition:
+                self.spool.ack([batch_id for batch_id, _ in batches])
+                self.condition.notify_all()
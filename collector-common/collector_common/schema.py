@@ -0,0 +1,41 @@
+from pymongo.errors import PyMongoError
+import logging
+
+logger = logging.getLogger(__name__)
+
+def apply_indexes(collection, indexes):
+    """
+    Creates each declared index that is not already present. Indexes are
+    applied one at a time so a single conflict (e.g. existing duplicates
+    under a unique key) does not block the rest. Returns the names that
+    could not be created.
+    """
+    existing = collection.index_information()
+    failed = []
+    for index in indexes:
+        name = index.document["name"]
+        if name in existing:
+            continue
+        try:
+            collection.create_indexes([index])
+            logger.info(f"🗂️  Created index '{name}' on {collection.name}")
+        except PyMongoError as e:
+            logger.error(f"❌ Could not create index '{name}' on {collection.name}: {str(e)}")
+            failed.append(name)
+    return failed
+
+def missing_indexes(collection, indexes):
+    """Names of declared indexes that do not exist on the collection"""
+    existing = collection.index_information()
+    return [index.document["name"] for index in indexes if index.document["name"] not in existing]
+
+def drop_retired_indexes(collection, names):
+    """
+    Drops indexes whose keys a declared index now covers under another name
+    and different options, so apply_indexes can build the replacement.
+    """
+    existing = collection.index_information()
+    for name in names:
+        if name in existing:
+            collection.drop_index(name)
+            logger.info(f"🗑️  Dropped retired index '{name}' on {collection.name}")
@@ -0,0 +1,47 @@
+from flask import Blueprint, jsonify
+from collector_common.lease import lease_status
+from collector_common.schema import missing_indexes
+import logging
+
+logger = logging.getLogger(__name__)
+
+def worker_status(lease_collection, lease_name):
+    """Metrics the ingest worker reported with its last lease renewal"""
+    return (lease_status(lease_collection, lease_name) or {}).get("status") or {}
+
+def status_blueprint(collection, indexes, lease_collection, lease_name, response_cache, http_metrics=True):
+    """
+    The health and metrics endpoints every collector serves: /health over
+    `collection` and its declared `indexes`, the lease holder, the response
+    cache counters and, for collectors whose worker calls out through
+    HttpClient, the outbound request metrics it last reported.
+    """
+    bp = Blueprint("status", __name__)
+
+    @bp.route('/health')
+    def health_check():
+        """Health check endpoint, reporting any declared index that is missing"""
+        try:
+            missing = missing_indexes(collection, indexes)
+            return jsonify({"status": "degraded" if missing else "healthy", "missing_indexes": missing}), 200
+        except Exception as e:
+            logger.error(f"🔴 Health check failed: {str(e)}")
+            return jsonify({"status": "unhealthy"}), 500
+
+    @bp.route('/api/metrics/worker')
+    def worker_metrics():
+        """The worker holding the ingest lease and the status it last reported"""
+        return jsonify(lease_status(lease_collection, lease_name) or {"owner": None})
+
+    @bp.route('/api/metrics/cache')
+    def cache_metrics():
+        """Response cache hit and miss counters"""
+        return jsonify(response_cache.stats())
+
+    if http_metrics:
+        @bp.route('/api/metrics/http')
+        def http_metrics_endpoint():
+            """Outbound request latency histograms and status counts per upstream host, as last reported by the worker"""
+            return jsonify(worker_status(lease_collection, lease_name).get("http", {}))
+
+    return bp
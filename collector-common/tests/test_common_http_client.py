@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from collector_common import http_client as http_client_module
+from collector_common.http_client import HttpClient
+
+def response(status, headers=None):
+    answer = requests.Response()
+    answer.status_code = status
+    answer.headers.update(headers or {})
+    answer._content = b"{}"
+    answer._content_consumed = True
+    return answer
+
+class FakeServer:
+    """Replays canned answers (responses or exceptions) to HttpClient's session"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+
+    def send(self, prepared, timeout=None, stream=False):
+        self.requests.append((prepared, timeout))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_client_module.time, "sleep", sleeps.append)
+    # Full jitter at its upper bound, so delays are predictable
+    monkeypatch.setattr(http_client_module.random, "uniform", lambda low, high: high)
+    return sleeps
+
+def client_for(server, **options):
+    client = HttpClient(user_agent="Test/1.0", **options)
+    client.session.send = server.send
+    return client
+
+def test_server_errors_are_retried_with_exponential_backoff(sleeps):
+    server = FakeServer(response(503), response(502), response(200))
+    client = client_for(server, backoff_base=1, backoff_cap=60)
+
+    assert client.get("https://api.example.com/quotes").status_code == 200
+    assert sleeps == [2, 4]
+    assert client.stats()["api.example.com"]["statuses"] == {"503": 1, "502": 1, "200": 1}
+
+def test_backoff_is_capped(sleeps):
+    server = FakeServer(response(500), response(500), response(500), response(500))
+    client = client_for(server, backoff_base=1, backoff_cap=3)
+
+    # The last answer is returned as-is once the attempts run out
+    assert client.get("https://api.example.com/quotes").status_code == 500
+    assert sleeps == [2, 3, 3]
+
+def test_retry_after_seconds_and_dates_are_honoured(sleeps):
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    server = FakeServer(response(429, {"Retry-After": "7"}), response(503, {"Retry-After": in_ten_seconds}), response(200))
+    client = client_for(server)
+
+    assert client.get("https://api.example.com/quotes").status_code == 200
+    assert sleeps[0] == 7
+    assert 8 <= sleeps[1] <= 10
+
+def test_a_retry_after_beyond_the_cap_is_returned_without_waiting(sleeps):
+    server = FakeServer(response(429, {"Retry-After": "3600"}))
+    client = client_for(server, backoff_cap=60)
+
+    assert client.get("https://api.example.com/quotes").status_code == 429
+    assert sleeps == []
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    server = FakeServer(*(requests.ConnectionError("connection reset") for _ in range(3)))
+    client = client_for(server, max_attempts=3, backoff_base=1)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get("https://api.example.com/quotes")
+    assert sleeps == [2, 4]
+    assert client.stats()["api.example.com"]["statuses"] == {"error": 3}
+
+def test_client_errors_are_not_retried(sleeps):
+    server = FakeServer(response(404))
+    client = client_for(server)
+    assert client.get("https://api.example.com/missing").status_code == 404
+    assert sleeps == []
+
+def test_every_request_carries_the_client_timeouts(sleeps):
+    server = FakeServer(response(200), response(200))
+    client = client_for(server, connect_timeout=2, read_timeout=5)
+
+    client.get("https://api.example.com/quotes")
+    client.get("https://api.example.com/quotes", timeout=1)
+    assert [timeout for _, timeout in server.requests] == [(2, 5), 1]
+
+def test_conditional_gets_revalidate_with_the_stored_etag(sleeps):
+    server = FakeServer(response(200, {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 08:00:00 GMT"}), response(304))
+    client = client_for(server)
+
+    assert client.get("https://feeds.example.com/rss", conditional=True).status_code == 200
+    assert client.get("https://feeds.example.com/rss", conditional=True).status_code == 304
+    revalidation, _ = server.requests[1]
+    assert revalidation.headers["If-None-Match"] == '"v1"'
+    assert revalidation.headers["If-Modified-Since"] == "Sat, 17 Oct 2026 08:00:00 GMT"
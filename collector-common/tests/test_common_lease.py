@@ -0,0 +1,161 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from collector_common.lease import MongoLease, lease_status, request_run, run_exclusively
+
+class FakeLeaseCollection:
+    """
+    The handful of queries MongoLease and request_run send, evaluated
+    against a server clock ($$NOW) tests can move forward. mongomock cannot
+    evaluate $$NOW in an update pipeline or $expr.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.skew = timedelta()
+        self.lock = threading.Lock()
+
+    def now(self):
+        return datetime.now() + self.skew
+
+    def evaluate(self, expression):
+        if expression == "$$NOW":
+            return self.now()
+        if isinstance(expression, dict) and "$add" in expression:
+            base, milliseconds = expression["$add"]
+            return self.evaluate(base) + timedelta(milliseconds=milliseconds)
+        if isinstance(expression, dict) and "$literal" in expression:
+            return expression["$literal"]
+        return expression
+
+    def matches(self, document, query):
+        for field, condition in query.items():
+            if field == "$or":
+                if not any(self.matches(document, branch) for branch in condition):
+                    return False
+            elif field == "$expr":
+                (operator, (left, right)), = condition.items()
+                value, now = document.get(left[1:]), self.evaluate(right)
+                if value is None or not (value < now if operator == "$lt" else value > now):
+                    return False
+            elif document.get(field) != condition:
+                return False
+        return True
+
+    def find_one_and_update(self, query, pipeline, upsert=False, return_document=None):
+        with self.lock:
+            document = self.documents.get(query["_id"])
+            if document is not None and not self.matches(document, query):
+                if upsert:
+                    raise DuplicateKeyError("E11000 duplicate key error")
+                return None
+            document = dict(document or {"_id": query["_id"]})
+            for stage in pipeline:
+                for field, value in stage["$set"].items():
+                    document[field] = self.evaluate(value)
+            self.documents[query["_id"]] = document
+            return dict(document)
+
+    def update_one(self, query, update):
+        with self.lock:
+            document = self.documents.get(query["_id"])
+            if document is None or not self.matches(document, query):
+                return SimpleNamespace(matched_count=0)
+            for path in update["$currentDate"]:
+                parent, _, job = path.partition(".")
+                document[parent] = {**document.get(parent, {}), job: self.now()}
+            return SimpleNamespace(matched_count=1)
+
+    def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    def delete_one(self, query):
+        with self.lock:
+            document = self.documents.get(query["_id"])
+            if document is not None and self.matches(document, query):
+                del self.documents[query["_id"]]
+
+def test_a_standby_takes_over_only_once_the_lease_expires():
+    collection = FakeLeaseCollection()
+    holder, standby = MongoLease(collection, "ingest", 60), MongoLease(collection, "ingest", 60)
+
+    assert holder.acquire({"pending_batches": 0})
+    assert not standby.acquire()
+    assert lease_status(collection, "ingest")["status"] == {"pending_batches": 0}
+
+    collection.skew += timedelta(seconds=61)
+    assert standby.acquire()
+    assert not holder.acquire()
+    assert lease_status(collection, "ingest")["owner"] == standby.owner
+
+def test_run_requests_reach_only_a_live_holder():
+    collection = FakeLeaseCollection()
+    lease = MongoLease(collection, "ingest", 60)
+    assert not request_run(collection, "ingest", "fetch")
+
+    assert lease.acquire()
+    assert request_run(collection, "ingest", "fetch")
+    lease.acquire()
+    assert set(lease.run_requests()) == {"fetch"}
+
+    collection.skew += timedelta(seconds=61)
+    assert not request_run(collection, "ingest", "fetch")
+
+def test_the_lease_is_renewed_while_a_slow_start_runs():
+    collection = FakeLeaseCollection()
+    lease = MongoLease(collection, "ingest", ttl_seconds=0.3)
+    stop_event = threading.Event()
+    taken_over = []
+    stopped = []
+
+    def start():
+        # Startup work that outlasts the ttl several times over
+        deadline = time.monotonic() + 1
+        while time.monotonic() < deadline:
+            taken_over.append(MongoLease(collection, "ingest", ttl_seconds=0.3).acquire())
+            time.sleep(0.05)
+        stop_event.set()
+
+    assert run_exclusively(lease, start, lambda: stopped.append(True), stop_event=stop_event) is False
+    assert taken_over and not any(taken_over)
+    assert stopped == [True]
+    assert lease_status(collection, "ingest") is None
+
+def test_a_failing_start_still_stops_and_releases_the_lease():
+    collection = FakeLeaseCollection()
+    lease = MongoLease(collection, "ingest", ttl_seconds=0.3)
+    stopped = []
+
+    def start():
+        raise RuntimeError("index build failed")
+
+    with pytest.raises(RuntimeError):
+        run_exclusively(lease, start, lambda: stopped.append(True))
+    assert stopped == [True]
+    assert lease_status(collection, "ingest") is None
+
+def test_requested_jobs_run_at_the_next_renewal():
+    collection = FakeLeaseCollection()
+    lease = MongoLease(collection, "ingest", ttl_seconds=0.3)
+    stop_event = threading.Event()
+    ran = []
+
+    def on_request(job):
+        ran.append(job)
+        stop_event.set()
+
+    def start():
+        assert request_run(collection, "ingest", "fetch")
+
+    # Don't hang the suite if the request is never picked up
+    guard = threading.Timer(5, stop_event.set)
+    guard.start()
+    lost = run_exclusively(lease, start, lambda: None, stop_event=stop_event, on_request=on_request)
+    guard.cancel()
+    assert not lost
+    assert ran == ["fetch"]
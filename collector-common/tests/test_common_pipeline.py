@@ -0,0 +1,84 @@
+import pytest
+
+from collector_common.pipeline import BatchPipeline
+
+@pytest.fixture(params=["memory", "sqlite"])
+def spool_path(request, tmp_path):
+    return str(tmp_path / "spool.sqlite3") if request.param == "sqlite" else None
+
+class FlakyStore:
+    """Fails its first `failures` calls, and every call that includes a poison item"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.stored = []
+
+    def __call__(self, items):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("MongoDB is unreachable")
+        if "poison" in items:
+            raise ValueError("cannot encode item")
+        self.stored.append(list(items))
+
+def test_a_failed_store_is_retried_until_it_succeeds(spool_path):
+    store = FlakyStore(failures=2)
+    pipeline = BatchPipeline(store, spool_path=spool_path, retry_delay=0.01)
+    pipeline.start()
+    try:
+        assert pipeline.put(["a", "b"])
+        assert pipeline.drain(5)
+    finally:
+        pipeline.stop()
+    assert store.stored == [["a", "b"]]
+    assert pipeline.dead_lettered() == 0
+
+def test_a_batch_that_keeps_failing_is_dead_lettered(spool_path):
+    store = FlakyStore()
+    pipeline = BatchPipeline(store, spool_path=spool_path, retry_delay=0.01, max_attempts=3)
+    # Spooled before the consumer starts, so the first store sees all three batches
+    for batch in (["a"], ["poison"], ["b"]):
+        assert pipeline.put(batch)
+    pipeline.start()
+    try:
+        assert pipeline.drain(5)
+    finally:
+        pipeline.stop()
+    # The batches around the poison one were stored on their own once it failed
+    assert store.stored == [["a"], ["b"]]
+    assert pipeline.dead_lettered() == 1
+    (_, items, error), = pipeline.spool.dead_letters()
+    assert items == ["poison"] and error == "cannot encode item"
+
+def test_drain_times_out_while_the_store_keeps_failing(spool_path):
+    pipeline = BatchPipeline(FlakyStore(failures=1000), spool_path=spool_path, retry_delay=0.01, max_retry_delay=0.01, max_attempts=1000)
+    pipeline.start()
+    try:
+        assert pipeline.put(["a"])
+        assert not pipeline.drain(0.2)
+        assert pipeline.pending() == 1
+    finally:
+        pipeline.stop()
+
+def test_put_gives_up_when_the_pipeline_stays_full():
+    pipeline = BatchPipeline(FlakyStore(), max_batches=1)
+    assert pipeline.put(["a"])
+    assert not pipeline.put(["b"], timeout=0.05)
+    assert pipeline.pending() == 1
+
+def test_spooled_batches_survive_a_restart(tmp_path):
+    path = str(tmp_path / "spool.sqlite3")
+    # A worker that crashed before storing anything
+    crashed = BatchPipeline(FlakyStore(), spool_path=path)
+    assert crashed.put(["a"]) and crashed.put(["b", "c"])
+    crashed.spool.conn.close()
+
+    store = FlakyStore()
+    restarted = BatchPipeline(store, spool_path=path)
+    assert restarted.pending() == 2
+    restarted.start()
+    try:
+        assert restarted.drain(5)
+    finally:
+        restarted.stop()
+    assert store.stored == [["a", "b", "c"]]
@@ -0,0 +1,82 @@
+"""
+Loads one million synthetic market_data rows through execute_values and
+through COPY + staging-table merge, and reports rows/sec for each path.
+
+Needs a local Postgres; the target table is created and dropped here:
+
+    PG_DSN="dbname=collector_db user=postgres host=localhost" python benchmarks/bench_loaders.py
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import psycopg2
+from data_warehousing_script import BATCH_SIZE, copy_rows, insert_rows
+
+ROWS = 1_000_000
+TABLE = "bench_market_data"
+FIELDS = ["symbol", "open", "high", "low", "close", "volume", "timestamp"]
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"]
+
+TABLE_DDL = f"""
+    DROP TABLE IF EXISTS {TABLE};
+    CREATE TABLE {TABLE} (
+        id SERIAL PRIMARY KEY,
+        symbol TEXT NOT NULL,
+        open NUMERIC(10, 2),
+        high NUMERIC(10, 2),
+        low NUMERIC(10, 2),
+        close NUMERIC(10, 2),
+        volume BIGINT,
+        timestamp TIMESTAMP,
+        UNIQUE (symbol, timestamp)
+    );
+"""
+
+def synthetic_rows():
+    start = datetime(2020, 1, 1)
+    for i in range(ROWS):
+        price = 100 + (i % 500) / 10
+        yield (
+            SYMBOLS[i % len(SYMBOLS)],
+            price, price + 1, price - 1, price + 0.5,
+            1000 + i % 10_000,
+            start + timedelta(minutes=i // len(SYMBOLS))
+        )
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run(conn, load):
+    with conn.cursor() as cursor:
+        cursor.execute(TABLE_DDL)
+    conn.commit()
+
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        for batch in batches(synthetic_rows(), BATCH_SIZE):
+            load(cursor, TABLE, FIELDS, batch)
+            conn.commit()
+    return ROWS / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    conn = psycopg2.connect(os.getenv("PG_DSN", "dbname=collector_db host=localhost"))
+    try:
+        print(f"{'loader':>15} {'rows/sec':>12}")
+        for name, load in [("execute_values", insert_rows), ("copy + merge", copy_rows)]:
+            print(f"{name:>15} {run(conn, load):>12,.0f}")
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.commit()
+        conn.close()
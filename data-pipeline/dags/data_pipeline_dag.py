@@ -3,11 +3,18 @@ from airflow.operators.python import PythonOperator
 from airflow.operators.latest_only import LatestOnlyOperator
 from datetime import datetime, timedelta
 import logging
+import os
 import subprocess
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# The pipeline scripts live one level above the dags folder
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Collections migrated by their own task; market fans out further by symbol inside its task
+MIGRATED_COLLECTIONS = ["news", "scientific_papers", "market"]
+
 # Default arguments for the DAG
 default_args = {
     'owner': 'airflow',
@@ -28,13 +35,13 @@ with DAG(
 
     def create_postgres_warehouse():
         logging.info("🏗️ Creating PostgreSQL Warehouse...")
-        subprocess.run(['python', 'create_warehouse.py'], check=True)
+        subprocess.run(['python', 'warehouse_create_script.py'], cwd=PIPELINE_DIR, check=True)
         logging.info("✅ Warehouse created successfully.")
 
-    def migrate_data():
-        logging.info("📦 Migrating data from MongoDB to PostgreSQL...")
-        subprocess.run(['python', 'mongo_to_postgres.py'], check=True)
-        logging.info("✅ Data migration completed.")
+    def migrate_data(collection):
+        logging.info(f"📦 Migrating {collection} from MongoDB to PostgreSQL...")
+        subprocess.run(['python', 'data_warehousing_script.py', '--collection', collection], cwd=PIPELINE_DIR, check=True)
+        logging.info(f"✅ {collection} migration completed.")
 
     # Run warehouse creation only once
     latest_only = LatestOnlyOperator(
@@ -46,10 +53,15 @@ with DAG(
         python_callable=create_postgres_warehouse,
     )
 
-    migrate_data_task = PythonOperator(
-        task_id='migrate_data',
-        python_callable=migrate_data,
-    )
+    # One task per collection so they load in parallel instead of back to back
+    migrate_data_tasks = [
+        PythonOperator(
+            task_id=f'migrate_{collection}',
+            python_callable=migrate_data,
+            op_kwargs={'collection': collection},
+        )
+        for collection in MIGRATED_COLLECTIONS
+    ]
 
     # Define DAG execution order
-    latest_only >> create_warehouse >> migrate_data_task
+    latest_only >> create_warehouse >> migrate_data_tasks
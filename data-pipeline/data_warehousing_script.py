@@ -1,51 +1,329 @@
 import pymongo
 import psycopg2
 import logging
+import argparse
+import csv
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bson import ObjectId
+from itertools import islice
 from psycopg2.extras import execute_values
+from transform import DEAD_LETTERS_DDL, Column, DeadLetterSink, to_integer, to_numeric, to_text_array, to_timestamp, transform_documents
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # MongoDB Connection
 MONGO_URI = "mongodb://localhost:27017"
-mongo_client = pymongo.MongoClient(MONGO_URI)
-mongo_db = mongo_client["collector_series"]
 
 # PostgreSQL Connection
-PG_CONN = psycopg2.connect(
-    dbname="collector_db",
-    user="your_username",
-    password="your_password",
-    host="localhost",
-    port="5432"
-)
-pg_cursor = PG_CONN.cursor()
+PG_SETTINGS = {
+    "dbname": "collector_db",
+    "user": "your_username",
+    "password": "your_password",
+    "host": "localhost",
+    "port": "5432"
+}
 
-# Function to migrate data
-def migrate_collection(mongo_collection, pg_table, fields_mapping):
-    mongo_data = list(mongo_collection.find({}, {"_id": 0}))
-    transformed_data = [tuple(doc.get(field, None) for field in fields_mapping) for doc in mongo_data]
-    
+# Documents per Mongo cursor batch and per committed batch
+BATCH_SIZE = 5000
+# Rows per execute_values INSERT statement
+PAGE_SIZE = 1000
+# Batches at least this large are loaded through COPY and a staging table merge
+COPY_THRESHOLD = 2000
+# Upper bound on parallel migration processes; each DAG task runs its own pool,
+# so cpu_count per task would oversubscribe the host and Postgres connections
+MAX_WORKERS = 4
+
+# Longer URLs would overflow the btree entry of the UNIQUE url index and fail their whole batch
+URL_MAX_LENGTH = 2048
+# market_data prices are NUMERIC(10, 2)
+to_price = to_numeric(10, 2)
+
+# Migration name -> the collector database/collection it reads and how documents map onto the target table
+MIGRATIONS = {
+    "news": {
+        "database": "the-news-collector",
+        "collection": "news-collection",
+        "table": "news_articles",
+        "columns": [
+            Column("title", required=True),
+            Column("source"),
+            Column("author"),
+            Column("publishedAt", coerce=to_timestamp),
+            Column("url", max_length=URL_MAX_LENGTH),
+            Column("urlToImage"),
+            Column("category"),
+        ],
+    },
+    "scientific_papers": {
+        "database": "the-scientific-collector",
+        "collection": "scientific-collection",
+        "table": "scientific_papers",
+        "columns": [
+            Column("title", required=True),
+            Column("authors", coerce=to_text_array),
+            Column("publishedAt", "publicationDate", coerce=to_timestamp),
+            Column("url", max_length=URL_MAX_LENGTH),
+            Column("abstract"),
+            Column("journal", "publisherName"),
+            Column("doi"),
+        ],
+    },
+    "market": {
+        "database": "the-market-collector",
+        "collection": "market-collection",
+        "table": "market_data",
+        "columns": [
+            Column("symbol", required=True),
+            Column("open", coerce=to_price),
+            Column("high", coerce=to_price),
+            Column("low", coerce=to_price),
+            Column("close", coerce=to_price),
+            Column("volume", coerce=to_integer),
+            Column("timestamp", coerce=to_timestamp, required=True),
+        ],
+    },
+}
+
+# Migrations split into one task per distinct value of this field, so a large collection loads in parallel
+PARTITION_BY = {
+    "market": "symbol",
+}
+
+def refresh_market_rollups(pg_cursor, fields_mapping, rows):
+    """Re-aggregates the OHLCV rollup buckets touched by a freshly loaded batch of candles"""
+    symbol, timestamp = fields_mapping.index("symbol"), fields_mapping.index("timestamp")
+    pg_cursor.execute("""
+        SELECT refresh_market_rollups(symbol, min(ts))
+        FROM unnest(%s::text[], %s::timestamp[]) AS batch(symbol, ts)
+        GROUP BY symbol;
+    """, ([row[symbol] for row in rows], [row[timestamp] for row in rows]))
+
+# Run inside each batch's transaction, after its rows are loaded into the table
+AFTER_LOAD = {
+    "market_data": refresh_market_rollups,
+}
+
+# Per-collection (or per-partition) high-water mark; committed in the same transaction as each batch
+SYNC_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        collection TEXT PRIMARY KEY,
+        last_id TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+def get_watermark(pg_cursor, collection_name):
+    pg_cursor.execute("SELECT last_id FROM sync_state WHERE collection = %s", (collection_name,))
+    row = pg_cursor.fetchone()
+    return ObjectId(row[0]) if row else None
+
+def set_watermark(pg_cursor, collection_name, last_id):
+    pg_cursor.execute("""
+        INSERT INTO sync_state (collection, last_id, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (collection) DO UPDATE SET last_id = EXCLUDED.last_id, updated_at = EXCLUDED.updated_at;
+    """, (collection_name, str(last_id)))
+
+def copy_value(value):
+    """Lists become Postgres array literals; everything else is written as CSV text"""
+    if isinstance(value, list):
+        items = (str(item).replace("\\", "\\\\").replace('"', '\\"') for item in value)
+        return "{" + ",".join(f'"{item}"' for item in items) + "}"
+    return value
+
+class CsvRowStream(io.TextIOBase):
+    """File-like object that renders rows as CSV lazily as COPY reads them"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.line = io.StringIO()
+        self.writer = csv.writer(self.line)
+        self.buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow([copy_value(value) for value in row])
+            self.buffer += self.line.getvalue()
+            self.line.seek(0)
+            self.line.truncate()
+        if size < 0:
+            chunk, self.buffer = self.buffer, ""
+        else:
+            chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+def insert_rows(pg_cursor, pg_table, fields_mapping, rows, page_size=PAGE_SIZE):
+    """Multi-row INSERT through execute_values; cheapest for small batches"""
     query = f"""
         INSERT INTO {pg_table} ({', '.join(fields_mapping)})
         VALUES %s
         ON CONFLICT DO NOTHING;
     """
-    execute_values(pg_cursor, query, transformed_data)
-    PG_CONN.commit()
-    logging.info(f"✅ Migrated {len(transformed_data)} records to {pg_table}")
+    execute_values(pg_cursor, query, rows, page_size=page_size)
+
+def copy_rows(pg_cursor, pg_table, fields_mapping, rows):
+    """
+    Streams rows as CSV through COPY into a temporary staging table, then
+    merges them into pg_table with a single INSERT ... SELECT ... ON CONFLICT.
+    Temporary tables are private to the session, so parallel workers never
+    share or contend for a staging table, and it is dropped after the merge.
+    """
+    columns = ', '.join(fields_mapping)
+    staging_table = f"{pg_table}_staging"
+    pg_cursor.execute(f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS SELECT {columns} FROM {pg_table} WITH NO DATA")
+    pg_cursor.copy_expert(f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)", CsvRowStream(rows))
+    pg_cursor.execute(f"""
+        INSERT INTO {pg_table} ({columns})
+        SELECT {columns} FROM {staging_table}
+        ON CONFLICT DO NOTHING;
+    """)
+    pg_cursor.execute(f"DROP TABLE {staging_table}")
+
+def load_rows(pg_cursor, pg_table, fields_mapping, rows, loader="auto", page_size=PAGE_SIZE):
+    """Loads a batch with COPY or execute_values; 'auto' picks by batch size"""
+    if loader == "copy" or (loader == "auto" and len(rows) >= COPY_THRESHOLD):
+        copy_rows(pg_cursor, pg_table, fields_mapping, rows)
+    else:
+        insert_rows(pg_cursor, pg_table, fields_mapping, rows, page_size)
+
+def batched(iterable, size):
+    """Consecutive lists of at most size items, so only one batch is held in memory"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# Function to migrate data
+def migrate_collection(pg_conn, mongo_collection, name, pg_table, columns, batch_size=BATCH_SIZE, page_size=PAGE_SIZE, incremental=True, loader="auto", partition_field=None, partition=None):
+    """
+    Streams documents newer than the migration's watermark in _id order and
+    loads them in batches. Each batch, its dead letters and its watermark
+    commit together, so a crashed run resumes after the last committed
+    batch. With a partition, only documents where partition_field ==
+    partition are loaded, under their own watermark.
+    """
+    pg_cursor = pg_conn.cursor()
+    state_key = name
+    mongo_query = {}
+    if partition_field is not None:
+        state_key = f"{name}:{partition}"
+        mongo_query[partition_field] = partition
+
+    watermark = None
+    if incremental:
+        # A partition with no state yet starts from the whole-collection watermark of unpartitioned runs
+        watermark = get_watermark(pg_cursor, state_key)
+        if watermark is None and state_key != name:
+            watermark = get_watermark(pg_cursor, name)
+    if watermark:
+        mongo_query["_id"] = {"$gt": watermark}
+    logging.info(f"📥 Syncing {state_key} -> {pg_table} from watermark {watermark}")
+
+    column_names = [column.name for column in columns]
+    dead_letters = DeadLetterSink(name)
+    documents = mongo_collection.find(mongo_query).sort("_id", 1).batch_size(batch_size)
+
+    total = 0
+    try:
+        for batch in batched(documents, batch_size):
+            rows = list(transform_documents(batch, columns, dead_letters))
+            if rows:
+                load_rows(pg_cursor, pg_table, column_names, rows, loader, page_size)
+                if pg_table in AFTER_LOAD:
+                    AFTER_LOAD[pg_table](pg_cursor, column_names, rows)
+            dead_letters.flush(pg_cursor)
+            set_watermark(pg_cursor, state_key, batch[-1]["_id"])
+            pg_conn.commit()
+            total += len(rows)
+    except Exception:
+        pg_conn.rollback()
+        raise
+    finally:
+        pg_cursor.close()
+
+    logging.info(f"✅ Migrated {total} records from {state_key} to {pg_table} ({dead_letters.total} dead-lettered)")
+    return total
+
+def source_collection(mongo_client, name):
+    migration = MIGRATIONS[name]
+    return mongo_client[migration["database"]][migration["collection"]]
+
+def plan_tasks(mongo_client, names):
+    """One (migration, partition) task per migration, or per partition value for partitioned migrations"""
+    tasks = []
+    for name in names:
+        partition_field = PARTITION_BY.get(name)
+        if partition_field is None:
+            tasks.append((name, None))
+        else:
+            tasks.extend((name, value) for value in sorted(source_collection(mongo_client, name).distinct(partition_field)))
+    return tasks
+
+def run_task(task, options):
+    """Pool worker: opens its own Mongo and Postgres connections, since neither can be shared across processes"""
+    name, partition = task
+    migration = MIGRATIONS[name]
+    mongo_client = pymongo.MongoClient(MONGO_URI)
+    pg_conn = psycopg2.connect(**PG_SETTINGS)
+    try:
+        return migrate_collection(
+            pg_conn, source_collection(mongo_client, name), name, migration["table"], migration["columns"],
+            partition_field=PARTITION_BY.get(name), partition=partition, **options
+        )
+    finally:
+        pg_conn.close()
+        mongo_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate collector data from MongoDB to PostgreSQL")
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and re-send every document")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Documents per committed batch")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Rows per INSERT statement")
+    parser.add_argument("--loader", choices=["auto", "copy", "values"], default="auto", help="COPY, execute_values, or pick by batch size")
+    parser.add_argument("--collection", action="append", choices=list(MIGRATIONS), help="Migrate only this collection (repeatable)")
+    parser.add_argument("--workers", type=int, default=min(MAX_WORKERS, os.cpu_count() or 1), help="Parallel migration processes")
+    args = parser.parse_args()
+
+    mongo_client = pymongo.MongoClient(MONGO_URI)
+    tasks = plan_tasks(mongo_client, args.collection or list(MIGRATIONS))
+    # Workers open their own clients; don't carry this one across the fork
+    mongo_client.close()
 
-# Migrate News Data
-migrate_collection(mongo_db["news"], "news_articles", ["title", "source", "author", "publishedAt", "url", "urlToImage", "category"])
+    pg_conn = psycopg2.connect(**PG_SETTINGS)
+    with pg_conn.cursor() as pg_cursor:
+        pg_cursor.execute(SYNC_STATE_DDL)
+        pg_cursor.execute(DEAD_LETTERS_DDL)
+    pg_conn.commit()
+    pg_conn.close()
 
-# Migrate Scientific Papers Data
-migrate_collection(mongo_db["scientific_papers"], "scientific_papers", ["title", "author", "publishedAt", "url", "abstract", "journal"])
+    options = dict(batch_size=args.batch_size, page_size=args.page_size, incremental=not args.full, loader=args.loader)
 
-# Migrate Market Data (Updated Schema)
-migrate_collection(mongo_db["market"], "market_data", ["symbol", "open", "high", "low", "close", "volume", "timestamp"])
+    # No point starting more processes than there are tasks
+    workers = max(1, min(args.workers, len(tasks)))
+    failed = []
+    logging.info(f"🚀 Running {len(tasks)} migration tasks on {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_task, task, options): task for task in tasks}
+        for future in as_completed(futures):
+            name, partition = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"❌ Migration of {name}{f':{partition}' if partition is not None else ''} failed: {e}")
+                failed.append((name, partition))
 
-# Close connections
-pg_cursor.close()
-PG_CONN.close()
-mongo_client.close()
-logging.info("✅ Database connections closed successfully.")
+    if failed:
+        sys.exit(1)
+    logging.info("✅ All migrations completed successfully.")
@@ -0,0 +1,102 @@
+import copy
+import csv
+import os
+import re
+import sys
+
+import mongomock
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.normpath(os.path.join(HERE, ".."))
+
+# transform and data_warehousing_script are imported as top-level modules,
+# the way the DAG and the CLI run them
+if PIPELINE_DIR not in sys.path:
+    sys.path.insert(0, PIPELINE_DIR)
+
+import data_warehousing_script
+import transform
+
+class FakeWarehouse:
+    """
+    The slice of a psycopg2 connection migrate_collection uses: row tables,
+    sync_state and transactions. Writes are staged until commit() and thrown
+    away by rollback(), so tests can check what a crashed run leaves behind.
+    """
+
+    def __init__(self):
+        self.committed = {"tables": {}, "sync_state": {}}
+        self.staged = copy.deepcopy(self.committed)
+        self.commits = 0
+        self.copies = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = copy.deepcopy(self.staged)
+        self.commits += 1
+
+    def rollback(self):
+        self.staged = copy.deepcopy(self.committed)
+
+    def rows(self, table):
+        return self.committed["tables"].get(table, [])
+
+    def watermark(self, key):
+        return self.committed["sync_state"].get(key)
+
+class FakeCursor:
+    def __init__(self, warehouse):
+        self.warehouse = warehouse
+        self.result = None
+
+    def execute(self, sql, params=()):
+        state = self.warehouse.staged
+        if sql.startswith("SELECT last_id FROM sync_state"):
+            last_id = state["sync_state"].get(params[0])
+            self.result = (last_id,) if last_id is not None else None
+        elif "INSERT INTO sync_state" in sql:
+            state["sync_state"][params[0]] = params[1]
+        elif sql.startswith("CREATE TEMP TABLE"):
+            state["tables"][sql.split()[3]] = []
+        elif "SELECT" in sql and "_staging" in sql:
+            # INSERT INTO table (...) SELECT ... FROM table_staging
+            table, staging = re.search(r"INSERT INTO (\w+).*FROM (\w+)", sql, re.S).groups()
+            state["tables"].setdefault(table, []).extend(state["tables"][staging])
+        elif sql.startswith("DROP TABLE"):
+            del state["tables"][sql.split()[2]]
+
+    def fetchone(self):
+        return self.result
+
+    def copy_expert(self, sql, stream):
+        table = sql.split()[1]
+        # psycopg2 reads the stream in 8 KiB chunks
+        chunks = iter(lambda: stream.read(8192), "")
+        text = "".join(chunks)
+        self.warehouse.copies.append(text)
+        rows = [tuple(value if value != "" else None for value in row) for row in csv.reader(text.splitlines(True))]
+        self.warehouse.staged["tables"][table].extend(rows)
+
+    def insert_values(self, sql, rows):
+        table = re.search(r"INSERT INTO (\w+)", sql).group(1)
+        self.warehouse.staged["tables"].setdefault(table, []).extend(tuple(row) for row in rows)
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def warehouse(monkeypatch):
+    def execute_values(cursor, sql, rows, page_size=100):
+        cursor.insert_values(sql, rows)
+    monkeypatch.setattr(data_warehousing_script, "execute_values", execute_values)
+    monkeypatch.setattr(transform, "execute_values", execute_values)
+    # The rollups are plpgsql; their refresh is not what these tests are about
+    monkeypatch.setitem(data_warehousing_script.AFTER_LOAD, "market_data", lambda cursor, fields_mapping, rows: None)
+    return FakeWarehouse()
+
+@pytest.fixture
+def mongo_client():
+    return mongomock.MongoClient()
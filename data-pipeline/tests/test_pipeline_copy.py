@@ -0,0 +1,55 @@
+import csv
+from datetime import datetime
+
+from data_warehousing_script import MIGRATIONS, CsvRowStream, copy_value, migrate_collection
+
+ROWS = [
+    ('Storm hits "the" coast, again', None, ["Ada Lovelace", 'Grace "Amazing" Hopper', "C:\\Users\\alan", "Smith, J."], datetime(2024, 3, 1, 10), 1.5),
+    ("Two\nlines", "Wire", [], None, None),
+]
+
+def test_rows_render_as_csv_copy_can_read_back():
+    text = CsvRowStream(ROWS).read()
+    first, second = csv.reader(text.splitlines(True))
+
+    assert first == [
+        'Storm hits "the" coast, again',
+        "",
+        '{"Ada Lovelace","Grace \\"Amazing\\" Hopper","C:\\\\Users\\\\alan","Smith, J."}',
+        "2024-03-01 10:00:00",
+        "1.5",
+    ]
+    assert second == ["Two\nlines", "Wire", "{}", "", ""]
+    # None is written unquoted and empty, which COPY ... (FORMAT csv) loads as NULL
+    assert 'again",,"{' in text
+
+def test_small_reads_return_the_same_text_as_one_read():
+    whole = CsvRowStream(ROWS).read()
+    stream = CsvRowStream(ROWS)
+    chunks = iter(lambda: stream.read(7), "")
+    assert "".join(chunks) == whole
+    assert stream.read() == ""
+
+def test_array_items_are_escaped_for_the_array_literal():
+    assert copy_value(['say "hi"', "a\\b"]) == '{"say \\"hi\\"","a\\\\b"}'
+    assert copy_value("plain") == "plain"
+    assert copy_value(None) is None
+
+def test_copy_and_values_loaders_store_the_same_rows(warehouse, mongo_client):
+    papers = MIGRATIONS["scientific_papers"]
+    collection = mongo_client.db.papers
+    collection.insert_many([
+        {"title": 'Quoting "CSV", carefully', "authors": ["Smith, J.", 'O"Brien'], "publicationDate": "2024-03-01", "url": f"https://example.com/{i}"}
+        for i in range(3)
+    ])
+
+    assert migrate_collection(warehouse, collection, "papers", "copied", papers["columns"], loader="copy") == 3
+    assert migrate_collection(warehouse, collection, "papers", "inserted", papers["columns"], loader="values", incremental=False) == 3
+    # The staging table is gone once its rows are merged
+    assert set(warehouse.committed["tables"]) == {"copied", "inserted"}
+
+    copied, inserted = warehouse.rows("copied"), warehouse.rows("inserted")
+    assert [row[0] for row in copied] == [row[0] for row in inserted]
+    assert [row[1] for row in copied] == [copy_value(row[1]) for row in inserted]
+    # Missing abstract, journal and DOI go in as NULL either way
+    assert {row[4:] for row in copied} == {row[4:] for row in inserted} == {(None, None, None)}
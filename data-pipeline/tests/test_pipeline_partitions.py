@@ -0,0 +1,94 @@
+import re
+from datetime import date, datetime
+
+import pytest
+
+from warehouse_create_script import add_months, ensure_market_partitions, partition_default_market_data
+
+class PartitionError(Exception):
+    """What Postgres raises when attaching a partition whose rows the default partition still holds"""
+
+class FakePartitionedWarehouse:
+    """
+    A cursor over market_data's partitions that understands the statements
+    warehouse_create_script sends, and refuses to attach a partition while
+    the default partition holds rows in its range, as Postgres does.
+    """
+
+    def __init__(self, default_rows=()):
+        self.tables = {"market_data_default": list(default_rows)}
+        self.attached = {}
+        self.result = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        if sql.startswith("SELECT to_regclass"):
+            self.result = (params[0] if params[0] in self.tables else None,)
+        elif sql.startswith("SELECT min(timestamp), max(timestamp) FROM market_data_default"):
+            stamps = [row["timestamp"] for row in self.tables["market_data_default"]]
+            self.result = (min(stamps), max(stamps)) if stamps else (None, None)
+        elif sql.startswith("CREATE TABLE"):
+            self.tables[sql.split()[2]] = []
+        elif sql.startswith("WITH moved AS"):
+            partition = re.search(r"INSERT INTO (\w+)", sql).group(1)
+            lower, upper = (datetime(day.year, day.month, day.day) for day in params)
+            default = self.tables["market_data_default"]
+            moved = [row for row in default if lower <= row["timestamp"] < upper]
+            self.tables["market_data_default"] = [row for row in default if row not in moved]
+            self.tables[partition].extend(moved)
+            self.rowcount = len(moved)
+        elif sql.startswith("ALTER TABLE market_data ATTACH PARTITION"):
+            partition, lower, upper = re.search(r"PARTITION (\w+) FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)", sql).groups()
+            lower, upper = datetime.fromisoformat(lower), datetime.fromisoformat(upper)
+            if any(lower <= row["timestamp"] < upper for row in self.tables["market_data_default"]):
+                raise PartitionError(f"updated partition constraint for default partition would be violated by {partition}")
+            self.attached[partition] = (lower, upper)
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def fetchone(self):
+        return self.result
+
+def candle(timestamp):
+    return {"symbol": "AAPL", "timestamp": timestamp}
+
+def test_months_roll_over_the_year():
+    assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+
+def test_rows_caught_by_the_default_partition_move_into_new_partitions():
+    september, october = candle(datetime(2026, 9, 30, 23, 59)), candle(datetime(2026, 10, 1))
+    late_october = candle(datetime(2026, 10, 31, 16))
+    warehouse = FakePartitionedWarehouse([september, october, late_october])
+
+    partition_default_market_data(warehouse)
+
+    assert warehouse.attached == {
+        "market_data_2026_09": (datetime(2026, 9, 1), datetime(2026, 10, 1)),
+        "market_data_2026_10": (datetime(2026, 10, 1), datetime(2026, 11, 1)),
+    }
+    assert warehouse.tables["market_data_2026_09"] == [september]
+    assert warehouse.tables["market_data_2026_10"] == [october, late_october]
+    assert warehouse.tables["market_data_default"] == []
+
+def test_existing_partitions_are_left_alone():
+    warehouse = FakePartitionedWarehouse()
+    ensure_market_partitions(warehouse, date(2026, 10, 18), date(2026, 12, 5))
+    assert list(warehouse.attached) == ["market_data_2026_10", "market_data_2026_11", "market_data_2026_12"]
+
+    # A later run covering an overlapping range only adds the new month
+    warehouse.attached.clear()
+    ensure_market_partitions(warehouse, date(2026, 11, 1), date(2027, 1, 1))
+    assert list(warehouse.attached) == ["market_data_2027_01"]
+
+def test_an_empty_default_partition_needs_no_partitions():
+    warehouse = FakePartitionedWarehouse()
+    partition_default_market_data(warehouse)
+    assert warehouse.attached == {}
+
+def test_the_fake_refuses_to_attach_over_default_rows():
+    # Guards the test above: without the move, attaching the month would fail
+    warehouse = FakePartitionedWarehouse([candle(datetime(2026, 10, 5))])
+    with pytest.raises(PartitionError):
+        warehouse.execute("ALTER TABLE market_data ATTACH PARTITION market_data_2026_10 FOR VALUES FROM ('2026-10-01') TO ('2026-11-01');")
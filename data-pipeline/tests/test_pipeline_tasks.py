@@ -0,0 +1,37 @@
+from data_warehousing_script import MIGRATIONS, PARTITION_BY, migrate_collection, plan_tasks, source_collection
+
+def candle(symbol, day):
+    return {"symbol": symbol, "open": 1, "high": 1, "low": 1, "close": 1, "volume": 10, "timestamp": f"2026-10-1{day} 16:00:00"}
+
+def test_partitioned_migrations_get_one_task_per_value(mongo_client):
+    source_collection(mongo_client, "market").insert_many([candle(symbol, day) for symbol in ("MSFT", "AAPL", "IBM") for day in range(2)])
+    source_collection(mongo_client, "news").insert_one({"title": "Big storm hits coast"})
+
+    assert plan_tasks(mongo_client, ["news", "market", "scientific_papers"]) == [
+        ("news", None),
+        ("market", "AAPL"), ("market", "IBM"), ("market", "MSFT"),
+        ("scientific_papers", None),
+    ]
+
+def test_a_partitioned_migration_without_documents_plans_no_tasks(mongo_client):
+    assert plan_tasks(mongo_client, ["market"]) == []
+
+def test_partition_tasks_together_load_every_document_once(warehouse, mongo_client):
+    market = MIGRATIONS["market"]
+    collection = source_collection(mongo_client, "market")
+    collection.insert_many([candle(symbol, day) for day in range(3) for symbol in ("MSFT", "AAPL")])
+
+    loaded = {
+        partition: migrate_collection(warehouse, collection, name, market["table"], market["columns"], batch_size=2,
+                                      partition_field=PARTITION_BY[name], partition=partition)
+        for name, partition in plan_tasks(mongo_client, ["market"])
+    }
+
+    assert loaded == {"AAPL": 3, "MSFT": 3}
+    rows = warehouse.rows(market["table"])
+    assert sorted((row[0], row[-1].day) for row in rows) == [(symbol, day) for symbol in ("AAPL", "MSFT") for day in (10, 11, 12)]
+    # Each symbol resumes from its own watermark
+    for symbol in ("AAPL", "MSFT"):
+        last = collection.find({"symbol": symbol}).sort("_id", -1)[0]
+        assert warehouse.watermark(f"market:{symbol}") == str(last["_id"])
+    assert warehouse.watermark("market") is None
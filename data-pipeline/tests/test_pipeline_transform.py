@@ -0,0 +1,109 @@
+from datetime import date, datetime
+
+import pytest
+from bson import ObjectId, json_util
+
+import transform
+from data_warehousing_script import MIGRATIONS, URL_MAX_LENGTH
+from transform import DeadLetterSink, MappingError, to_integer, to_numeric, to_text_array, to_timestamp, transform_documents
+
+def route(name, documents):
+    """Rows and dead letters of one batch of a migration"""
+    dead_letters = DeadLetterSink(name)
+    rows = list(transform_documents(documents, MIGRATIONS[name]["columns"], dead_letters))
+    return rows, dead_letters
+
+def dead_ids_and_errors(dead_letters):
+    return [(document_id, error) for _, document_id, _, error in dead_letters.pending]
+
+def test_timestamps_become_naive_utc():
+    assert to_timestamp("2024-03-01") == datetime(2024, 3, 1)
+    assert to_timestamp("2024-03-01 10:00:00") == datetime(2024, 3, 1, 10)
+    assert to_timestamp("2024-03-01T10:00:00Z") == datetime(2024, 3, 1, 10)
+    assert to_timestamp("2024-03-01T12:00:00+02:00") == datetime(2024, 3, 1, 10)
+    assert to_timestamp(date(2024, 3, 1)) == datetime(2024, 3, 1)
+    assert to_timestamp("") is None and to_timestamp(None) is None
+
+@pytest.mark.parametrize("value", ["01/03/2024", "yesterday", 1709287200, {"$date": "2024-03-01"}])
+def test_malformed_timestamps_are_refused(value):
+    with pytest.raises(MappingError):
+        to_timestamp(value)
+
+def test_numbers_that_overflow_their_column_are_refused():
+    to_price = to_numeric(10, 2)
+    assert to_price("99999999.99") == 99999999.99
+    with pytest.raises(MappingError):
+        to_price(100000000)
+    with pytest.raises(MappingError):
+        to_price("nan")
+    assert to_integer("1500.0") == 1500
+    with pytest.raises(MappingError):
+        to_integer(2 ** 63)
+    with pytest.raises(MappingError):
+        to_integer("lots")
+
+def test_author_lists_keep_only_non_blank_names():
+    assert to_text_array(["Ada Lovelace", " ", None, "Alan Turing"]) == ["Ada Lovelace", "Alan Turing"]
+    assert to_text_array("Ada Lovelace") == ["Ada Lovelace"]
+    with pytest.raises(MappingError):
+        to_text_array({"name": "Ada Lovelace"})
+
+def test_news_rows_and_dead_letters():
+    good, bad_date, untitled, long_url = (ObjectId() for _ in range(4))
+    rows, dead_letters = route("news", [
+        {"_id": good, "title": "Big storm hits coast", "source": "Wire", "publishedAt": "2024-03-01T10:00:00Z", "url": "https://example.com/storm"},
+        {"_id": bad_date, "title": "Markets rally", "publishedAt": "Friday morning", "url": "https://example.com/rally"},
+        {"_id": untitled, "title": "   ", "url": "https://example.com/untitled"},
+        {"_id": long_url, "title": "Tracking everything", "url": "https://example.com/?q=" + "x" * URL_MAX_LENGTH},
+    ])
+
+    # Missing optional fields become NULLs in the target row
+    assert rows == [("Big storm hits coast", "Wire", None, datetime(2024, 3, 1, 10), "https://example.com/storm", None, None)]
+    assert dead_ids_and_errors(dead_letters) == [
+        (str(bad_date), "not an ISO 8601 timestamp: 'Friday morning'"),
+        (str(untitled), "missing required field 'title'"),
+        (str(long_url), f"'url' is longer than {URL_MAX_LENGTH} characters"),
+    ]
+
+def test_market_rows_and_dead_letters():
+    good, huge_price, no_timestamp, nested = (ObjectId() for _ in range(4))
+    candle = {"symbol": "AAPL", "open": 230, "high": "231.5", "low": 229, "close": 230.25, "volume": "1200", "timestamp": "2024-03-01 15:55:00"}
+    rows, dead_letters = route("market", [
+        dict(candle, _id=good),
+        dict(candle, _id=huge_price, high=1e12),
+        dict(candle, _id=no_timestamp, timestamp=None),
+        dict(candle, _id=nested, symbol={"ticker": "AAPL"}),
+    ])
+
+    assert rows == [("AAPL", 230.0, 231.5, 229.0, 230.25, 1200, datetime(2024, 3, 1, 15, 55))]
+    assert dead_ids_and_errors(dead_letters) == [
+        (str(huge_price), "1000000000000.0 does not fit NUMERIC(10, 2)"),
+        (str(no_timestamp), "missing required field 'timestamp'"),
+        (str(nested), "expected a scalar, got dict"),
+    ]
+
+def test_paper_fields_are_read_from_their_source_names():
+    rows, dead_letters = route("scientific_papers", [{
+        "_id": ObjectId(), "title": "On Computable Numbers", "authors": ["Alan Turing"],
+        "publicationDate": "1936-11-12", "publisherName": "Proceedings of the LMS", "doi": "10.1112/plms/s2-42.1.230"
+    }])
+    assert rows == [("On Computable Numbers", ["Alan Turing"], datetime(1936, 11, 12), None, None, "Proceedings of the LMS", "10.1112/plms/s2-42.1.230")]
+    assert not dead_letters.pending
+
+def test_dead_letters_are_written_with_their_document_and_cleared(monkeypatch):
+    written = []
+    monkeypatch.setattr(transform, "execute_values", lambda cursor, sql, rows: written.append((sql, list(rows))))
+    bad = {"_id": ObjectId(), "title": "Markets rally", "publishedAt": "Friday morning"}
+    _, dead_letters = route("news", [bad])
+
+    dead_letters.flush(pg_cursor=None)
+    # Already written; the next batch's flush has nothing to add
+    dead_letters.flush(pg_cursor=None)
+
+    (sql, rows), = written
+    assert sql.startswith("INSERT INTO dead_letters")
+    (migration, document_id, document, error), = rows
+    assert (migration, document_id) == ("news", str(bad["_id"]))
+    assert json_util.loads(document) == bad
+    assert error == "not an ISO 8601 timestamp: 'Friday morning'"
+    assert dead_letters.total == 1 and not dead_letters.pending
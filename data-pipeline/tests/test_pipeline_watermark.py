@@ -0,0 +1,78 @@
+import pytest
+
+import data_warehousing_script
+from data_warehousing_script import MIGRATIONS, migrate_collection
+
+NEWS = MIGRATIONS["news"]
+
+def news_article(index):
+    return {"title": f"Story {index}", "source": "Wire", "publishedAt": "2026-10-18 08:00:00", "url": f"https://example.com/story-{index}"}
+
+def migrate_news(warehouse, collection, **options):
+    return migrate_collection(warehouse, collection, "news", NEWS["table"], NEWS["columns"], batch_size=2, **options)
+
+def titles(warehouse):
+    return [row[0] for row in warehouse.rows(NEWS["table"])]
+
+def test_a_second_run_only_loads_documents_after_the_watermark(warehouse, mongo_client):
+    collection = mongo_client.db.news
+    collection.insert_many([news_article(i) for i in range(3)])
+    assert migrate_news(warehouse, collection) == 3
+    # One commit per batch, each carrying the batch's watermark
+    assert warehouse.commits == 2
+    assert warehouse.watermark("news") == str(collection.find_one({"title": "Story 2"})["_id"])
+
+    collection.insert_many([news_article(i) for i in range(3, 5)])
+    assert migrate_news(warehouse, collection) == 2
+    assert titles(warehouse) == [f"Story {i}" for i in range(5)]
+
+    # Nothing new, nothing loaded
+    assert migrate_news(warehouse, collection) == 0
+
+def test_a_crashed_run_resumes_after_its_last_committed_batch(warehouse, mongo_client, monkeypatch):
+    collection = mongo_client.db.news
+    collection.insert_many([news_article(i) for i in range(5)])
+    load_rows = data_warehousing_script.load_rows
+    loads = []
+
+    def crash_on_the_second_batch(*args, **kwargs):
+        loads.append(args)
+        if len(loads) == 2:
+            raise ConnectionError("server closed the connection unexpectedly")
+        load_rows(*args, **kwargs)
+    monkeypatch.setattr(data_warehousing_script, "load_rows", crash_on_the_second_batch)
+    with pytest.raises(ConnectionError):
+        migrate_news(warehouse, collection)
+    monkeypatch.setattr(data_warehousing_script, "load_rows", load_rows)
+
+    assert titles(warehouse) == ["Story 0", "Story 1"]
+    assert warehouse.watermark("news") == str(collection.find_one({"title": "Story 1"})["_id"])
+
+    assert migrate_news(warehouse, collection) == 3
+    assert titles(warehouse) == [f"Story {i}" for i in range(5)]
+
+def test_a_dead_lettered_document_still_moves_the_watermark(warehouse, mongo_client):
+    collection = mongo_client.db.news
+    collection.insert_many([news_article(0), {"title": "", "url": "https://example.com/untitled"}])
+    assert migrate_news(warehouse, collection) == 1
+    assert warehouse.watermark("news") == str(collection.find_one({"title": ""})["_id"])
+    # Replaying it is a job for the dead_letters table, not the next sync
+    assert migrate_news(warehouse, collection) == 0
+
+def test_a_full_run_ignores_the_watermark(warehouse, mongo_client):
+    collection = mongo_client.db.news
+    collection.insert_many([news_article(i) for i in range(3)])
+    migrate_news(warehouse, collection)
+    assert migrate_news(warehouse, collection, incremental=False) == 3
+
+def test_a_new_partition_starts_from_the_unpartitioned_watermark(warehouse, mongo_client):
+    market = MIGRATIONS["market"]
+    collection = mongo_client.db.market
+    candle = {"open": 1, "high": 1, "low": 1, "close": 1, "volume": 10}
+    collection.insert_many([dict(candle, symbol="AAPL", timestamp=f"2026-10-1{day} 16:00:00") for day in range(3)])
+    # Loaded by a run from before the migration was split per symbol
+    migrate_collection(warehouse, collection, "market", market["table"], market["columns"])
+    collection.insert_one(dict(candle, symbol="AAPL", timestamp="2026-10-13 16:00:00"))
+
+    assert migrate_collection(warehouse, collection, "market", market["table"], market["columns"], partition_field="symbol", partition="AAPL") == 1
+    assert warehouse.watermark("market:AAPL") == str(collection.find_one({"timestamp": "2026-10-13 16:00:00"})["_id"])
@@ -0,0 +1,156 @@
+from bson import json_util
+from datetime import date, datetime, timezone
+from psycopg2.extras import execute_values
+import logging
+import math
+
+# Rejected documents, kept with the reason so they can be fixed and replayed
+DEAD_LETTERS_DDL = """
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        id BIGSERIAL PRIMARY KEY,
+        migration TEXT NOT NULL,
+        document_id TEXT,
+        document JSONB,
+        error TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+class MappingError(ValueError):
+    """A document field that cannot be converted to its warehouse column"""
+
+def to_text(value):
+    """Strings as-is, other scalars stringified; blanks become NULL"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        raise MappingError(f"expected a scalar, got {type(value).__name__}")
+    value = str(value).strip()
+    return value or None
+
+def to_text_array(value):
+    """Lists of strings for TEXT[] columns; a bare string becomes a one-element array"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise MappingError(f"expected a list, got {type(value).__name__}")
+    return [item for item in (to_text(item) for item in value) if item is not None]
+
+def to_timestamp(value):
+    """
+    datetimes, dates and ISO 8601 strings ("2024-03-01", "2024-03-01 10:00:00",
+    "2024-03-01T10:00:00Z") to naive UTC datetimes, matching TIMESTAMP columns.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise MappingError(f"not an ISO 8601 timestamp: {value!r}")
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif not isinstance(value, datetime):
+        raise MappingError(f"expected a timestamp, got {type(value).__name__}")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+# Range of BIGINT columns
+BIGINT_MAX = 2 ** 63 - 1
+
+def to_number(value):
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise MappingError(f"not a number: {value!r}")
+    if not math.isfinite(number):
+        raise MappingError(f"not a finite number: {value!r}")
+    return number
+
+def to_numeric(precision, scale):
+    """
+    Coercion for NUMERIC(precision, scale) columns. Values Postgres would
+    reject as overflowing are refused here, so they are dead-lettered
+    instead of failing the whole batch.
+    """
+    limit = 10 ** (precision - scale)
+    def coerce(value):
+        number = to_number(value)
+        if number is not None and abs(round(number, scale)) >= limit:
+            raise MappingError(f"{value!r} does not fit NUMERIC({precision}, {scale})")
+        return number
+    return coerce
+
+def to_integer(value):
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise MappingError(f"not an integer: {value!r}")
+    if not math.isfinite(number) or abs(number) > BIGINT_MAX:
+        raise MappingError(f"{value!r} does not fit BIGINT")
+    return int(number)
+
+class Column:
+    """A warehouse column filled from one document field through a coercion"""
+
+    def __init__(self, name, field=None, coerce=to_text, required=False, max_length=None):
+        self.name = name
+        self.field = field or name
+        self.coerce = coerce
+        self.required = required
+        # Characters allowed in a text value, e.g. to stay under the btree limit of an indexed column
+        self.max_length = max_length
+
+    def extract(self, document):
+        value = document
+        # Dotted fields reach into embedded documents, e.g. "source.name"
+        for part in self.field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        value = self.coerce(value)
+        if value is None and self.required:
+            raise MappingError(f"missing required field '{self.field}'")
+        if self.max_length is not None and isinstance(value, str) and len(value) > self.max_length:
+            raise MappingError(f"'{self.field}' is longer than {self.max_length} characters")
+        return value
+
+def transform_documents(documents, columns, dead_letters):
+    """
+    Lazily maps documents onto row tuples in column order. Documents that do
+    not map are handed to dead_letters instead of failing the batch.
+    """
+    for document in documents:
+        try:
+            yield tuple(column.extract(document) for column in columns)
+        except MappingError as e:
+            dead_letters.add(document, str(e))
+
+class DeadLetterSink:
+    """Collects rejected documents for one batch and writes them in that batch's transaction"""
+
+    def __init__(self, migration):
+        self.migration = migration
+        self.pending = []
+        self.total = 0
+
+    def add(self, document, error):
+        self.pending.append((
+            self.migration,
+            str(document.get("_id")),
+            json_util.dumps(document),
+            error
+        ))
+
+    def flush(self, pg_cursor):
+        if not self.pending:
+            return
+        execute_values(pg_cursor, "INSERT INTO dead_letters (migration, document_id, document, error) VALUES %s", self.pending)
+        logging.warning(f"⚠️ {len(self.pending)} {self.migration} documents could not be mapped and were dead-lettered")
+        self.total += len(self.pending)
+        self.pending = []
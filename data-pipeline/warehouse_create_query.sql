@@ -12,20 +12,85 @@ CREATE TABLE IF NOT EXISTS news_articles (
 CREATE TABLE IF NOT EXISTS scientific_papers (
     id SERIAL PRIMARY KEY,
     title TEXT NOT NULL,
-    author TEXT,
+    authors TEXT[],
     publishedAt TIMESTAMP,
     url TEXT UNIQUE,
     abstract TEXT,
-    journal TEXT
+    journal TEXT,
+    doi TEXT
 );
 
+-- Warehouses created before papers kept their author list and DOI
+ALTER TABLE scientific_papers ADD COLUMN IF NOT EXISTS authors TEXT[];
+ALTER TABLE scientific_papers ADD COLUMN IF NOT EXISTS doi TEXT;
+
+-- Range-partitioned by month; partitions are created by warehouse_create_script.py
 CREATE TABLE IF NOT EXISTS market_data (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     symbol TEXT NOT NULL,
     open NUMERIC(10, 2),
     high NUMERIC(10, 2),
     low NUMERIC(10, 2),
     close NUMERIC(10, 2),
     volume BIGINT,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (symbol, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every monthly partition instead of failing the load
+CREATE TABLE IF NOT EXISTS market_data_default PARTITION OF market_data DEFAULT;
+
+-- Candles arrive roughly in time order, so a BRIN index stays tiny and still prunes time range scans
+CREATE INDEX IF NOT EXISTS market_data_timestamp_brin ON market_data USING BRIN (timestamp);
+
+-- OHLCV rollups, kept current by refresh_market_rollups() after each load
+CREATE TABLE IF NOT EXISTS market_ohlcv_15m (
+    symbol TEXT NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    open NUMERIC(10, 2),
+    high NUMERIC(10, 2),
+    low NUMERIC(10, 2),
+    close NUMERIC(10, 2),
+    volume BIGINT,
+    PRIMARY KEY (symbol, bucket)
 );
+
+CREATE TABLE IF NOT EXISTS market_ohlcv_1h (LIKE market_ohlcv_15m INCLUDING ALL);
+
+CREATE TABLE IF NOT EXISTS market_ohlcv_1d (LIKE market_ohlcv_15m INCLUDING ALL);
+
+-- Re-aggregates every rollup bucket of p_symbol from the one containing p_since onwards
+CREATE OR REPLACE FUNCTION refresh_market_rollups(p_symbol TEXT, p_since TIMESTAMP) RETURNS void AS $$
+DECLARE
+    rollup RECORD;
+BEGIN
+    FOR rollup IN
+        SELECT * FROM (VALUES
+            ('market_ohlcv_15m', INTERVAL '15 minutes'),
+            ('market_ohlcv_1h', INTERVAL '1 hour'),
+            ('market_ohlcv_1d', INTERVAL '1 day')
+        ) AS rollups(table_name, width)
+    LOOP
+        EXECUTE format($sql$
+            INSERT INTO %I (symbol, bucket, open, high, low, close, volume)
+            SELECT
+                symbol,
+                date_bin($1, timestamp, TIMESTAMP '2000-01-01') AS bucket,
+                (array_agg(open ORDER BY timestamp))[1],
+                max(high),
+                min(low),
+                (array_agg(close ORDER BY timestamp DESC))[1],
+                sum(volume)
+            FROM market_data
+            WHERE symbol = $2 AND timestamp >= date_bin($1, $3, TIMESTAMP '2000-01-01')
+            GROUP BY symbol, bucket
+            ON CONFLICT (symbol, bucket) DO UPDATE SET
+                open = EXCLUDED.open,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                close = EXCLUDED.close,
+                volume = EXCLUDED.volume
+        $sql$, rollup.table_name) USING rollup.width, p_symbol, p_since;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
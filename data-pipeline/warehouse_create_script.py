@@ -1,5 +1,7 @@
 import psycopg2
 import logging
+import os
+from datetime import date
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,26 +14,114 @@ DB_HOST = "localhost"
 DB_PORT = "5432"
 
 # Read SQL file
-SQL_FILE = "postgres_ddl.sql"
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warehouse_create_query.sql")
 with open(SQL_FILE, "r") as file:
     sql_commands = file.read()
 
+# Monthly market_data partitions kept ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+def add_months(month, count):
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def ensure_market_partitions(cursor, first_month, last_month):
+    """Creates a market_data partition for every month from first_month through last_month"""
+    month = date(first_month.year, first_month.month, 1)
+    while month <= last_month:
+        upper = add_months(month, 1)
+        partition = f"market_data_{month:%Y_%m}"
+        cursor.execute("SELECT to_regclass(%s)", (partition,))
+        if cursor.fetchone()[0] is None:
+            create_market_partition(cursor, partition, month, upper)
+        month = upper
+
+def create_market_partition(cursor, partition, lower, upper):
+    """
+    Creates one monthly partition. Postgres refuses to add a partition while
+    the default partition holds rows in its range, so those rows are moved
+    into the new table first and the table is then attached.
+    """
+    cursor.execute(f"CREATE TABLE {partition} (LIKE market_data INCLUDING DEFAULTS)")
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM market_data_default
+            WHERE timestamp >= %s AND timestamp < %s
+            RETURNING *
+        )
+        INSERT INTO {partition} SELECT * FROM moved;
+    """, (lower, upper))
+    if cursor.rowcount:
+        logging.info(f"🔁 Moved {cursor.rowcount} market rows from market_data_default into {partition}")
+    cursor.execute(f"""
+        ALTER TABLE market_data ATTACH PARTITION {partition}
+        FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}');
+    """)
+
+def partition_default_market_data(cursor):
+    """Creates partitions for every month the default partition has caught rows for"""
+    cursor.execute("SELECT min(timestamp), max(timestamp) FROM market_data_default")
+    first, last = cursor.fetchone()
+    if first is not None:
+        ensure_market_partitions(cursor, first.date(), last.date())
+
+def detach_legacy_market_data(cursor):
+    """
+    Renames a pre-partitioning market_data heap table out of the way so the
+    partitioned table can be created. Returns True if one was found.
+    """
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('market_data')")
+    row = cursor.fetchone()
+    if row is None or row[0] != 'r':
+        return False
+    cursor.execute("ALTER TABLE market_data RENAME TO market_data_legacy")
+    logging.info("🔁 Found unpartitioned market_data, moving its rows into the partitioned table")
+    return True
+
+def import_legacy_market_data(cursor):
+    """Copies the legacy rows into partitions covering their range, dropping duplicate candles"""
+    cursor.execute("SELECT min(timestamp), max(timestamp) FROM market_data_legacy")
+    first, last = cursor.fetchone()
+    if first is not None:
+        ensure_market_partitions(cursor, first.date(), last.date())
+    cursor.execute("""
+        INSERT INTO market_data (symbol, open, high, low, close, volume, timestamp)
+        SELECT symbol, open, high, low, close, volume, timestamp
+        FROM market_data_legacy
+        WHERE timestamp IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    """)
+    logging.info(f"✅ Imported {cursor.rowcount} legacy market rows")
+    cursor.execute("DROP TABLE market_data_legacy")
+
 # Connect to PostgreSQL and execute the SQL file
 def create_warehouse():
+    conn = None
     try:
         conn = psycopg2.connect(
             dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
         )
         cursor = conn.cursor()
+        has_legacy = detach_legacy_market_data(cursor)
         cursor.execute(sql_commands)
+
+        partition_default_market_data(cursor)
+        this_month = date.today().replace(day=1)
+        ensure_market_partitions(cursor, this_month, add_months(this_month, PARTITION_MONTHS_AHEAD))
+        if has_legacy:
+            import_legacy_market_data(cursor)
+
         conn.commit()
+        cursor.close()
         logging.info("✅ PostgreSQL Warehouse Created Successfully!")
     except Exception as e:
         logging.error(f"❌ Error creating warehouse: {e}")
+        raise
     finally:
-        cursor.close()
-        conn.close()
-        logging.info("✅ Database connection closed.")
+        if conn is not None:
+            conn.close()
+            logging.info("✅ Database connection closed.")
 
 # Run the function
 if __name__ == "__main__":
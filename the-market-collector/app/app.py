@@ -1,45 +1,31 @@
 from flask import Flask
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta
-from models import fetch_stocks, store_stocks
-import os
+from config import client
+import routes
+from collector_common.logs import configure_logging
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="🕒 %(asctime)s - 📍 %(name)s - [%(levelname)s]  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('market_collector.log', encoding='utf-8')
-    ]
-)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-from routes import *
-
-fetched_stocks = []
-
-def fetch_stocks_job():
-    global fetched_stocks
-    logger.info("🔄 Starting scheduled stock data fetch...")
-    fetched_stocks = fetch_stocks()
-
-def store_stocks_job():
-    global fetched_stocks
-    logger.info("💽 Starting scheduled stock data storage...")
-    store_stocks(fetched_stocks)
-
-scheduler = BackgroundScheduler()
-scheduler.add_job(fetch_stocks_job, "interval", minutes=5, next_run_time=datetime.now())
-scheduler.add_job(store_stocks_job, "interval", minutes=6, next_run_time=datetime.now()+timedelta(minutes=1))
+LOG_FILE = "market_collector.log"
+
+def create_app(log_file=LOG_FILE):
+    """
+    Builds the Flask app around the process-wide MongoClient. Nothing here
+    touches MongoDB, so gunicorn can call it in each worker after forking:
+    gunicorn -w 4 "app:create_app()"
+
+    The web app only serves reads; stocks are fetched and stored by
+    worker.py, which runs as its own process. Pass log_file=None to log to
+    stderr only, as the tests do.
+    """
+    configure_logging(log_file)
+    app = Flask(__name__)
+    app.extensions["mongo"] = client
+    app.register_blueprint(routes.bp)
+    app.register_blueprint(routes.status_bp)
+    return app
 
 if __name__ == "__main__":
+    app = create_app()
     logger.info("🚀 The Market Collector starting on port 5000")
-
-     # Prevent scheduler from starting twice
-    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":  
-        scheduler.start()
-
     app.run(debug=True, port=5000, host="0.0.0.0")
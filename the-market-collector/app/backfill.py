@@ -0,0 +1,22 @@
+from models import backfill_stocks, migrate_string_timestamps, stocks_collection, BACKFILL_CHUNK_SIZE
+from schema import INDEXES
+from collector_common.schema import apply_indexes
+import argparse
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="🕒 %(asctime)s - 📍 %(name)s - [%(levelname)s]  %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill historical candles from a CSV or JSON Lines dump")
+    parser.add_argument("path", help="Path to a .csv or .jsonl dump")
+    parser.add_argument("--symbol", help="Symbol for dumps without a symbol column")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE, help="Candles per bulk_write")
+    args = parser.parse_args()
+
+    migrate_string_timestamps(stocks_collection)
+    apply_indexes(stocks_collection, INDEXES)
+    backfill_stocks(args.path, symbol=args.symbol, chunk_size=args.chunk_size)
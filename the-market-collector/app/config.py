@@ -0,0 +1,16 @@
+from collector_common.mongo import mongo_client
+from dotenv import load_dotenv
+import os
+
+load_dotenv('keys.env')
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("MONGO_DB_NAME", "the-market-collector")
+
+# Only the worker holding this lease runs the ingest jobs (see worker.py)
+INGEST_LEASE_NAME = "market-ingest"
+WORKER_LEASE_TTL_SECONDS = int(os.getenv("WORKER_LEASE_TTL_SECONDS", 60))
+
+# The one client (and database handle) this process shares
+client = mongo_client(MONGO_URI, "the-market-collector")
+db = client[DB_NAME]
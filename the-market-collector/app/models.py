@@ -1,20 +1,76 @@
-from pymongo import MongoClient
+from config import db
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from collector_common.ingest import bulk_upsert, DUPLICATE_KEY_ERROR
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
 import requests
 import os
 import logging
-import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collector_common.http_client import HttpClient
+from rotation import SymbolRotation, TokenBucket
+from collector_common.cache import ResponseCache, SharedGeneration, GENERATION_COLLECTION
+from collector_common.conditional import FeedVersion
+import csv
+import json
 
 logger = logging.getLogger(__name__)
 
 load_dotenv('keys.env')
 ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
+ALPHA_VANTAGE_CALLS_PER_MINUTE = int(os.getenv('ALPHA_VANTAGE_CALLS_PER_MINUTE', 5))
 
-client = MongoClient("mongodb://localhost:27017/")
-db = client["the-market-collector"]
 stocks_collection = db["market-collection"]
 
+STOCK_KEY_FIELDS = ["symbol", "timestamp"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BACKFILL_CHUNK_SIZE = 1000
+
+# Bumped by the worker after each ingest; keys the response cache and ETags of every web process
+cache_generation = SharedGeneration(db[GENERATION_COLLECTION], "the-market-collector")
+# Newest candle marker behind the feed ETags
+feed_version = FeedVersion(stocks_collection, "timestamp", cache_generation)
+response_cache = ResponseCache.from_env("the-market-collector", cache_generation)
+
+SYMBOLS = ["MSFT",
+           "AAPL",
+           "GOOGL",
+           "AMZN",
+           "TSLA",
+           "FB",
+           "NVDA",
+           "INTC",
+           "AMD",
+           "PYPL",
+           "IBM",
+           "NFLX",
+           "ADBE",
+           "CSCO",
+           "QCOM",
+           "ORCL",
+           "CRM",
+           "TWTR",
+           "UBER",
+           "LYFT"]
+FETCH_WORKERS = 4
+REQUEST_TIMEOUT = 10
+# A symbol is due again this long after its last fetch. The worker runs every
+# minute and spends only the calls refilled since the previous run, stalest first
+SYMBOL_FRESHNESS_SECONDS = 4 * 60
+
+symbol_rotation = SymbolRotation(SYMBOLS, SYMBOL_FRESHNESS_SECONDS)
+rate_limiter = TokenBucket(rate=ALPHA_VANTAGE_CALLS_PER_MINUTE / 60, capacity=ALPHA_VANTAGE_CALLS_PER_MINUTE)
+
+# Each retry spends Alpha Vantage budget the token bucket did not account for, so retry only once
+http_client = HttpClient(
+    user_agent="MarketCollector/1.0",
+    pool_size=FETCH_WORKERS,
+    per_host_limit=FETCH_WORKERS,
+    read_timeout=REQUEST_TIMEOUT,
+    max_attempts=2
+)
+
 def get_latest_stocks(limit=50):
     """Retrieve latest stock records from MongoDB"""
     try:
@@ -23,35 +79,18 @@ def get_latest_stocks(limit=50):
         logger.error(f"📦 Database query failed: {str(e)}")
         return []
 
-def fetch_stocks():
-    symbols = ["MSFT",
-               "AAPL",
-               "GOOGL",
-               "AMZN",
-               "TSLA",
-               "FB",
-               "NVDA",
-               "INTC",
-               "AMD",
-               "PYPL",
-               "IBM",
-               "NFLX",
-               "ADBE",
-               "CSCO",
-               "QCOM",
-               "ORCL",
-               "CRM",
-               "TWTR",
-               "UBER",
-               "LYFT"]
-    symbol = random.choice(symbols)
+def fetch_symbol(symbol, client):
+    """Fetch the intraday 5-minute candles for a single symbol"""
     all_stocks_data = []
-    
+
     logger.info(f"🌐 Attempting to fetch stock data for {symbol}...")
-    api_url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval=5min&apikey={ALPHA_VANTAGE_API_KEY}"
-    
     try:
-        response = requests.get(api_url)
+        response = client.get("https://www.alphavantage.co/query", params={
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": symbol,
+            "interval": "5min",
+            "apikey": ALPHA_VANTAGE_API_KEY
+        })
         response.raise_for_status()
         
         data = response.json().get("Time Series (5min)")
@@ -62,44 +101,183 @@ def fetch_stocks():
         logger.debug(f"📦 Raw API response: {response.text[:100]}...")
             
         for timestamp, stock_data in data.items():
-            stock_record = {
-                "symbol": symbol,
-                "timestamp": timestamp,
-                "open": float(stock_data["1. open"]),
-                "high": float(stock_data["2. high"]),
-                "low": float(stock_data["3. low"]),
-                "close": float(stock_data["4. close"]),
-                "volume": int(stock_data["5. volume"])
-            }
-            all_stocks_data.append(stock_record)
+            all_stocks_data.append(format_stock(symbol, timestamp, {
+                "open": stock_data["1. open"],
+                "high": stock_data["2. high"],
+                "low": stock_data["3. low"],
+                "close": stock_data["4. close"],
+                "volume": stock_data["5. volume"]
+            }))
             
         logger.info(f"✅ Successfully fetched {len(all_stocks_data)} records for {symbol}")
         return all_stocks_data
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"🚨 API request failed: {str(e)}")
+        logger.error(f"🚨 API request failed for {symbol}: {str(e)}")
         return []
-    except KeyError as e:
-        logger.error(f"🔍 Unexpected API response format: {str(e)}")
+    except (KeyError, ValueError) as e:
+        logger.error(f"🔍 Unexpected API response format for {symbol}: {str(e)}")
         return []
 
+def fetch_stocks():
+    """
+    Fetch the symbols past their freshness deadline, stalest first, as far
+    as the Alpha Vantage calls currently in the token bucket go. Never waits
+    for tokens: the rest are deferred to a later run, so a run stays short
+    and never holds the scheduler thread past the worker's lease.
+    """
+    due = symbol_rotation.due_symbols()
+    if not due:
+        logger.info("😴 All symbols are fresh, nothing to fetch")
+        return []
+
+    all_stocks_data = []
+    futures = {}
+    logger.info(f"🔁 {len(due)} symbols due, stalest first: {', '.join(due)}")
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        for symbol in due:
+            if not rate_limiter.try_acquire():
+                logger.info(f"⏳ API call budget spent, deferring {len(due) - len(futures)} symbols to the next run")
+                break
+            futures[executor.submit(fetch_symbol, symbol, http_client)] = symbol
+
+        for future in as_completed(futures):
+            symbol = futures[future]
+            stocks = future.result()
+            if stocks:
+                symbol_rotation.mark_fetched(symbol)
+                all_stocks_data.extend(stocks)
+
+    return all_stocks_data
+
+def parse_timestamp(timestamp):
+    """Parse an Alpha Vantage candle timestamp into a datetime"""
+    if isinstance(timestamp, datetime):
+        return timestamp
+    return datetime.fromisoformat(timestamp)
+
+def migrate_string_timestamps(collection, batch_size=1000):
+    """
+    Converts candles stored with string timestamps by older versions into
+    datetimes, so the unique (symbol, timestamp) key and the keyset cursor
+    see a single type. A string row whose datetime twin already exists is
+    deleted instead. Rows whose timestamp cannot be parsed are left alone.
+    Each batch costs one twin lookup and one unordered bulk_write. Runs
+    before apply_indexes; returns (converted, removed).
+    """
+    converted = removed = 0
+    last_id = None
+    while True:
+        query = {"timestamp": {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        rows = list(collection.find(query, {"symbol": 1, "timestamp": 1}).sort("_id", 1).limit(batch_size))
+        if not rows:
+            break
+        last_id = rows[-1]["_id"]
+
+        parsed = []
+        for row in rows:
+            try:
+                parsed.append((row["_id"], row.get("symbol"), parse_timestamp(row["timestamp"])))
+            except ValueError:
+                logger.warning(f"⚠️ Leaving candle {row['_id']} with unparsable timestamp '{row['timestamp']}'")
+        if not parsed:
+            continue
+
+        # Keys already stored with a datetime, then claimed by the first row of the batch that has them
+        taken = {
+            (twin.get("symbol"), twin["timestamp"])
+            for twin in collection.find(
+                {"symbol": {"$in": list({symbol for _, symbol, _ in parsed})}, "timestamp": {"$in": list({timestamp for _, _, timestamp in parsed})}},
+                {"symbol": 1, "timestamp": 1}
+            )
+        }
+        operations = []
+        row_ids = [row_id for row_id, _, _ in parsed]
+        for row_id, symbol, timestamp in parsed:
+            if (symbol, timestamp) in taken:
+                operations.append(DeleteOne({"_id": row_id}))
+            else:
+                taken.add((symbol, timestamp))
+                operations.append(UpdateOne({"_id": row_id}, {"$set": {"timestamp": timestamp}}))
+
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+            removed += result.deleted_count
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                raise
+            converted += e.details.get("nModified", 0)
+            removed += e.details.get("nRemoved", 0)
+            # Twins stored after we looked; the string rows are deleted instead
+            raced = [DeleteOne({"_id": row_ids[err["index"]]}) for err in errors]
+            removed += collection.bulk_write(raced, ordered=False).deleted_count
+
+    if converted or removed:
+        logger.info(f"🕰️ Migrated string timestamps: {converted} converted, {removed} duplicates removed")
+    return converted, removed
+
+def format_stock(symbol, timestamp, candle):
+    """Build a stored candle document from raw OHLCV values"""
+    return {
+        "symbol": symbol,
+        "timestamp": parse_timestamp(timestamp),
+        "open": float(candle["open"]),
+        "high": float(candle["high"]),
+        "low": float(candle["low"]),
+        "close": float(candle["close"]),
+        "volume": int(candle["volume"])
+    }
+
 def store_stocks(stocks_data):
+    """Upsert a payload of candles in one bulk_write keyed on (symbol, timestamp)"""
     if not stocks_data:
         logger.warning("⚠️ No stock data received for storage")
-        return
-    
+        return 0
+
     try:
-        count = 0
-        duplicates = 0
-        for stock in stocks_data:
-            if not stocks_collection.find_one({"symbol": stock["symbol"], "timestamp": stock["timestamp"]}):
-                stocks_collection.insert_one(stock)
-                count += 1
-            else:
-                duplicates += 1
-                
+        count, duplicates = bulk_upsert(stocks_collection, stocks_data, STOCK_KEY_FIELDS)
         logger.info(f"💾 Storage complete: {count} new records, {duplicates} duplicates skipped")
         return count
     except Exception as e:
         logger.error(f"🔥 Database operation failed: {str(e)}")
-        return 0
+        raise e
+
+def iter_dump_records(path, symbol=None):
+    """
+    Stream candles from a historical dump one row at a time.
+    Supports Alpha Vantage CSV exports and JSON Lines files; a symbol column
+    or key in the dump takes precedence over the symbol argument.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as dump:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(dump)
+        else:
+            rows = (json.loads(line) for line in dump if line.strip())
+
+        for row in rows:
+            yield format_stock(row.get("symbol", symbol), row["timestamp"], row)
+
+def backfill_stocks(path, symbol=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Load a historical dump in fixed-size chunks so memory stays bounded by
+    chunk_size regardless of the file size. Returns the number of new records.
+    """
+    logger.info(f"📼 Backfilling {path} in chunks of {chunk_size}...")
+    total = 0
+    chunk = []
+    for record in iter_dump_records(path, symbol):
+        if not record["symbol"]:
+            raise ValueError("⚠️ Dump rows have no symbol and none was given")
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            total += store_stocks(chunk)
+            chunk = []
+    if chunk:
+        total += store_stocks(chunk)
+
+    logger.info(f"✅ Backfill complete: {total} new records from {path}")
+    return total
@@ -0,0 +1,70 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket holding up to `capacity` calls that refills at
+    `rate` tokens per second.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take one token if available, without blocking"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def available(self):
+        with self.lock:
+            self._refill()
+            return int(self.tokens)
+
+class SymbolRotation:
+    """
+    Tracks when each symbol was last fetched and hands out the symbols whose
+    freshness deadline has passed, stalest first.
+    """
+
+    def __init__(self, symbols, freshness_seconds):
+        self.freshness_seconds = freshness_seconds
+        self.started = time.time()
+        self.last_fetched = {symbol: None for symbol in symbols}
+        self.lock = threading.Lock()
+
+    def _last_seen(self, symbol):
+        last = self.last_fetched[symbol]
+        return self.started if last is None else last
+
+    def due_symbols(self):
+        """Symbols past their freshness deadline, never-fetched and stalest first"""
+        now = time.time()
+        with self.lock:
+            due = [
+                symbol for symbol, last in self.last_fetched.items()
+                if last is None or now - last >= self.freshness_seconds
+            ]
+            return sorted(due, key=lambda symbol: (self.last_fetched[symbol] is not None, self._last_seen(symbol)))
+
+    def mark_fetched(self, symbol):
+        with self.lock:
+            self.last_fetched[symbol] = time.time()
+
+    def staleness(self):
+        """Seconds since each symbol was last fetched (or since tracking began)"""
+        now = time.time()
+        with self.lock:
+            return {symbol: round(now - self._last_seen(symbol), 1) for symbol in self.last_fetched}
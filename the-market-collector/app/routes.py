@@ -1,32 +1,49 @@
-from flask import render_template, request, jsonify
-from app import app
-from models import stocks_collection
+from flask import Blueprint, render_template, request, jsonify
+from models import stocks_collection, symbol_rotation, feed_version, response_cache, TIMESTAMP_FORMAT
+from collector_common.pagination import InvalidCursor, keyset_filter, keyset_sort, next_cursor
+from schema import INDEXES
+from collector_common.conditional import conditional_get
+from collector_common.status import status_blueprint, worker_status
+from collector_common.lease import LEASE_COLLECTION
+from config import INGEST_LEASE_NAME, db
 import logging
+import re
 
 logger = logging.getLogger(__name__)
+
+bp = Blueprint("market", __name__)
+# /health, /api/metrics/worker, /api/metrics/cache and /api/metrics/http
+status_bp = status_blueprint(stocks_collection, INDEXES, db[LEASE_COLLECTION], INGEST_LEASE_NAME, response_cache)
 PAGE_SIZE = 15  # Number of items per load
 
-@app.route("/")
+@bp.route("/")
 def home():
     """Main endpoint with paginated stocks"""
     return render_template("index.html")
 
-@app.route('/api/load-more-stocks')
+@bp.route('/api/load-more-stocks')
+@conditional_get(feed_version)
+@response_cache.cached
 def load_more_stocks():
     """API endpoint for infinite scroll loading"""
     try:
         page = int(request.args.get("page", 1))
         query = request.args.get("q", "").strip().upper()
+        cursor = request.args.get("cursor")
+        
+        # Without a cursor, fall back to offset pagination
+        skip = 0 if cursor else (page - 1) * PAGE_SIZE
         
-        skip = (page - 1) * PAGE_SIZE
+        # Anchored, case-sensitive prefix match so the (symbol, timestamp) index can serve it
+        match = {"symbol": {"$regex": f"^{re.escape(query)}"}} if query else {}
         
         pipeline = [
-            {"$match": {"symbol": {"$regex": f".*{query}.*", "$options": "i"}}},
-            {"$sort": {"timestamp": -1}},
+            {"$match": {**match, **keyset_filter("timestamp", cursor)}},
+            {"$sort": dict(keyset_sort("timestamp"))},
             {"$skip": skip},
             {"$limit": PAGE_SIZE},
             {"$project": {
-                "_id": 0,
+                "_id": 1,
                 "symbol": 1,
                 "timestamp": 1,
                 "open": 1,
@@ -38,12 +55,29 @@ def load_more_stocks():
         ]
         
         stocks = list(stocks_collection.aggregate(pipeline))
+        cursor_after = next_cursor(stocks, "timestamp", PAGE_SIZE)
+        for stock in stocks:
+            del stock["_id"]
+            if not isinstance(stock["timestamp"], str):
+                stock["timestamp"] = stock["timestamp"].strftime(TIMESTAMP_FORMAT)
         
         # Check if there are more stocks to load
         next_page = page + 1 if len(stocks) == PAGE_SIZE else None
         
-        return jsonify({"stocks": stocks, "next_page": next_page})
+        return jsonify({"stocks": stocks, "next_page": next_page, "next_cursor": cursor_after})
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"🔥 Load more error: {str(e)}")
         return jsonify({"error": "Failed to load more stocks"}), 500
+
+@bp.route('/api/metrics/staleness')
+def symbol_staleness():
+    """Seconds since each tracked symbol was last fetched, as last reported by the worker"""
+    status = worker_status(db[LEASE_COLLECTION], INGEST_LEASE_NAME)
+    return jsonify({
+        "staleness_seconds": status.get("staleness_seconds", {}),
+        "max_staleness_seconds": status.get("max_staleness_seconds"),
+        "freshness_deadline_seconds": symbol_rotation.freshness_seconds
+    })
@@ -0,0 +1,11 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Every index the market collection relies on, applied once at startup
+INDEXES = [
+    # Unique key behind the bulk upsert dedup in store_stocks; also serves anchored symbol prefix search
+    IndexModel([("symbol", ASCENDING), ("timestamp", ASCENDING)], unique=True, name="dedup_symbol_timestamp"),
+    # Keyset pagination for /api/load-more-stocks
+    IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="keyset_timestamp"),
+    # Per-symbol incremental sync scans in the warehouse loader
+    IndexModel([("symbol", ASCENDING), ("_id", ASCENDING)], name="sync_symbol_id"),
+]
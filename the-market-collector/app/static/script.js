@@ -4,7 +4,7 @@ document.addEventListener("DOMContentLoaded", function () {
     const stocksContainer = document.getElementById('stocks-container');
     const backToTopBtn = document.getElementById('back-to-top');
     let isLoading = false;
-    let currentPage = 1;
+    let nextCursor = null;
     let hasMore = true;
     const seenSymbols = new Set();
 
@@ -33,20 +33,20 @@ document.addEventListener("DOMContentLoaded", function () {
         };
     };
 
-    const fetchStocks = async (page, query = '') => {
+    const fetchStocks = async (cursor, query = '') => {
         try {
             isLoading = true;
             showLoadingIndicator();
-            const response = await fetch(`/api/load-more-stocks?page=${page}&q=${encodeURIComponent(query)}`);
+            const response = await fetch(`/api/load-more-stocks?q=${encodeURIComponent(query)}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`);
             if (!response.ok) throw new Error(response.statusText);
-            const { stocks, next_page } = await response.json();
+            const { stocks, next_cursor } = await response.json();
             if (stocks.length === 0) {
                 hasMore = false;
                 showMessage('No more stocks to load');
                 return [];
             }
-            currentPage = next_page || currentPage + 1;
-            hasMore = !!next_page;
+            nextCursor = next_cursor;
+            hasMore = !!next_cursor;
             return stocks;
         } catch (error) {
             hasMore = false;
@@ -163,16 +163,16 @@ document.addEventListener("DOMContentLoaded", function () {
 
     const loadMoreStocks = async () => {
         if (isLoading || !hasMore) return;
-        const stocks = await fetchStocks(currentPage, searchInput.value.trim());
+        const stocks = await fetchStocks(nextCursor, searchInput.value.trim());
         appendStocks(stocks);
     };
 
     searchInput.addEventListener('input', debounce(async (e) => {
-        currentPage = 1;
+        nextCursor = null;
         hasMore = true;
         stocksContainer.innerHTML = '';
         seenSymbols.clear();
-        const stocks = await fetchStocks(currentPage, e.target.value);
+        const stocks = await fetchStocks(nextCursor, e.target.value);
         appendStocks(stocks);
     }, 300));
 
@@ -0,0 +1,75 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from models import fetch_stocks, store_stocks, migrate_string_timestamps, feed_version, response_cache, stocks_collection, symbol_rotation, http_client
+from schema import INDEXES
+from collector_common.schema import apply_indexes
+from collector_common.pipeline import BatchPipeline
+from collector_common.logs import configure_logging
+from collector_common.lease import MongoLease, LEASE_COLLECTION, run_exclusively
+from config import INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS, db
+from datetime import datetime
+import os
+import logging
+import signal
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+# The token bucket holds a minute of calls, so each run spends what refilled since the last
+FETCH_INTERVAL_MINUTES = 1
+# Seconds a stopping worker waits for fetched batches to be stored
+DRAIN_TIMEOUT_SECONDS = 60
+
+def store_stocks_batch(stocks):
+    if store_stocks(stocks):
+        response_cache.bump()
+        feed_version.refresh()
+
+# Fetched batches are handed to store_stocks through a bounded pipeline,
+# spooled to SQLite when SPOOL_PATH is set so a MongoDB outage loses nothing
+pipeline = BatchPipeline(store_stocks_batch, spool_path=os.getenv("SPOOL_PATH"))
+
+def fetch_stocks_job():
+    logger.info("🔄 Starting scheduled stock data fetch...")
+    pipeline.put(fetch_stocks(), timeout=FETCH_INTERVAL_MINUTES * 60)
+
+scheduler = BackgroundScheduler()
+scheduler.add_job(fetch_stocks_job, "interval", minutes=FETCH_INTERVAL_MINUTES, next_run_time=datetime.now())
+
+def start():
+    # String timestamps would sit beside their datetime twins under the unique key
+    migrate_string_timestamps(stocks_collection)
+    apply_indexes(stocks_collection, INDEXES)
+    pipeline.start()
+    scheduler.start()
+
+def stop():
+    scheduler.shutdown()
+    if not pipeline.drain(DRAIN_TIMEOUT_SECONDS):
+        logger.warning(f"⚠️  {pipeline.pending()} batches were still pending at shutdown")
+    pipeline.stop()
+
+def status():
+    """Reported with every lease renewal and served by /api/metrics/worker"""
+    staleness = symbol_rotation.staleness()
+    return {
+        "pending_batches": pipeline.pending(),
+        "dead_letter_batches": pipeline.dead_lettered(),
+        "staleness_seconds": staleness,
+        "max_staleness_seconds": max(staleness.values(), default=0),
+        "http": http_client.stats()
+    }
+
+if __name__ == "__main__":
+    configure_logging("market_worker.log")
+    logger.info("🚜 The Market Collector worker is starting")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    lease = MongoLease(db[LEASE_COLLECTION], INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS)
+    try:
+        lost = run_exclusively(lease, start, stop, status, stop_event)
+    except KeyboardInterrupt:
+        lost = False
+    # A non-zero exit lets the supervisor restart the worker as a standby
+    sys.exit(1 if lost else 0)
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from collector_common.pagination import encode_cursor, keyset_filter, keyset_sort
+from config import db
+from models import migrate_string_timestamps
+from collector_common.schema import apply_indexes
+from schema import INDEXES
+
+def candle(symbol, timestamp, close):
+    return {"symbol": symbol, "timestamp": timestamp, "open": close, "high": close, "low": close, "close": close, "volume": 100}
+
+def test_string_timestamps_become_datetimes_before_the_unique_index():
+    collection = db["market-migration-test"]
+    collection.drop()
+    collection.insert_many([
+        candle("AAPL", datetime(2026, 10, 16, 15, 55), 230.0),
+        # Legacy twin of the datetime row above
+        candle("AAPL", "2026-10-16 15:55:00", 229.0),
+        candle("AAPL", "2026-10-16 16:00:00", 231.0),
+        # Two legacy spellings of one candle
+        candle("MSFT", "2026-10-16 16:00:00", 410.0),
+        candle("MSFT", "2026-10-16T16:00:00", 410.0),
+        candle("IBM", "not a timestamp", 1.0),
+    ])
+
+    assert migrate_string_timestamps(collection, batch_size=2) == (2, 2)
+    assert apply_indexes(collection, INDEXES) == []
+
+    rows = list(collection.find({"symbol": {"$in": ["AAPL", "MSFT"]}}).sort(keyset_sort("timestamp")))
+    assert [(row["symbol"], row["timestamp"]) for row in rows] == [
+        ("MSFT", datetime(2026, 10, 16, 16, 0)),
+        ("AAPL", datetime(2026, 10, 16, 16, 0)),
+        ("AAPL", datetime(2026, 10, 16, 15, 55)),
+    ]
+    # The datetime row kept its own values
+    assert collection.find_one({"symbol": "AAPL", "timestamp": datetime(2026, 10, 16, 15, 55)})["close"] == 230.0
+    assert collection.find_one({"symbol": "IBM"})["timestamp"] == "not a timestamp"
+
+    # The keyset cursor walks every migrated candle
+    after_first = list(collection.find({"symbol": {"$in": ["AAPL", "MSFT"]}, **keyset_filter("timestamp", encode_cursor(rows[0], "timestamp"))}).sort(keyset_sort("timestamp")))
+    assert after_first == rows[1:]
+
+def test_the_migration_writes_each_batch_in_one_bulk_write(monkeypatch):
+    collection = db["market-migration-test"]
+    collection.drop()
+    collection.insert_many([candle("AAPL", f"2026-10-16 15:{minute:02d}:00", 230.0) for minute in range(10)])
+    collection.insert_one(candle("AAPL", datetime(2026, 10, 16, 15, 0), 230.0))
+
+    writes = []
+    bulk_write = collection.bulk_write
+    monkeypatch.setattr(collection, "bulk_write", lambda operations, **kwargs: writes.append(len(operations)) or bulk_write(operations, **kwargs))
+    # Twins are looked up once per batch, not once per row
+    monkeypatch.setattr(collection, "find_one", None)
+
+    assert migrate_string_timestamps(collection, batch_size=4) == (9, 1)
+    assert writes == [4, 4, 2]
@@ -0,0 +1,74 @@
+import pytest
+
+import models
+import rotation
+from rotation import SymbolRotation, TokenBucket
+
+class FakeClock:
+    """Stands in for the time module, so tests move the clock instead of sleeping"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rotation, "time", clock)
+    return clock
+
+def test_the_bucket_refills_at_its_rate_up_to_its_capacity(clock):
+    bucket = TokenBucket(rate=0.5, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now += 1
+    assert not bucket.try_acquire()
+    clock.now += 1
+    assert bucket.try_acquire()
+
+    # A long idle spell only refills up to the capacity
+    clock.now += 3600
+    assert bucket.available() == 2
+
+def test_due_symbols_come_stalest_first(clock):
+    symbols = SymbolRotation(["AAPL", "MSFT", "IBM"], freshness_seconds=60)
+    assert symbols.due_symbols() == ["AAPL", "MSFT", "IBM"]
+
+    symbols.mark_fetched("MSFT")
+    clock.now += 10
+    symbols.mark_fetched("AAPL")
+    # Never-fetched symbols go first; fetched ones wait out their freshness deadline
+    assert symbols.due_symbols() == ["IBM"]
+
+    clock.now += 55
+    assert symbols.due_symbols() == ["IBM", "MSFT"]
+    clock.now += 5
+    assert symbols.due_symbols() == ["IBM", "MSFT", "AAPL"]
+    assert symbols.staleness() == {"AAPL": 60.0, "MSFT": 70.0, "IBM": 70.0}
+
+def test_symbols_beyond_the_call_budget_wait_for_a_later_run(clock, monkeypatch):
+    symbols = SymbolRotation(["AAPL", "MSFT", "IBM"], freshness_seconds=60)
+    monkeypatch.setattr(models, "symbol_rotation", symbols)
+    monkeypatch.setattr(models, "rate_limiter", TokenBucket(rate=1 / 60, capacity=2))
+    fetched = []
+
+    def fetch_symbol(symbol, http_client):
+        fetched.append(symbol)
+        # IBM answers with nothing, so it stays due
+        return [] if symbol == "IBM" else [{"symbol": symbol}]
+    monkeypatch.setattr(models, "fetch_symbol", fetch_symbol)
+
+    assert sorted(stock["symbol"] for stock in models.fetch_stocks()) == ["AAPL", "MSFT"]
+    assert sorted(fetched) == ["AAPL", "MSFT"]
+
+    clock.now += 60
+    # One token refilled: the never-fetched IBM goes before the stale AAPL and MSFT
+    assert models.fetch_stocks() == []
+    assert fetched[2:] == ["IBM"]
+    assert symbols.due_symbols()[0] == "IBM"
@@ -1,60 +1,31 @@
 from flask import Flask
-from apscheduler.schedulers.background import BackgroundScheduler
-from models import fetch_articles, store_articles
-from datetime import datetime, timedelta
+from config import client
+import routes
+from collector_common.logs import configure_logging
 import logging
-import os
 
-app = Flask(__name__)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="🕒 %(asctime)s - 📍 %(name)s - [%(levelname)s]  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('news_collector.log', encoding='utf-8')
-    ]
-)
 logger = logging.getLogger(__name__)
 
-fetched_articles = []
-
-def fetch_articles_job():
-    global fetched_articles
-    logger.info("🕸️  Starting fetch_articles_job...")
-    try:
-        fetched_articles = fetch_articles()
-        logger.info(f"✅ SUCCESSFULL: fetch_articles_job Completed Successfully")
-    except Exception as e:
-        logger.error(f"🔥 FAILURE: fetch_articles_job Failed: {str(e)}")
-
-def store_articles_job():
-    global fetched_articles
-    logger.info("💾 Starting store_articles_job...")
-    try:
-        store_articles(fetched_articles)
-        logger.info(f"✅ SUCCESSFULL: store_articles_job Completed Successfully")
-        fetched_articles = []
-        logger.info("🔄 Article Cache Reset")
-    except Exception as e:
-        logger.error(f"❌ FAILURE: store_articles_job Failed due to: {str(e)}")
-        return
-
-# Scheduler
-scheduler = BackgroundScheduler()
-scheduler.add_job(fetch_articles_job, "interval", minutes=3, next_run_time=datetime.now())
-scheduler.add_job(store_articles_job, "interval", minutes=4, next_run_time=datetime.now() + timedelta(minutes=1))
-
-# Import routes
-from routes import *
+LOG_FILE = "news_collector.log"
+
+def create_app(log_file=LOG_FILE):
+    """
+    Builds the Flask app around the process-wide MongoClient. Nothing here
+    touches MongoDB, so gunicorn can call it in each worker after forking:
+    gunicorn -w 4 "app:create_app()"
+
+    The web app only serves reads; articles are fetched and stored by
+    worker.py, which runs as its own process. Pass log_file=None to log to
+    stderr only, as the tests do.
+    """
+    configure_logging(log_file)
+    app = Flask(__name__)
+    app.extensions["mongo"] = client
+    app.register_blueprint(routes.bp)
+    app.register_blueprint(routes.status_bp)
+    return app
 
 if __name__ == "__main__":
+    app = create_app()
     logger.info("🚀 The News Collector is starting on port 5000")
-
-     # Prevent scheduler from starting twice
-    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":  
-        scheduler.start()
-
     app.run(debug=True, port=5000, host="0.0.0.0")
@@ -0,0 +1,18 @@
+from collector_common.mongo import mongo_client
+from dotenv import load_dotenv
+import os
+
+load_dotenv('keys.env')
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("MONGO_DB_NAME", "the-news-collector")
+
+# Only the worker holding this lease runs the ingest jobs (see worker.py)
+INGEST_LEASE_NAME = "news-ingest"
+WORKER_LEASE_TTL_SECONDS = int(os.getenv("WORKER_LEASE_TTL_SECONDS", 60))
+# The worker job the update route asks the lease holder to run now
+FETCH_JOB_ID = "fetch_articles"
+
+# The one client (and database handle) this process shares
+client = mongo_client(MONGO_URI, "the-news-collector")
+db = client[DB_NAME]
@@ -0,0 +1,218 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from hashlib import blake2b
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and never change the story
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ocid", "cmpid", "smid", "sr_share", "ref", "ref_src", "rss", "feed", "cmp"
+}
+TRACKING_PREFIXES = ("utm_", "at_", "__")
+AMP_PARAMS = {"amp", "outputtype", "output"}
+
+FINGERPRINT_BITS = 64
+# SimHash bands: two titles within MAX_DISTANCE bits share at least one of
+# the BANDS + 1 > MAX_DISTANCE bands exactly, so band lookups find every
+# near-duplicate through an index instead of a scan
+FINGERPRINT_BANDS = 4
+MAX_DISTANCE = 3
+# How far back (days of publishedAt) a stored story can be matched
+DEDUP_WINDOW_DAYS = 3
+
+WORD = re.compile(r"[a-z0-9]+")
+# Words whose presence varies between outlets rewriting the same headline
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "by", "at", "as",
+    "is", "are", "was", "with", "from", "its", "it", "be", "this", "that"
+}
+
+def canonical_url(url):
+    """
+    Lowercases scheme and host and drops www/amp hosts, fragments, tracking
+    parameters and AMP variants, so every link to one story compares equal.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ("www.", "amp.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    # AMP variants: /story/amp, /story.amp, /story.amp.html
+    path = re.sub(r"/amp/?$", "", parts.path)
+    path = re.sub(r"\.amp(\.html?)?$", r"\1", path)
+    path = path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and key.lower() not in AMP_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(query), ""))
+
+def normalize_title(title, source=""):
+    """Lowercase words of a title, minus stopwords and the " - Source" suffix NewsAPI appends"""
+    title = (title or "").lower()
+    if source and title.endswith(f" - {source.lower()}"):
+        title = title[:-len(source) - 3]
+    return [word for word in WORD.findall(title) if word not in STOPWORDS]
+
+def _hash64(token):
+    return int.from_bytes(blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+def simhash(words):
+    """64-bit SimHash over the words of a normalized title"""
+    weights = [0] * FINGERPRINT_BITS
+    for word in words:
+        value = _hash64(word)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def fingerprint_bands(fingerprint):
+    """The band keys stored in the indexed fingerprintBands field"""
+    width = FINGERPRINT_BITS // FINGERPRINT_BANDS
+    mask = (1 << width) - 1
+    return [f"{band}:{fingerprint >> band * width & mask:04x}" for band in range(FINGERPRINT_BANDS)]
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+def fingerprint(title, source=""):
+    """Hex SimHash of a title, as stored in the fingerprint field"""
+    return f"{simhash(normalize_title(title, source)):016x}"
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Two generations are kept and the
+    older one is dropped once the current one holds `capacity` items, so it
+    remembers recent keys without growing or saturating.
+    """
+
+    def __init__(self, capacity=50000, hashes=7):
+        self.capacity = capacity
+        self.hashes = hashes
+        # ~10 bits per item keeps false positives near 1% at capacity
+        self.size = capacity * 10
+        self.current = bytearray(self.size // 8 + 1)
+        self.previous = bytearray(self.size // 8 + 1)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def _positions(self, key):
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        with self.lock:
+            if self.count >= self.capacity:
+                self.previous, self.current = self.current, bytearray(self.size // 8 + 1)
+                self.count = 0
+            for position in self._positions(key):
+                self.current[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        with self.lock:
+            return any(
+                all(bits[position >> 3] & 1 << (position & 7) for position in positions)
+                for bits in (self.current, self.previous)
+            )
+
+class NearDuplicateIndex:
+    """
+    Ingest-time dedup for articles carrying canonicalUrl, fingerprint and
+    fingerprintBands. Keys already in the Bloom filter are dropped without
+    touching MongoDB; the rest are matched in one query against the
+    canonicalUrl and fingerprintBands indexes, then by Hamming distance.
+    Only stored articles may enter the Bloom filter: the caller remembers
+    the unique articles once they are written, so a batch whose write fails
+    is matched afresh when it is retried.
+    """
+
+    def __init__(self, collection, bloom=None):
+        self.collection = collection
+        self.bloom = bloom or BloomFilter()
+        self.warmed = False
+        self.bloom_hits = 0
+        self.near_duplicates = 0
+
+    def warm(self, since):
+        """Seeds the Bloom filter with the keys of articles published since `since`"""
+        cursor = self.collection.find(
+            {"publishedAt": {"$gte": since}, "fingerprint": {"$exists": True}},
+            {"_id": 0, "canonicalUrl": 1, "fingerprint": 1}
+        )
+        loaded = 0
+        for document in cursor:
+            self.remember(document)
+            loaded += 1
+        self.warmed = True
+        logger.info(f"🌸 Loaded {loaded} recent article fingerprints into the Bloom filter")
+
+    def remember(self, article):
+        self.bloom.add(f"url:{article['canonicalUrl']}")
+        self.bloom.add(f"fp:{article['fingerprint']}")
+
+    def seen(self, article):
+        return f"url:{article['canonicalUrl']}" in self.bloom or f"fp:{article['fingerprint']}" in self.bloom
+
+    def filter_new(self, articles, since):
+        """
+        Returns (unique, duplicates): the articles that are neither stored
+        nor near-duplicates of another in the batch, and how many were not.
+        """
+        if not self.warmed:
+            self.warm(since)
+
+        candidates = []
+        for article in articles:
+            if self.seen(article):
+                self.bloom_hits += 1
+            else:
+                candidates.append(article)
+
+        known = []
+        if candidates:
+            known = list(self.collection.find(
+                {
+                    "$or": [
+                        {"canonicalUrl": {"$in": list({article["canonicalUrl"] for article in candidates})}},
+                        {"fingerprintBands": {"$in": list({band for article in candidates for band in article["fingerprintBands"]})}}
+                    ],
+                    "publishedAt": {"$gte": since}
+                },
+                {"_id": 0, "canonicalUrl": 1, "fingerprint": 1, "fingerprintBands": 1}
+            ))
+
+        # Stored and already accepted articles, reachable by URL or band
+        by_url = {document["canonicalUrl"] for document in known}
+        by_band = {}
+        for document in known:
+            for band in document.get("fingerprintBands", []):
+                by_band.setdefault(band, []).append(int(document["fingerprint"], 16))
+
+        unique = []
+        for article in candidates:
+            value = int(article["fingerprint"], 16)
+            if article["canonicalUrl"] in by_url or any(
+                hamming(value, other) <= MAX_DISTANCE
+                for band in article["fingerprintBands"] for other in by_band.get(band, [])
+            ):
+                self.near_duplicates += 1
+                continue
+            unique.append(article)
+            by_url.add(article["canonicalUrl"])
+            for band in article["fingerprintBands"]:
+                by_band.setdefault(band, []).append(value)
+
+        return unique, len(articles) - len(unique)
+
+    def stats(self):
+        return {"bloom_hits": self.bloom_hits, "near_duplicates": self.near_duplicates, "warmed": self.warmed}
@@ -1,8 +1,15 @@
 import logging
-from pymongo import MongoClient
-import requests
+from config import db
 import os
 from dotenv import load_dotenv
+from collector_common.ingest import bulk_upsert
+from collector_common.http_client import HttpClient
+from collector_common.cache import ResponseCache, SharedGeneration, GENERATION_COLLECTION
+from collector_common.conditional import FeedVersion
+from sources import NewsSource, SourceRegistry, PUBLISHED_AT_FORMAT, newsapi_fetcher, feed_fetcher
+from urllib.parse import urlsplit
+from dedup import NearDuplicateIndex, DEDUP_WINDOW_DAYS, canonical_url, fingerprint, fingerprint_bands
+from datetime import datetime, timedelta, timezone
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -11,68 +18,132 @@ logger = logging.getLogger(__name__)
 load_dotenv('keys.env')
 NEWS_API_KEY = os.getenv('NEWS_API_KEY')
 
-# MongoDB Setup
-client = MongoClient("mongodb://localhost:27017/")
-db = client["the-news-collector"]
 news_collection = db["news-collection"]
 
+# One story per canonical URL; syndicated copies are caught by near_duplicates
+ARTICLE_KEY_FIELDS = ["canonicalUrl"]
+
+# Sources polled concurrently, each on an interval that adapts to how often it has news
+FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", 4))
+NEWSAPI_COUNTRIES = os.getenv("NEWSAPI_COUNTRIES", "us").split(",")
+NEWSAPI_CATEGORIES = os.getenv(
+    "NEWSAPI_CATEGORIES", "general,business,technology,science,health,sports,entertainment"
+).split(",")
+NEWS_RSS_FEEDS = os.getenv("NEWS_RSS_FEEDS", ",".join([
+    "General|https://feeds.bbci.co.uk/news/rss.xml",
+    "Technology|https://feeds.arstechnica.com/arstechnica/index",
+    "Science|https://www.sciencedaily.com/rss/top/science.xml"
+])).split(",")
+# NewsAPI costs one request per country and category, so it is polled
+# sparingly: 7 categories at the 2 hour floor stay under 100 requests a day
+NEWSAPI_MIN_INTERVAL = 2 * 60 * 60
+NEWSAPI_MAX_INTERVAL = 6 * 60 * 60
+FEED_MIN_INTERVAL = 5 * 60
+FEED_MAX_INTERVAL = 2 * 60 * 60
+
+http_client = HttpClient(user_agent="NewsCollector/1.0", pool_size=FETCH_WORKERS)
+
+near_duplicates = NearDuplicateIndex(news_collection)
+
+# Bumped by the worker after each ingest; keys the response cache and ETags of every web process
+cache_generation = SharedGeneration(db[GENERATION_COLLECTION], "the-news-collector")
+# Newest article marker behind the feed ETags
+feed_version = FeedVersion(news_collection, "publishedAt", cache_generation)
+response_cache = ResponseCache.from_env("the-news-collector", cache_generation)
+
+def build_source_registry():
+    """
+    Registers one NewsAPI source per (country, category) pair plus every
+    RSS/Atom feed listed in NEWS_RSS_FEEDS ("Category|url" entries separated
+    by commas).
+    """
+    registry = SourceRegistry(workers=FETCH_WORKERS)
+    if NEWS_API_KEY:
+        for country in NEWSAPI_COUNTRIES:
+            for category in NEWSAPI_CATEGORIES:
+                registry.register(NewsSource(
+                    f"newsapi:{country}:{category}",
+                    newsapi_fetcher(http_client, NEWS_API_KEY, country, category),
+                    NEWSAPI_MIN_INTERVAL, NEWSAPI_MAX_INTERVAL
+                ))
+    else:
+        logger.warning("⚠️  NEWS_API_KEY is not set, only RSS/Atom feeds will be polled")
+
+    for entry in NEWS_RSS_FEEDS:
+        category, _, url = entry.strip().rpartition("|")
+        if not url:
+            continue
+        name = urlsplit(url).netloc or url
+        registry.register(NewsSource(
+            f"feed:{url}",
+            feed_fetcher(http_client, name, url, category.strip().capitalize() or "General"),
+            FEED_MIN_INTERVAL, FEED_MAX_INTERVAL
+        ))
+    return registry
+
+source_registry = build_source_registry()
+
 def fetch_articles():
     """
-    Fetches news articles from NewsAPI.
+    Fetches news articles from every source that is due, concurrently.
     """
-    logger.info("📡 Connecting to NewsAPI")
     try:
-        api_url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWS_API_KEY}"
-        response = requests.get(api_url)
-        
-        if response.status_code == 200:
-            articles = response.json().get("articles", [])
-            if articles:
-                logger.info(f"✅ Fetched {len(articles)} articles from NewsAPI")
-                return articles
-            else:
-                logger.warning("📭 No articles found in response")
-                return []
-        else:
-            logger.error(f"❌ NewsAPI request failed (HTTP {response.status_code})")
-            return []
+        articles = source_registry.fetch_due()
+        if articles:
+            logger.info(f"✅ Fetched {len(articles)} articles")
+        return articles
     except Exception as e:
-        logger.error(f"🔥 Critical API error: {str(e)}")
+        logger.error(f"🔥 Critical fetch error: {str(e)}")
         return []
 
-def store_articles(articles):
+def format_article(article):
     """
-    Stores news articles in MongoDB with the new data structure.
+    Maps a NewsAPI article onto the stored document structure, with the
+    canonical URL and title fingerprint used for dedup.
     """
-    try:
-        formatted_articles = []
-        duplicates = 0
+    title_fingerprint = fingerprint(article["title"], article["source"]["name"])
+    return {
+        "title": article["title"],
+        "source": article["source"]["name"],
+        "author": article.get("author", "N/A"),
+        "publishedAt": article["publishedAt"],
+        "url": article["url"],
+        "urlToImage": article.get("urlToImage", ""),
+        "category": article.get("category", "General"),
+        "canonicalUrl": canonical_url(article["url"]),
+        "fingerprint": title_fingerprint,
+        "fingerprintBands": fingerprint_bands(int(title_fingerprint, 16))
+    }
 
+def store_articles(articles, collection=news_collection, dedup=near_duplicates):
+    """
+    Drops articles already stored under the same canonical URL or a
+    near-identical title, then stores the rest through a single bulk upsert
+    keyed on canonicalUrl. `dedup` must be a NearDuplicateIndex over
+    `collection`. Returns a (inserted, duplicates) tuple.
+    """
+    try:
         logger.info("🧹 Processing articles for storage")
-        for article in articles:
-            if not news_collection.find_one({"title": article["title"], "publishedAt": article["publishedAt"]}):
-                formatted_articles.append({
-                    "title": article["title"],
-                    "source": article["source"]["name"],
-                    "author": article.get("author", "N/A"),
-                    "publishedAt": article["publishedAt"],
-                    "url": article["url"],
-                    "urlToImage": article.get("urlToImage", ""),
-                    "category": "General"
-                })
-            else:
-                duplicates += 1
+        formatted_articles = [format_article(article) for article in articles]
+        since = (datetime.now(timezone.utc) - timedelta(days=DEDUP_WINDOW_DAYS)).strftime(PUBLISHED_AT_FORMAT)
+        unique_articles, near = dedup.filter_new(formatted_articles, since)
+        inserted, duplicates = bulk_upsert(collection, unique_articles, ARTICLE_KEY_FIELDS)
+        duplicates += near
+        # Only now that they are stored; a failed write leaves the filter untouched
+        for article in unique_articles:
+            dedup.remember(article)
 
         if duplicates > 0:
             logger.warning(f"⚠️  Found {duplicates} duplicate articles")
             logger.info(f"⏭️  Skipping {duplicates} articles...")
 
-        if formatted_articles:
-            news_collection.insert_many(formatted_articles)
-            logger.info(f"📚 Stored {len(formatted_articles)} new articles")
+        if inserted:
+            logger.info(f"📚 Stored {inserted} new articles")
         else:
-            raise Exception("⚠️  No unique articles found to store")
-            
+            logger.info("📭 No unique articles found to store")
+
+        return inserted, duplicates
+
     except Exception as e:
         logger.error(f"❌ Storage process skipped due to: {str(e)}")
         raise e
@@ -93,3 +164,36 @@ def get_latest_headlines(limit=50):
     except Exception as e:
         logger.error(f"❌ Failed to retrieve headlines: {str(e)}")
         return []
+
+def search_headlines(query="", category="", page=1, page_size=8):
+    """
+    Filters, counts and paginates articles server-side in one aggregation.
+    Returns a (articles, total) tuple.
+    """
+    match = {}
+    if query:
+        match["$text"] = {"$search": query}
+    if category:
+        match["category"] = category.capitalize()
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"publishedAt": -1}},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "articles": [
+                {"$skip": (page - 1) * page_size},
+                {"$limit": page_size},
+                {"$project": {"_id": 0}}
+            ]
+        }}
+    ]
+
+    logger.info(f"🔍 Searching headlines (q='{query}', category='{category}', page {page})")
+    try:
+        result = next(news_collection.aggregate(pipeline))
+        total = result["total"][0]["count"] if result["total"] else 0
+        return result["articles"], total
+    except Exception as e:
+        logger.error(f"❌ Failed to search headlines: {str(e)}")
+        return [], 0
@@ -1,55 +1,53 @@
-from flask import render_template, request, jsonify
-from app import app
-from models import get_latest_headlines, fetch_articles, store_articles, news_collection
+from flask import Blueprint, render_template, request, jsonify
+from models import search_headlines, feed_version, response_cache, news_collection
+from collector_common.pagination import InvalidCursor, keyset_filter, keyset_sort, next_cursor
+from schema import INDEXES
+from collector_common.conditional import conditional_get
+from collector_common.status import status_blueprint, worker_status
+from collector_common.lease import request_run, LEASE_COLLECTION
+from config import INGEST_LEASE_NAME, FETCH_JOB_ID, db
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+bp = Blueprint("news", __name__)
+# /health, /api/metrics/worker, /api/metrics/cache and /api/metrics/http
+status_bp = status_blueprint(news_collection, INDEXES, db[LEASE_COLLECTION], INGEST_LEASE_NAME, response_cache)
+
 PAGE_SIZE = 8  # Number of articles per page
 
-@app.route("/")
+@bp.route("/")
+@response_cache.cached
 def home():
     """
-    Fetches the latest news articles from MongoDB with pagination, search, and category filtering.
+    Fetches the latest news articles from MongoDB with pagination, search, and category filtering,
+    all computed server-side.
     """
     query = request.args.get("q", "").strip().lower()  # Get search query
     category = request.args.get("category", "").strip().lower()  # Get category filter
     page = int(request.args.get("page", 1))  # Get current page, default to 1
 
-    all_articles = get_latest_headlines(limit=50)  # Fetch up to 50 articles
-    filtered_articles = []
-
-    # Filter articles based on search or category
-    for article in all_articles:
-        headline_match = query in article["title"].lower() if query else True
-        category_match = article["category"].lower() == category if category else True
-
-        if headline_match and category_match:
-            filtered_articles.append(article)
-
-    # Pagination logic
-    total_articles = len(filtered_articles)
-    start_idx = (page - 1) * PAGE_SIZE
-    end_idx = start_idx + PAGE_SIZE
-    paginated_articles = filtered_articles[start_idx:end_idx]
+    paginated_articles, total_articles = search_headlines(query, category, page, PAGE_SIZE)
 
     total_pages = (total_articles // PAGE_SIZE) + (1 if total_articles % PAGE_SIZE > 0 else 0)
 
     return render_template("index.html", articles=paginated_articles, query=query, category=category, page=page, total_pages=total_pages)
 
-@app.route('/update_news', methods=['GET'])
+@bp.route('/update_news', methods=['GET'])
 def update_news():
+    """Asks the ingest worker to fetch now; the web app itself never fetches"""
     logger.info("🔄 Manual news update triggered")
     try:
-        articles = fetch_articles()
-        store_articles(articles)
-        return jsonify({"status": "success", "message": "News updated!"})
+        if not request_run(db[LEASE_COLLECTION], INGEST_LEASE_NAME, FETCH_JOB_ID):
+            logger.warning("⚠️  No worker holds the ingest lease, nothing to update news")
+            return jsonify({"status": "error", "message": "No ingest worker is running"}), 503
+        return jsonify({"status": "accepted", "message": "News update requested"}), 202
     except Exception as e:
         logger.error(f"❌ Manual update failed: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-"""@app.route('/load_latest_news')
+"""@bp.route('/load_latest_news')
 def load_latest_news():
     logger.debug("📥 Loading latest news")
     latest_news = list(news_collection.find().sort("publishedAt", -1).limit(5))
@@ -68,13 +66,24 @@ def load_latest_news():
 
     return jsonify({"news": news_data})
 """
-@app.route('/load_more_news')
+@bp.route('/load_more_news')
+@conditional_get(feed_version)
+@response_cache.cached
 def load_more_news():
     page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     logger.info(f"📖 Loading more news (page {page})")
     per_page = 8
 
-    news = list(news_collection.find().sort("publishedAt", -1).skip((page - 1) * per_page).limit(per_page))
+    try:
+        news_query = news_collection.find(keyset_filter("publishedAt", cursor)).sort(keyset_sort("publishedAt"))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Without a cursor, fall back to offset pagination
+    if not cursor:
+        news_query = news_query.skip((page - 1) * per_page)
+    news = list(news_query.limit(per_page))
 
     news_data = [
         {
@@ -87,14 +96,13 @@ def load_more_news():
         } for item in news
     ]
 
-    return jsonify({"news": news_data, "page": page})
+    return jsonify({"news": news_data, "page": page, "next_cursor": next_cursor(news, "publishedAt", per_page)})
 
-@app.route('/search_news')
+@bp.route('/search_news')
 def search_news():
     query = re.escape(request.args.get("q", "").strip().lower())
     logger.info(f"🔍 Searching for: '{query}'")
     try:
-        news_collection.create_index([("title", "text")])
         news = list(news_collection.find({"$text": {"$search": query}}).limit(10))
         
         logger.info(f"🔎 Found {len(news)} results for '{query}'")
@@ -112,3 +120,13 @@ def search_news():
     except Exception as e:
         logger.error(f"❌ Search failed: {str(e)}")
         return jsonify({"news": []})
+
+@bp.route('/api/metrics/sources')
+def source_metrics():
+    """Polling interval, due time and yield of every news source, as last reported by the worker"""
+    return jsonify(worker_status(db[LEASE_COLLECTION], INGEST_LEASE_NAME).get("sources", {}))
+
+@bp.route('/api/metrics/dedup')
+def dedup_metrics():
+    """Articles the worker dropped at ingest through the Bloom filter and near-duplicate matching"""
+    return jsonify(worker_status(db[LEASE_COLLECTION], INGEST_LEASE_NAME).get("dedup", {}))
@@ -0,0 +1,22 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+# Every index the news collection relies on, applied once at startup
+INDEXES = [
+    # Exact (title, publishedAt) duplicates, kept as a backstop for the canonicalUrl upsert
+    IndexModel([("title", ASCENDING), ("publishedAt", ASCENDING)], unique=True, name="dedup_title_publishedAt"),
+    # Upsert key of store_articles; articles stored before URL canonicalization are left out
+    IndexModel(
+        [("canonicalUrl", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"canonicalUrl": {"$type": "string"}},
+        name="canonicalUrl_unique"
+    ),
+    # SimHash band lookups behind near-duplicate detection at ingest
+    IndexModel([("fingerprintBands", ASCENDING), ("publishedAt", DESCENDING)], name="fingerprintBands_1_publishedAt_-1"),
+    # Keyset pagination for /load_more_news
+    IndexModel([("publishedAt", DESCENDING), ("_id", DESCENDING)], name="keyset_publishedAt"),
+    # Search on the home page and /search_news
+    IndexModel([("title", TEXT)], name="title_text"),
+    # Category filtered, date sorted home page
+    IndexModel([("category", ASCENDING), ("publishedAt", DESCENDING)], name="category_1_publishedAt_-1"),
+]
@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import iterparse
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Stored publishedAt format, matching what NewsAPI returns
+PUBLISHED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Feeds are cut off after this many entries so a huge feed cannot balloon a batch
+MAX_FEED_ITEMS = 200
+
+class NewsSource:
+    """
+    A pollable source with its own polling interval. The interval halves
+    (down to min_interval) after a poll that yields new articles and grows
+    by half (up to max_interval) after one that does not, so busy sources
+    are polled often and quiet feeds are left alone.
+    """
+
+    def __init__(self, name, fetch, min_interval, max_interval):
+        self.name = name
+        self.fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_due = 0.0
+        self.newest = ""
+        self.polls = 0
+        self.new_items = 0
+        self.errors = 0
+
+    def is_due(self, now):
+        return now >= self.next_due
+
+    def record(self, articles, now):
+        """Adapts the interval to how many articles are newer than anything seen before"""
+        fresh = [article for article in articles if (article.get("publishedAt") or "") > self.newest]
+        if fresh:
+            self.newest = max(article["publishedAt"] for article in fresh)
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        self.polls += 1
+        self.new_items += len(fresh)
+        self.next_due = now + self.interval
+        return len(fresh)
+
+    def record_error(self, now):
+        self.errors += 1
+        self.interval = min(self.max_interval, self.interval * 1.5)
+        self.next_due = now + self.interval
+
+    def snapshot(self, now):
+        return {
+            "interval_seconds": round(self.interval),
+            "due_in_seconds": max(0, round(self.next_due - now)),
+            "polls": self.polls,
+            "new_items": self.new_items,
+            "errors": self.errors
+        }
+
+class SourceRegistry:
+    """Every news source the collector polls, fetched concurrently when due"""
+
+    def __init__(self, workers=4):
+        self.sources = {}
+        self.workers = workers
+        self.lock = threading.Lock()
+
+    def register(self, source):
+        self.sources[source.name] = source
+
+    def fetch_due(self):
+        """Fetches every due source on a bounded pool and returns their merged articles"""
+        now = time.monotonic()
+        due = [source for source in self.sources.values() if source.is_due(now)]
+        if not due:
+            logger.info("😴 No news source is due")
+            return []
+
+        logger.info(f"📡 Polling {len(due)}/{len(self.sources)} news sources")
+        articles = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(source.fetch): source for source in due}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    with self.lock:
+                        source.record_error(time.monotonic())
+                    logger.error(f"❌ {source.name} failed: {str(e)}")
+                    continue
+                with self.lock:
+                    fresh = source.record(fetched, time.monotonic())
+                logger.info(f"✅ {source.name}: {len(fetched)} articles, {fresh} new, next poll in {source.interval / 60:.1f} min")
+                articles.extend(fetched)
+        return articles
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            return {name: source.snapshot(now) for name, source in self.sources.items()}
+
+def newsapi_fetcher(http_client, api_key, country, category):
+    """Top headlines for one NewsAPI country and category"""
+    def fetch():
+        response = http_client.get(
+            "https://newsapi.org/v2/top-headlines",
+            params={"country": country, "category": category, "pageSize": 100, "apiKey": api_key},
+            conditional=True
+        )
+        if response.status_code == 304:
+            return []
+        response.raise_for_status()
+        return [
+            dict(article, category=category.capitalize())
+            for article in response.json().get("articles", [])
+        ]
+    return fetch
+
+def local_name(tag):
+    """Element name without its XML namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+def parse_published(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom) dates to the stored publishedAt format"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        published = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc)
+    return published.strftime(PUBLISHED_AT_FORMAT)
+
+def parse_entry(element, feed_name, category):
+    """Maps an RSS <item> or Atom <entry> onto the NewsAPI article shape"""
+    article = {"source": {"name": feed_name}, "category": category, "author": "N/A", "urlToImage": ""}
+    for child in element:
+        name = local_name(child.tag)
+        text = (child.text or "").strip()
+        if name == "title":
+            article["title"] = text
+        elif name == "link":
+            # Atom links carry the URL in href; prefer the alternate one
+            if child.get("href") and child.get("rel", "alternate") == "alternate":
+                article["url"] = child.get("href")
+            elif text:
+                article["url"] = text
+        elif name == "published" or (name in ("pubDate", "updated", "date") and not article.get("publishedAt")):
+            article["publishedAt"] = parse_published(text)
+        elif name in ("author", "creator"):
+            # Atom nests the name in <author><name>
+            names = [(sub.text or "").strip() for sub in child if local_name(sub.tag) == "name"]
+            author = names[0] if names else text
+            if author:
+                article["author"] = author
+        elif name in ("enclosure", "content", "thumbnail") and child.get("url") and not article["urlToImage"]:
+            if child.get("type", "image").startswith("image") or name == "thumbnail":
+                article["urlToImage"] = child.get("url")
+    return article
+
+def iter_feed(stream, feed_name, category, limit=MAX_FEED_ITEMS):
+    """
+    Parses an RSS or Atom document incrementally, yielding each entry as
+    soon as its closing tag arrives and discarding it afterwards, so the
+    whole feed is never held in memory.
+    """
+    ancestors = []
+    count = 0
+    for event, element in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            ancestors.append(element)
+            continue
+        ancestors.pop()
+        if local_name(element.tag) not in ("item", "entry"):
+            continue
+        article = parse_entry(element, feed_name, category)
+        # Detach the parsed entry so the tree never grows past the one being read
+        if ancestors:
+            ancestors[-1].remove(element)
+        if article.get("title") and article.get("url") and article.get("publishedAt"):
+            yield article
+            count += 1
+            if count >= limit:
+                return
+
+def feed_fetcher(http_client, name, url, category):
+    """An RSS/Atom feed, streamed and parsed as it downloads"""
+    def fetch():
+        response = http_client.get(url, conditional=True, stream=True)
+        try:
+            if response.status_code == 304:
+                return []
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return list(iter_feed(response.raw, name, category))
+        finally:
+            response.close()
+    return fetch
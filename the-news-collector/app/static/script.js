@@ -87,18 +87,21 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     });
 
-    let page = 1;
+    let nextCursor = null;
+    let hasMore = true;
     let loading = false;
 
     let seenUrls = new Set(); // Track loaded articles
 
     async function loadMoreNews() {
-        if (loading) return;
+        if (loading || !hasMore) return;
         loading = true;
         showLoadingSpinner();
 
-        const response = await fetch(`/load_more_news?page=${page}`);
+        const response = await fetch(nextCursor ? `/load_more_news?cursor=${encodeURIComponent(nextCursor)}` : "/load_more_news");
         const data = await response.json();
+        nextCursor = data.next_cursor;
+        hasMore = !!nextCursor;
 
         if (data.news.length > 0) {
             const newsContainer = document.getElementById("news-container");
@@ -121,11 +124,10 @@ document.addEventListener("DOMContentLoaded", function () {
                     newsContainer.appendChild(newsCard);
                 }
             });
-
-            page++;
-            loading = false;
-            hideLoadingSpinner();
         }
+
+        loading = false;
+        hideLoadingSpinner();
     }
 
     window.addEventListener("scroll", function () {
@@ -0,0 +1,86 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.base import JobLookupError
+from models import fetch_articles, store_articles, feed_version, response_cache, news_collection, source_registry, near_duplicates, http_client
+from schema import INDEXES
+from collector_common.schema import apply_indexes
+from collector_common.pipeline import BatchPipeline
+from collector_common.logs import configure_logging
+from collector_common.lease import MongoLease, LEASE_COLLECTION, run_exclusively
+from config import INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS, FETCH_JOB_ID, db
+from datetime import datetime
+import logging
+import os
+import signal
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+FETCH_INTERVAL_MINUTES = 3
+# Seconds a stopping worker waits for fetched batches to be stored
+DRAIN_TIMEOUT_SECONDS = 60
+
+def store_articles_batch(articles):
+    inserted, _ = store_articles(articles)
+    if inserted:
+        response_cache.bump()
+        feed_version.refresh()
+
+# Fetched batches are handed to store_articles through a bounded pipeline,
+# spooled to SQLite when SPOOL_PATH is set so a MongoDB outage loses nothing
+pipeline = BatchPipeline(store_articles_batch, spool_path=os.getenv("SPOOL_PATH"))
+
+def fetch_articles_job():
+    logger.info("🕸️  Starting fetch_articles_job...")
+    try:
+        articles = fetch_articles()
+        pipeline.put(articles, timeout=FETCH_INTERVAL_MINUTES * 60)
+        logger.info(f"✅ SUCCESSFULL: fetch_articles_job Completed Successfully")
+    except Exception as e:
+        logger.error(f"🔥 FAILURE: fetch_articles_job Failed: {str(e)}")
+
+# Scheduler
+scheduler = BackgroundScheduler()
+scheduler.add_job(fetch_articles_job, "interval", minutes=FETCH_INTERVAL_MINUTES, next_run_time=datetime.now(), id=FETCH_JOB_ID)
+
+def start():
+    apply_indexes(news_collection, INDEXES)
+    pipeline.start()
+    scheduler.start()
+
+def stop():
+    scheduler.shutdown()
+    if not pipeline.drain(DRAIN_TIMEOUT_SECONDS):
+        logger.warning(f"⚠️  {pipeline.pending()} batches were still pending at shutdown")
+    pipeline.stop()
+
+def run_now(job):
+    """Runs a scheduled job right away, when the web app's update route asks for it"""
+    try:
+        scheduler.modify_job(job, next_run_time=datetime.now())
+    except JobLookupError:
+        logger.warning(f"⚠️  Ignoring a run request for unknown job {job}")
+
+def status():
+    """Reported with every lease renewal and served by /api/metrics/worker"""
+    return {
+        "pending_batches": pipeline.pending(),
+        "dead_letter_batches": pipeline.dead_lettered(),
+        "sources": source_registry.snapshot(),
+        "dedup": near_duplicates.stats(),
+        "http": http_client.stats()
+    }
+
+if __name__ == "__main__":
+    configure_logging("news_worker.log")
+    logger.info("🚜 The News Collector worker is starting")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    lease = MongoLease(db[LEASE_COLLECTION], INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS)
+    try:
+        lost = run_exclusively(lease, start, stop, status, stop_event, run_now)
+    except KeyboardInterrupt:
+        lost = False
+    # A non-zero exit lets the supervisor restart the worker as a standby
+    sys.exit(1 if lost else 0)
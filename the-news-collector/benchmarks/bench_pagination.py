@@ -0,0 +1,71 @@
+"""
+Compares offset (skip) pagination against keyset (cursor) pagination at
+page 1 and page 10,000 of a one million article collection.
+
+Needs a real mongod, since index-backed range scans are the point:
+
+    MONGO_URI=mongodb://localhost:27017/ python benchmarks/bench_pagination.py
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from pymongo import MongoClient
+from collector_common.pagination import encode_cursor, keyset_filter, keyset_sort
+from collector_common.schema import apply_indexes
+from schema import INDEXES
+
+DOCUMENTS = 1_000_000
+PER_PAGE = 8
+PAGES = [1, 10_000]
+REPEATS = 20
+SORT_FIELD = "publishedAt"
+
+def seed(collection):
+    collection.drop()
+    start = datetime(2020, 1, 1)
+    batch = []
+    for i in range(DOCUMENTS):
+        batch.append({
+            "title": f"Headline {i}",
+            SORT_FIELD: (start + timedelta(seconds=i // 3)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "url": f"https://example.com/{i}",
+        })
+        if len(batch) == 10_000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    apply_indexes(collection, INDEXES)
+
+def offset_page(collection, page):
+    return list(collection.find().sort(keyset_sort(SORT_FIELD)).skip((page - 1) * PER_PAGE).limit(PER_PAGE))
+
+def cursor_page(collection, cursor):
+    return list(collection.find(keyset_filter(SORT_FIELD, cursor)).sort(keyset_sort(SORT_FIELD)).limit(PER_PAGE))
+
+def median_ms(func, *args):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+if __name__ == "__main__":
+    collection = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))["the-news-collector-bench"]["pagination"]
+    if collection.estimated_document_count() != DOCUMENTS:
+        print(f"Seeding {DOCUMENTS} articles...")
+        seed(collection)
+
+    print(f"{'page':>8} {'offset (ms)':>12} {'cursor (ms)':>12}")
+    for page in PAGES:
+        cursor = None
+        if page > 1:
+            # The cursor a client would hold after scrolling to this page
+            last = offset_page(collection, page - 1)[-1]
+            cursor = encode_cursor(last, SORT_FIELD)
+        print(f"{page:>8} {median_ms(offset_page, collection, page):>12.2f} {median_ms(cursor_page, collection, cursor):>12.2f}")
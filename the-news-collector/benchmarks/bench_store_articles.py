@@ -0,0 +1,83 @@
+"""
+Compares the legacy find_one-per-article dedup against the bulk upsert path
+used by store_articles.
+
+Each run stores through a fresh NearDuplicateIndex, so a re-run is not
+answered by the previous run's Bloom filter; the articles are older than
+the dedup window, so the bulk re-run measures upserts against existing keys.
+
+Runs against mongomock by default, or a real mongod when MONGO_URI is set:
+
+    python benchmarks/bench_store_articles.py
+    MONGO_URI=mongodb://localhost:27017/ python benchmarks/bench_store_articles.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import models
+from dedup import NearDuplicateIndex
+from collector_common.schema import apply_indexes
+from schema import INDEXES
+
+SIZES = [100, 10_000, 100_000]
+
+def get_collection(name):
+    mongo_uri = os.getenv("MONGO_URI")
+    if mongo_uri:
+        from pymongo import MongoClient
+        collection = MongoClient(mongo_uri)["the-news-collector-bench"][name]
+    else:
+        import mongomock
+        collection = mongomock.MongoClient()["the-news-collector-bench"][name]
+    collection.drop()
+    return collection
+
+def make_articles(count):
+    return [
+        {
+            "title": f"Headline {i}",
+            "source": {"name": "Bench Wire"},
+            "author": "Bench",
+            "publishedAt": f"2025-01-01T00:{i % 60:02d}:{i % 60:02d}Z",
+            "url": f"https://example.com/{i}",
+            "urlToImage": "",
+        } for i in range(count)
+    ]
+
+def legacy_store_articles(collection, articles):
+    """The pre-bulk implementation: one find_one round trip per article."""
+    formatted_articles = []
+    for article in articles:
+        if not collection.find_one({"title": article["title"], "publishedAt": article["publishedAt"]}):
+            formatted_articles.append(models.format_article(article))
+    if formatted_articles:
+        collection.insert_many(formatted_articles)
+
+def bulk_store_articles(collection, articles):
+    models.store_articles(articles, collection, NearDuplicateIndex(collection))
+
+def timed(func, collection, articles):
+    start = time.perf_counter()
+    func(collection, articles)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    print(f"{'articles':>10} {'legacy (s)':>12} {'bulk (s)':>12} {'legacy re-run (s)':>18} {'bulk re-run (s)':>16}")
+    for size in SIZES:
+        articles = make_articles(size)
+
+        legacy = get_collection("legacy")
+        legacy_first = timed(legacy_store_articles, legacy, articles)
+        legacy_rerun = timed(legacy_store_articles, legacy, articles)
+
+        bulk = get_collection("bulk")
+        apply_indexes(bulk, INDEXES)
+        bulk_first = timed(bulk_store_articles, bulk, articles)
+        bulk_rerun = timed(bulk_store_articles, bulk, articles)
+
+        print(f"{size:>10} {legacy_first:>12.3f} {bulk_first:>12.3f} {legacy_rerun:>18.3f} {bulk_rerun:>16.3f}")
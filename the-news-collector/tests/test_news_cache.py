@@ -0,0 +1,41 @@
+from pymongo import MongoClient
+
+from collector_common.cache import SharedGeneration, GENERATION_COLLECTION
+from config import MONGO_URI, DB_NAME
+from app import create_app
+import models
+
+def article(title, published_at):
+    return {
+        "title": title,
+        "source": "Wire",
+        "author": "N/A",
+        "publishedAt": published_at,
+        "url": f"https://example.com/{title.lower().replace(' ', '-')}",
+        "urlToImage": ""
+    }
+
+def test_worker_ingest_invalidates_the_web_cache_and_etag(monkeypatch):
+    models.news_collection.delete_many({})
+    models.news_collection.insert_one(article("First Story", "2026-10-18 08:00:00"))
+    # Read the shared generation on every request instead of once a second
+    monkeypatch.setattr(models.cache_generation, "refresh_seconds", 0)
+    client = create_app(log_file=None).test_client()
+
+    first = client.get("/load_more_news")
+    assert first.headers["X-Cache"] == "MISS"
+    assert [item["title"] for item in first.get_json()["news"]] == ["First Story"]
+    etag = first.headers["ETag"].strip('"')
+    assert client.get("/load_more_news").headers["X-Cache"] == "HIT"
+    assert client.get("/load_more_news", headers={"If-None-Match": f'"{etag}"'}).status_code == 304
+
+    # The worker process stores with its own client and bumps its own handle on the generation
+    worker_db = MongoClient(MONGO_URI)[DB_NAME]
+    worker_db["news-collection"].insert_one(article("Second Story", "2026-10-18 09:00:00"))
+    SharedGeneration(worker_db[GENERATION_COLLECTION], "the-news-collector").bump()
+
+    second = client.get("/load_more_news", headers={"If-None-Match": f'"{etag}"'})
+    assert second.status_code == 200
+    assert second.headers["X-Cache"] == "MISS"
+    assert second.headers["ETag"].strip('"') != etag
+    assert [item["title"] for item in second.get_json()["news"]] == ["Second Story", "First Story"]
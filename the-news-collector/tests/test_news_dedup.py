@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from config import db
+from dedup import BloomFilter, NearDuplicateIndex, canonical_url, fingerprint, fingerprint_bands, hamming
+from models import store_articles
+from sources import PUBLISHED_AT_FORMAT
+
+def test_canonical_url_drops_tracking_parameters_and_amp_variants():
+    assert canonical_url("http://www.Example.com/world/story/amp/?utm_source=tw&id=7&fbclid=x#top") == "https://example.com/world/story?id=7"
+    assert canonical_url("https://amp.example.com/world/story.amp.html") == "https://example.com/world/story.html"
+    assert canonical_url("https://m.example.com/world/story/?b=2&a=1") == "https://example.com/world/story?a=1&b=2"
+    assert canonical_url("") == ""
+
+def test_titles_match_without_stopwords_or_the_source_suffix():
+    assert fingerprint("The Big Storm Hits Coast - Reuters", "Reuters") == fingerprint("Big storm hits the coast", "AP")
+    assert fingerprint("Big storm hits coast") != fingerprint("Markets rally after rate cut")
+
+def test_fingerprints_within_max_distance_share_a_band():
+    value = int(fingerprint("Big storm hits coast"), 16)
+    # One flipped bit in each of three bands leaves the fourth band intact
+    near = value ^ (1 << 3 | 1 << 20 | 1 << 40)
+    assert hamming(value, near) == 3
+    shared = set(fingerprint_bands(value)) & set(fingerprint_bands(near))
+    assert shared == {fingerprint_bands(value)[3]}
+
+def test_bloom_filter_forgets_keys_two_generations_back():
+    bloom = BloomFilter(capacity=100)
+    for i in range(100):
+        bloom.add(f"old:{i}")
+    # The next key starts a new generation; the full one is still consulted
+    bloom.add("new:0")
+    assert all(f"old:{i}" in bloom for i in range(100))
+    for i in range(1, 101):
+        bloom.add(f"new:{i}")
+    assert "new:100" in bloom
+    assert not any(f"old:{i}" in bloom for i in range(100))
+
+def raw_article(category):
+    return {
+        "title": "Big storm hits coast",
+        "source": {"name": "Wire"},
+        "author": "N/A",
+        "publishedAt": datetime.now(timezone.utc).strftime(PUBLISHED_AT_FORMAT),
+        "url": f"https://example.com/storm?utm_campaign={category}",
+        "urlToImage": "",
+        "category": category
+    }
+
+def test_a_failed_store_does_not_poison_the_bloom_filter(monkeypatch):
+    collection = db["news-dedup-test"]
+    collection.drop()
+    dedup = NearDuplicateIndex(collection)
+    # One story fetched under two NewsAPI categories
+    articles = [raw_article("General"), raw_article("Science")]
+
+    def unreachable(*args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+    monkeypatch.setattr(collection, "bulk_write", unreachable)
+    with pytest.raises(AutoReconnect):
+        store_articles(articles, collection, dedup)
+    monkeypatch.undo()
+
+    # The retried batch is matched afresh and its first copy is stored
+    assert store_articles(articles, collection, dedup) == (1, 1)
+    assert collection.count_documents({}) == 1
+    # Once stored, the story is dropped by the Bloom filter alone
+    assert store_articles(articles, collection, dedup) == (0, 2)
+    assert dedup.bloom_hits == 2
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from collector_common.pagination import decode_cursor, encode_cursor
+from app import create_app
+import models
+
+def article(index, published_at):
+    return {
+        "title": f"Story {index}",
+        "source": "Wire",
+        "author": "N/A",
+        "publishedAt": published_at,
+        "url": f"https://example.com/story-{index}",
+        "urlToImage": ""
+    }
+
+def test_cursors_round_trip_the_sort_key_and_id():
+    document = {"_id": ObjectId(), "publishedAt": datetime(2026, 10, 18, 8, 30)}
+    assert decode_cursor(encode_cursor(document, "publishedAt")) == (document["publishedAt"], document["_id"])
+
+def test_cursor_pages_cover_every_article_once(monkeypatch):
+    models.news_collection.delete_many({})
+    # Ten articles share one publishedAt, so pages split inside a run of equal sort keys
+    models.news_collection.insert_many(
+        [article(i, "2026-10-18 08:00:00") for i in range(10)] +
+        [article(i, f"2026-10-18 {i:02d}:30:00") for i in range(10, 20)]
+    )
+    # Responses cached by earlier tests belong to the previous generation
+    monkeypatch.setattr(models.cache_generation, "refresh_seconds", 0)
+    models.cache_generation.bump()
+    client = create_app(log_file=None).test_client()
+
+    titles, cursor, pages = [], None, 0
+    while True:
+        body = client.get("/load_more_news", query_string={"cursor": cursor} if cursor else {}).get_json()
+        titles.extend(item["title"] for item in body["news"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(titles) == len(set(titles)) == 20
+    assert titles[:10] == [f"Story {i}" for i in range(19, 9, -1)]
+
+def test_a_malformed_cursor_is_a_bad_request():
+    client = create_app(log_file=None).test_client()
+    response = client.get("/load_more_news", query_string={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Malformed cursor: not-a-cursor"
@@ -0,0 +1,128 @@
+import io
+from xml.etree.ElementTree import ParseError
+
+import pytest
+
+import sources
+from sources import NewsSource, SourceRegistry, iter_feed
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:media="http://search.yahoo.com/mrss/">
+  <channel>
+    <title>Wire</title>
+    <item>
+      <title>Big storm hits coast</title>
+      <link>https://example.com/storm</link>
+      <pubDate>Sat, 17 Oct 2026 10:00:00 +0200</pubDate>
+      <dc:creator>Jane Doe</dc:creator>
+      <media:thumbnail url="https://example.com/storm.jpg"/>
+    </item>
+    <item>
+      <title>No date, so it cannot be ordered</title>
+      <link>https://example.com/undated</link>
+    </item>
+    <item>
+      <title>Markets rally</title>
+      <link>https://example.com/rally</link>
+      <pubDate>Sat, 17 Oct 2026 09:00:00 GMT</pubDate>
+      <enclosure url="https://example.com/rally.mp3" type="audio/mpeg"/>
+    </item>
+  </channel>
+</rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Science Daily</title>
+  <entry>
+    <title>New exoplanet found</title>
+    <link rel="self" href="https://example.com/api/exoplanet"/>
+    <link href="https://example.com/exoplanet"/>
+    <updated>2026-10-17T12:30:00Z</updated>
+    <published>2026-10-17T08:00:00Z</published>
+    <author><name>A. Astronomer</name></author>
+  </entry>
+</feed>"""
+
+def test_rss_items_map_onto_the_newsapi_shape():
+    articles = list(iter_feed(io.BytesIO(RSS), "Wire", "General"))
+    assert articles == [
+        {
+            "source": {"name": "Wire"}, "category": "General", "author": "Jane Doe",
+            "urlToImage": "https://example.com/storm.jpg", "title": "Big storm hits coast",
+            "url": "https://example.com/storm", "publishedAt": "2026-10-17T08:00:00Z"
+        },
+        {
+            "source": {"name": "Wire"}, "category": "General", "author": "N/A",
+            "urlToImage": "", "title": "Markets rally",
+            "url": "https://example.com/rally", "publishedAt": "2026-10-17T09:00:00Z"
+        },
+    ]
+
+def test_atom_entries_use_the_alternate_link_and_published_date():
+    article, = iter_feed(io.BytesIO(ATOM), "Science Daily", "Science")
+    assert article["url"] == "https://example.com/exoplanet"
+    assert article["publishedAt"] == "2026-10-17T08:00:00Z"
+    assert article["author"] == "A. Astronomer"
+
+def test_a_feed_is_cut_off_at_the_limit():
+    assert [article["title"] for article in iter_feed(io.BytesIO(RSS), "Wire", "General", limit=1)] == ["Big storm hits coast"]
+
+def test_entries_are_yielded_before_the_rest_of_the_feed_arrives():
+    # A download cut short mid-feed: the entry already read is not lost with the rest
+    articles = iter_feed(io.BytesIO(RSS[:RSS.index(b"<title>Markets")]), "Wire", "General")
+    assert next(articles)["title"] == "Big storm hits coast"
+    with pytest.raises(ParseError):
+        next(articles)
+
+def article(published_at):
+    return {"title": "Story", "publishedAt": published_at}
+
+def test_busy_sources_are_polled_more_often_and_quiet_ones_less():
+    source = NewsSource("Wire", fetch=None, min_interval=60, max_interval=3600)
+    source.interval = 600
+
+    assert source.record([article("2026-10-17T09:00:00Z"), article("2026-10-17T10:00:00Z")], now=0) == 2
+    assert (source.interval, source.next_due) == (300, 300)
+    # Articles no newer than the newest already seen don't count as fresh
+    assert source.record([article("2026-10-17T10:00:00Z"), article("2026-10-17T08:00:00Z")], now=300) == 0
+    assert source.interval == 450
+
+    for _ in range(20):
+        source.record([], now=0)
+    assert source.interval == 3600
+    for minute in range(20):
+        source.record([article(f"2026-10-18T00:{minute:02d}:00Z")], now=0)
+    assert source.interval == 60
+
+    source.record_error(now=0)
+    assert (source.interval, source.errors) == (90, 1)
+
+def test_only_due_sources_are_polled_and_failures_back_off(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(sources.time, "monotonic", lambda: clock[0])
+    polled = []
+
+    def fetcher(name, articles):
+        def fetch():
+            polled.append(name)
+            if articles is None:
+                raise ConnectionError(f"{name} is down")
+            return articles
+        return fetch
+
+    registry = SourceRegistry(workers=2)
+    registry.register(NewsSource("Wire", fetcher("Wire", [article("2026-10-17T10:00:00Z")]), 60, 3600))
+    registry.register(NewsSource("Blog", fetcher("Blog", []), 600, 3600))
+    registry.register(NewsSource("Broken", fetcher("Broken", None), 60, 3600))
+
+    assert registry.fetch_due() == [article("2026-10-17T10:00:00Z")]
+    assert sorted(polled) == ["Blog", "Broken", "Wire"]
+
+    # Wire stays at its minimum; Broken backs off like a quiet source; Blog is not due yet
+    clock[0] = 60
+    polled.clear()
+    assert registry.fetch_due() == [article("2026-10-17T10:00:00Z")]
+    assert polled == ["Wire"]
+    snapshot = registry.snapshot()
+    assert snapshot["Broken"]["errors"] == 1 and snapshot["Broken"]["due_in_seconds"] == 30
+    assert snapshot["Blog"]["interval_seconds"] == 900
@@ -1,12 +1,6 @@
-from flask import Flask
-import pymongo
-from config import MONGO_URI, DB_NAME
-
-# Initialize Flask App
-app = Flask(__name__)
-
-# Connect to MongoDB
-client = pymongo.MongoClient(MONGO_URI)
-db = client[DB_NAME]
-
-from app import routes  # Import routes
+"""
+The Scientific Collector. The modules in this directory import each other by
+their flat names (`from models import ...`), so run it from here: the web
+app with `python app.py` (or `gunicorn -w 4 "app:create_app()"`) and the
+ingest jobs with `python worker.py`.
+"""
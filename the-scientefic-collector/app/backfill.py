@@ -0,0 +1,53 @@
+from models import fetch_window, load_checkpoint, save_checkpoint, store_papers, merge_duplicate_papers, papers_collection
+from schema import INDEXES, RETIRED_INDEXES
+from collector_common.schema import apply_indexes, drop_retired_indexes, missing_indexes
+from datetime import date, timedelta
+import argparse
+import logging
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="🕒 %(asctime)s - 📍 %(name)s - [%(levelname)s]  %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHECKPOINT_ID = "springer-backfill"
+
+def backfill(first_day, last_day, chunk_days, pause):
+    """
+    Walks [first_day, last_day] in chunk_days windows, oldest first, storing
+    each window before moving on. Progress is checkpointed after every chunk
+    so an interrupted backfill resumes where it stopped. Sleeps `pause`
+    seconds between windows to leave API quota for the live sync.
+    """
+    day, offset = load_checkpoint(BACKFILL_CHECKPOINT_ID, first_day)
+    if day < first_day:
+        # The saved offset belongs to a window before the requested range
+        day, offset = first_day, 0
+    while day <= last_day:
+        window_end = min(day + timedelta(days=chunk_days - 1), last_day)
+        total, papers, offset = fetch_window(day, window_end, offset)
+        store_papers(papers)
+        logger.info(f"🧭 Backfilled {min(offset, total)}/{total} papers of {day} - {window_end}")
+
+        # An unfinished window (failed pages or more than one call's worth) is resumed from its offset
+        if offset >= total:
+            day, offset = window_end + timedelta(days=1), 0
+        save_checkpoint(BACKFILL_CHECKPOINT_ID, day, offset)
+        time.sleep(pause)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill historical Springer papers in date windows")
+    parser.add_argument("first_day", type=date.fromisoformat, help="First publication day, YYYY-MM-DD")
+    parser.add_argument("last_day", type=date.fromisoformat, help="Last publication day, YYYY-MM-DD")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days per query window")
+    parser.add_argument("--pause", type=float, default=30, help="Seconds to wait between windows")
+    args = parser.parse_args()
+
+    if {"doi_unique", "fallback_title_publicationDate"} & set(missing_indexes(papers_collection, INDEXES)):
+        merge_duplicate_papers(papers_collection)
+        drop_retired_indexes(papers_collection, RETIRED_INDEXES)
+    apply_indexes(papers_collection, INDEXES)
+    backfill(args.first_day, args.last_day, args.chunk_days, args.pause)
@@ -1,11 +1,14 @@
-from pymongo import MongoClient
-from datetime import datetime, timedelta
-from tenacity import retry, stop_after_attempt, wait_fixed
+from config import db
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from pathlib import Path
-import requests
 import os
 import logging
+from collector_common.cache import ResponseCache, SharedGeneration, GENERATION_COLLECTION
+from collector_common.conditional import FeedVersion
+from collector_common.ingest import bulk_upsert, merge_duplicates
+from collector_common.http_client import HttpClient
 
 logger = logging.getLogger(__name__)
 
@@ -13,97 +16,188 @@ logger = logging.getLogger(__name__)
 env_path = Path('.') / 'keys.env'
 load_dotenv(env_path)
 
-# MongoDB configuration
-MONGO_URI = os.getenv('MONGO_URI')
-client = MongoClient(MONGO_URI)
-db = client['the-scientific-collector']
 papers_collection = db['scientific-collection']
+# Checkpoints of the incremental Springer sync and of the backfill
+sync_state_collection = db['sync-state']
 
-# Retry configuration for API calls
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(10))
-def fetch_papers(days=7, max_results=100):
-    """Fetch papers from Springer API with enhanced error handling"""
-    papers = []
-    SPRINGER_API_KEY = os.getenv('SPRINGER_API_KEY')
-    
-    if not SPRINGER_API_KEY:
+PAPER_KEY_FIELDS = ["doi"]
+# Papers without a DOI are stored with doi "" and keyed on their title and date
+FALLBACK_KEY_FIELDS = ["doi", "title", "publicationDate"]
+
+# Bumped by the worker after each ingest; keys the response cache and ETags of every web process
+cache_generation = SharedGeneration(db[GENERATION_COLLECTION], "the-scientefic-collector")
+# Newest paper marker behind the feed ETags
+feed_version = FeedVersion(papers_collection, "publicationDate", cache_generation)
+response_cache = ResponseCache.from_env("the-scientefic-collector", cache_generation)
+
+SPRINGER_API_URL = "https://api.springernature.com/openaccess/json"
+# Records per Springer page ("p"); the open access API serves at most 20
+PAGE_SIZE = 20
+# Upper bound on papers pulled by one fetch_papers call
+MAX_RESULTS = 1000
+FETCH_WORKERS = 4
+# How far back the first sync reaches when there is no checkpoint yet
+INITIAL_SYNC_DAYS = 7
+SYNC_CHECKPOINT_ID = "springer"
+REQUEST_TIMEOUT = 10
+PAGE_ATTEMPTS = 3
+
+http_client = HttpClient(
+    user_agent="ScientificCollector/1.0",
+    pool_size=FETCH_WORKERS,
+    per_host_limit=FETCH_WORKERS,
+    read_timeout=REQUEST_TIMEOUT,
+    max_attempts=PAGE_ATTEMPTS
+)
+
+def parse_record(record):
+    """Maps a Springer record onto the stored paper structure"""
+    return {
+        "title": record.get("title", "Untitled"),
+        "doi": record.get("doi", ""),
+        "authors": [c["creator"] for c in record.get("creators", [])],
+        "publisherName": record.get("publisherName", ""),
+        "publicationType": record.get("publicationType", ""),
+        "publicationDate": record.get("publicationDate"),
+        "url": next((u["value"] for u in record.get("url", [])), ""),
+        "abstract": record.get("abstract", ""),
+    }
+
+def fetch_page(query, start, client=http_client):
+    """
+    Fetch one page of results starting at the 1-based offset `start`, with
+    the client's backoff on throttling and server errors.
+    Returns (total results for the query, papers on this page).
+    """
+    response = client.get(SPRINGER_API_URL, params={
+        "api_key": os.getenv('SPRINGER_API_KEY'),
+        "q": query,
+        "s": start,
+        "p": PAGE_SIZE
+    }, headers={"Accept": "application/json"})
+    response.raise_for_status()
+
+    data = response.json()
+    result = data.get("result") or [{}]
+    total = int(result[0].get("total", 0))
+    return total, [parse_record(record) for record in data.get("records", [])]
+
+def load_checkpoint(checkpoint_id, default_day):
+    """The (day, offset) a sync resumes from: results before offset on that day are already stored"""
+    checkpoint = sync_state_collection.find_one({"_id": checkpoint_id})
+    if checkpoint is None:
+        return default_day, 0
+    return date.fromisoformat(checkpoint["day"]), checkpoint.get("offset", 0)
+
+def save_checkpoint(checkpoint_id, day, offset):
+    sync_state_collection.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"day": day.isoformat(), "offset": offset, "updatedAt": datetime.now()}},
+        upsert=True
+    )
+
+def fetch_window(first_day, last_day, offset=0, max_results=MAX_RESULTS):
+    """
+    Fetch up to max_results papers published online between first_day and
+    last_day, skipping the first `offset` results. The first page gives the
+    result total; the remaining pages are downloaded concurrently, each with
+    its own retries.
+
+    Returns (total, papers, next_offset), where next_offset is the end of the
+    unbroken run of pages fetched, i.e. where the next call should resume.
+    """
+    query = f"onlinedatefrom:{first_day:%Y-%m-%d} onlinedateto:{last_day:%Y-%m-%d}"
+    total, papers = fetch_page(query, offset + 1)
+
+    wanted = min(total, offset + max_results)
+    starts = range(offset + 1 + PAGE_SIZE, wanted + 1, PAGE_SIZE)
+    logger.info(f"📚 {total} papers published {first_day} - {last_day}, fetching {len(starts) + 1} pages from offset {offset}")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = {executor.submit(fetch_page, query, start): start for start in starts}
+        for future in as_completed(futures):
+            try:
+                _, page = future.result()
+                papers.extend(page)
+            except Exception as e:
+                failed.append(futures[future])
+                logger.error(f"❌ Page at offset {futures[future]} failed after {PAGE_ATTEMPTS} attempts: {str(e)}")
+
+    if failed:
+        logger.warning(f"⚠️ {len(failed)} pages could not be fetched")
+        return total, papers, min(failed) - 1
+    return total, papers, offset + len(papers)
+
+def fetch_new_papers(max_results=MAX_RESULTS):
+    """
+    Fetch papers published since the sync checkpoint, one day at a time,
+    resuming mid-day from the stored offset. Returns (papers, checkpoint);
+    save the (day, offset) checkpoint once the papers are handed to storage.
+    """
+    today = date.today()
+    day, offset = load_checkpoint(SYNC_CHECKPOINT_ID, today - timedelta(days=INITIAL_SYNC_DAYS))
+    if not os.getenv('SPRINGER_API_KEY'):
         logger.error("🔑 Missing Springer API key")
-        return []
+        return [], (day, offset)
 
-    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-    end_date = datetime.now().strftime('%Y-%m-%d')
-    
-    try:
-        start = 1
-        while len(papers) < max_results:
-            url = (
-                f"https://api.springernature.com/openaccess/json?"
-                f"api_key={SPRINGER_API_KEY}&"
-                f"q=onlinedatefrom:{start_date} onlinedateto:{end_date}"
-            )
-            
-            response = requests.get(url, headers={
-                "User-Agent": "ScientificCollector/1.0",
-                "Accept": "application/json"
-            }, timeout=10)
-            
-            if response.status_code != 200:
-                logger.error(f"❌ API Error: {response.status_code} - {response.text}")
-
-            data = response.json()
-            if not data.get('records'):
-                return []
-
-            for record in data['records']:
-                paper = {
-                    "title": record.get("title", "Untitled"),
-                    "doi": record.get("doi", ""),
-                    "authors": [c["creator"] for c in record.get("creators", [])],
-                    "publisherName": record.get("publisherName", ""),
-                    "publicationType": record.get("publicationType", ""),
-                    "publicationDate": record.get("publicationDate"),
-                    "url": next((u["value"] for u in record.get("url", [])), ""),
-                    "abstract": record.get("abstract", ""),
-                }
-                papers.append(paper)
-            
-            start += 10
-
-        logger.info(f"✅ API fetched {len(papers)} papers successfully")
-        return papers
+    papers = []
+    while len(papers) < max_results:
+        try:
+            total, fetched, offset = fetch_window(day, day, offset, max_results - len(papers))
+        except Exception as e:
+            logger.error(f"🔥 Critical API Error: {str(e)}")
+            break
+        papers.extend(fetched)
 
-    except Exception as e:
-        logger.error(f"🔥 Critical API Error: {str(e)}")
-        return []
+        # Today keeps growing, and an unfinished day is resumed from its offset on the next run
+        if day >= today or offset < total:
+            break
+        day, offset = day + timedelta(days=1), 0
+
+    logger.info(f"✅ API fetched {len(papers)} new papers, synced through {day} offset {offset}")
+    return papers, (day, offset)
 
 def store_papers(papers):
-    """Store papers in MongoDB with duplicate checking"""
-    try:
-        if not papers:
-            logger.warning("❌ No papers found to store")
-            raise Exception("❌ No papers found to store")
-
-        logger.info("🔍 Checking for Duplicate papers before insertion...")
-        new_papers = []
-        duplicates = 0
-
-        for paper in papers:
-            if not papers_collection.find_one({"title": paper["title"], "publicationDate": paper["publicationDate"]}):
-                new_papers.append(paper)
-            else:
-                duplicates += 1
-
-        if duplicates > 0:
-            logger.warning(f"⚠️  Found {duplicates} duplicate papers")
-            logger.info(f"⏭️  Skipping {duplicates} papers...")
-        
-        if new_papers:
-            papers_collection.insert_many(new_papers)
-            logger.info(f"📚 Inserted {len(new_papers)} new papers successfully")
-            return
-        else:
-            raise Exception("❌ No unique papers found to insert")
+    """
+    Upserts papers in one unordered bulk_write keyed on DOI, the canonical
+    paper identity; papers without a DOI fall back to (title,
+    publicationDate). The first stored copy of a paper wins. Returns the
+    number inserted.
+    """
+    if not papers:
+        logger.warning("❌ No papers found to store")
+        return 0
 
+    for paper in papers:
+        # The fallback unique index only covers papers stored with doi ""
+        paper["doi"] = paper.get("doi") or ""
+    with_doi = [paper for paper in papers if paper["doi"]]
+    without_doi = [paper for paper in papers if not paper["doi"]]
+    try:
+        inserted, duplicates = bulk_upsert(papers_collection, with_doi, PAPER_KEY_FIELDS)
+        fallback_inserted, fallback_duplicates = bulk_upsert(papers_collection, without_doi, FALLBACK_KEY_FIELDS)
     except Exception as e:
         logger.error(f"🔥 Insertion Failed due to: {str(e)}")
-        raise e
+        raise
+
+    inserted += fallback_inserted
+    duplicates += fallback_duplicates
+    if duplicates > 0:
+        logger.warning(f"⚠️  Skipped {duplicates} papers already stored")
+    logger.info(f"📚 Inserted {inserted} new papers successfully")
+    return inserted
+
+def merge_duplicate_papers(collection):
+    """
+    One-off cleanup before the unique DOI and fallback indexes can be built:
+    papers stored without a DOI get doi "", then each DOI, and each DOI-less
+    (title, publicationDate), stored more than once is merged into its
+    oldest copy. Returns the number of documents removed.
+    """
+    collection.update_many({"doi": None}, {"$set": {"doi": ""}})
+    removed = merge_duplicates(collection, PAPER_KEY_FIELDS, {"doi": {"$type": "string", "$gt": ""}})
+    removed += merge_duplicates(collection, FALLBACK_KEY_FIELDS, {"doi": ""})
+    if removed:
+        logger.info(f"🧹 Merged {removed} duplicate papers into their first copy")
+    return removed
@@ -1,12 +1,22 @@
-from flask import render_template, request, jsonify
-from app import app
-from models import papers_collection
+from flask import Blueprint, render_template, request, jsonify
+from models import papers_collection, feed_version, response_cache
+from collector_common.pagination import InvalidCursor, keyset_filter, keyset_sort, next_cursor
+from schema import INDEXES
+from collector_common.conditional import conditional_get
+from collector_common.status import status_blueprint, worker_status
+from collector_common.lease import LEASE_COLLECTION
+from config import INGEST_LEASE_NAME, db
 import logging
 
 logger = logging.getLogger(__name__)
+
+bp = Blueprint("papers", __name__)
+# /health, /api/metrics/worker, /api/metrics/cache and /api/metrics/http
+status_bp = status_blueprint(papers_collection, INDEXES, db[LEASE_COLLECTION], INGEST_LEASE_NAME, response_cache)
 DEFAULT_PER_PAGE = 8
 
-@app.route('/')
+@bp.route('/')
+@response_cache.cached
 def home():
     """Main endpoint with paginated papers"""
     try:
@@ -40,7 +50,7 @@ def home():
         logger.error(f"Route error: {str(e)}")
         return render_template("error.html"), 500
 
-@app.route('/api/papers')
+@bp.route('/api/papers')
 def get_papers():
     """API endpoint for papers"""
     try:
@@ -63,59 +73,50 @@ def get_papers():
         logger.error(f"🔥 API error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint"""
-    try:
-        papers_collection.find_one()
-        return jsonify({"status": "healthy"}), 200
-    except Exception as e:
-        logger.error(f"🔴 Health check failed: {str(e)}")
-        return jsonify({"status": "unhealthy"}), 500
-
-@app.route('/api/load-more-papers')
+@bp.route('/api/load-more-papers')
+@conditional_get(feed_version)
+@response_cache.cached
 def load_more_papers():
     """API endpoint for infinite scroll loading"""
     try:
         page = max(int(request.args.get("page", 1)), 1)
         per_page = 8
         query = request.args.get("q", "").strip()
+        cursor = request.args.get("cursor")
         
-        pipeline = [
-            {"$match": {"$text": {"$search": query}}} if query else {"$match": {}},
-            {"$group": {
-                "_id": "$doi",  # group by DOI
-                "doc": {"$first": "$$ROOT"}
-            }},
-            {"$replaceRoot": {"newRoot": "$doc"}},
-            {"$sort": {"publicationDate": -1}},
-            {"$skip": (page - 1) * per_page},
-            {"$limit": per_page},
-            {"$project": {
-                "_id": 0,
-                "title": 1,
-                "doi": 1,
-                "authors": 1,
-                "publisherName": 1,
-                "publicationType": 1,
-                "publicationDate": 1,
-                "url": 1,
-                "abstract": 1
-            }}
-        ]
-        
+        # DOIs are unique at write time, so this is a plain index-backed sort and limit
+        match = keyset_filter("publicationDate", cursor)
         if query:
-            pipeline.insert(0, {"$match": {"$text": {"$search": query}}})
-            
-        papers = list(papers_collection.aggregate(pipeline))
-        
+            match["$text"] = {"$search": query}
+        papers_query = papers_collection.find(match, {
+            "title": 1,
+            "doi": 1,
+            "authors": 1,
+            "publisherName": 1,
+            "publicationType": 1,
+            "publicationDate": 1,
+            "url": 1,
+            "abstract": 1
+        }).sort(keyset_sort("publicationDate"))
+
+        # Without a cursor, fall back to offset pagination
+        if not cursor:
+            papers_query = papers_query.skip((page - 1) * per_page)
+        papers = list(papers_query.limit(per_page))
+
         next_page = page + 1 if len(papers) == per_page else None
+        cursor_after = next_cursor(papers, "publicationDate", per_page)
+        for paper in papers:
+            del paper["_id"]
         
         return jsonify({
             "papers": papers,
-            "next_page": next_page
+            "next_page": next_page,
+            "next_cursor": cursor_after
         })
         
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Load more error: {str(e)}")
         return jsonify({"error": "Failed to load papers"}), 500
@@ -0,0 +1,26 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+# Every index the papers collection relies on, applied once at startup
+INDEXES = [
+    # Canonical paper identity behind the store_papers upsert; papers without a DOI are left out
+    IndexModel(
+        [("doi", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"doi": {"$type": "string", "$gt": ""}},
+        name="doi_unique"
+    ),
+    # Upsert key for papers without a DOI, which are stored with doi ""
+    IndexModel(
+        [("doi", ASCENDING), ("title", ASCENDING), ("publicationDate", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"doi": ""},
+        name="fallback_title_publicationDate"
+    ),
+    # Keyset pagination for /api/load-more-papers
+    IndexModel([("publicationDate", DESCENDING), ("_id", DESCENDING)], name="keyset_publicationDate"),
+    # $text search in /api/papers and /api/load-more-papers
+    IndexModel([("title", TEXT), ("abstract", TEXT)], name="paper_text"),
+]
+
+# Earlier non-unique declarations of the keys above
+RETIRED_INDEXES = ["title_1_publicationDate_1"]
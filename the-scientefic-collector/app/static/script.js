@@ -3,7 +3,7 @@ document.addEventListener("DOMContentLoaded", function () {
     const searchInput = document.getElementById('search-input');
     const papersContainer = document.getElementById('papers-container');
     let isLoading = false;
-    let currentPage = 1;
+    let nextCursor = null;
     let hasMore = true;
     const seenTitles = new Set();
 
@@ -32,20 +32,20 @@ document.addEventListener("DOMContentLoaded", function () {
         };
     };
 
-    const fetchPapers = async (page, query = '') => {
+    const fetchPapers = async (cursor, query = '') => {
         try {
             isLoading = true;
             showLoadingIndicator();
-            const response = await fetch(`/api/load-more-papers?page=${page}&q=${encodeURIComponent(query)}`);
+            const response = await fetch(`/api/load-more-papers?q=${encodeURIComponent(query)}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`);
             if (!response.ok) throw new Error(response.statusText);
-            const { papers, next_page } = await response.json();
+            const { papers, next_cursor } = await response.json();
             if (papers.length === 0) {
                 hasMore = false;
                 showMessage('No more papers to load');
                 return [];
             }
-            currentPage = next_page || currentPage + 1;
-            hasMore = !!next_page;
+            nextCursor = next_cursor;
+            hasMore = !!next_cursor;
             return papers;
         } catch (error) {
             hasMore = false;
@@ -152,16 +152,16 @@ document.addEventListener("DOMContentLoaded", function () {
 
     const loadMorePapers = async () => {
         if (isLoading || !hasMore) return;
-        const papers = await fetchPapers(currentPage, searchInput.value.trim());
+        const papers = await fetchPapers(nextCursor, searchInput.value.trim());
         appendPapers(papers);
     };
 
     searchInput.addEventListener('input', debounce(async (e) => {
-        currentPage = 1;
+        nextCursor = null;
         hasMore = true;
         papersContainer.innerHTML = '';
         seenTitles.clear();
-        const papers = await fetchPapers(currentPage, e.target.value);
+        const papers = await fetchPapers(nextCursor, e.target.value);
         appendPapers(papers);
     }, 300));
 
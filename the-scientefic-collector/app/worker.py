@@ -0,0 +1,82 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from models import fetch_new_papers, save_checkpoint, store_papers, merge_duplicate_papers, feed_version, response_cache, papers_collection, http_client, SYNC_CHECKPOINT_ID
+from schema import INDEXES, RETIRED_INDEXES
+from collector_common.schema import apply_indexes, drop_retired_indexes, missing_indexes
+from collector_common.pipeline import BatchPipeline
+from collector_common.logs import configure_logging
+from collector_common.lease import MongoLease, LEASE_COLLECTION, run_exclusively
+from config import INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS, db
+from datetime import datetime
+import os
+import logging
+import signal
+import sys
+import threading
+
+FETCH_INTERVAL_MINUTES = 5
+# Seconds a stopping worker, or a sync about to checkpoint, waits for fetched batches to be stored
+DRAIN_TIMEOUT_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+def store_papers_batch(papers):
+    if store_papers(papers):
+        response_cache.bump()
+        feed_version.refresh()
+
+# Fetched batches are handed to store_papers through a bounded pipeline,
+# spooled to SQLite when SPOOL_PATH is set so a MongoDB outage loses nothing
+pipeline = BatchPipeline(store_papers_batch, spool_path=os.getenv("SPOOL_PATH"))
+
+def fetch_papers_job():
+    """Job to fetch papers from Springer API"""
+    try:
+        logger.info("🕸️  Starting paper fetch job")
+        papers, checkpoint = fetch_new_papers()
+        if not papers:
+            logger.info("📭 No new papers since the last sync")
+        elif not pipeline.put(papers, timeout=FETCH_INTERVAL_MINUTES * 60) or not pipeline.drain(DRAIN_TIMEOUT_SECONDS):
+            # Only advance the checkpoint once the papers are in MongoDB; until
+            # then the next run fetches them again
+            logger.warning("⏳ Papers not stored yet, keeping the sync checkpoint")
+            return
+        save_checkpoint(SYNC_CHECKPOINT_ID, *checkpoint)
+        logger.info(f"✅ SUCCESSFULL: fetch_papers_job Completed Successfully")
+    except Exception as e:
+        logger.error(f"❌ FAILURE: fetch_papers_job failed due to: {str(e)}")
+
+# Initialize scheduler
+scheduler = BackgroundScheduler()
+scheduler.add_job(fetch_papers_job, 'interval', minutes=FETCH_INTERVAL_MINUTES, next_run_time=datetime.now())
+
+def start():
+    if {"doi_unique", "fallback_title_publicationDate"} & set(missing_indexes(papers_collection, INDEXES)):
+        merge_duplicate_papers(papers_collection)
+        drop_retired_indexes(papers_collection, RETIRED_INDEXES)
+    apply_indexes(papers_collection, INDEXES)
+    pipeline.start()
+    scheduler.start()
+
+def stop():
+    scheduler.shutdown()
+    if not pipeline.drain(DRAIN_TIMEOUT_SECONDS):
+        logger.warning(f"⚠️  {pipeline.pending()} batches were still pending at shutdown")
+    pipeline.stop()
+
+def status():
+    """Reported with every lease renewal and served by /api/metrics/worker"""
+    return {"pending_batches": pipeline.pending(), "dead_letter_batches": pipeline.dead_lettered(), "http": http_client.stats()}
+
+if __name__ == "__main__":
+    configure_logging("scientific_worker.log")
+    logger.info("🚜 The Scientific Collector worker is starting")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    lease = MongoLease(db[LEASE_COLLECTION], INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS)
+    try:
+        lost = run_exclusively(lease, start, stop, status, stop_event)
+    except KeyboardInterrupt:
+        lost = False
+    # A non-zero exit lets the supervisor restart the worker as a standby
+    sys.exit(1 if lost else 0)
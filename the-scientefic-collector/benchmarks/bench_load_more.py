@@ -0,0 +1,86 @@
+"""
+Times /api/load-more-papers' query before and after DOI dedup moved to
+write time, on a one million paper collection: the old pipeline $groups
+every paper by DOI before sorting, the new one is a sort + limit on the
+keyset index. Both are timed for the first page and for a cursor deep
+into the feed.
+
+Needs a real mongod:
+
+    MONGO_URI=mongodb://localhost:27017/ python benchmarks/bench_load_more.py
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from pymongo import MongoClient
+from collector_common.pagination import encode_cursor, keyset_filter, keyset_sort
+from collector_common.schema import apply_indexes
+from schema import INDEXES
+
+DOCUMENTS = 1_000_000
+PER_PAGE = 8
+DEEP_PAGE = 10_000
+REPEATS = 5
+SORT_FIELD = "publicationDate"
+
+def seed(collection):
+    collection.drop()
+    start = date(2000, 1, 1)
+    batch = []
+    for i in range(DOCUMENTS):
+        batch.append({
+            "title": f"Paper {i}",
+            "doi": f"10.1000/bench.{i}",
+            "authors": ["A. Author", "B. Author"],
+            "publisherName": "Bench Publishing",
+            "publicationType": "Journal",
+            SORT_FIELD: (start + timedelta(days=i // 100)).isoformat(),
+            "url": f"https://example.com/{i}",
+            "abstract": "Lorem ipsum " * 20,
+        })
+        if len(batch) == 10_000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    apply_indexes(collection, INDEXES)
+
+def before(collection, cursor):
+    """The load-more pipeline as it was: $group by DOI over the whole collection, then sort"""
+    return list(collection.aggregate([
+        {"$match": {}},
+        {"$group": {"_id": "$doi", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$match": keyset_filter(SORT_FIELD, cursor)},
+        {"$sort": dict(keyset_sort(SORT_FIELD))},
+        {"$limit": PER_PAGE},
+    ], allowDiskUse=True))
+
+def after(collection, cursor):
+    """The load-more query now that DOIs are unique at write time"""
+    return list(collection.find(keyset_filter(SORT_FIELD, cursor)).sort(keyset_sort(SORT_FIELD)).limit(PER_PAGE))
+
+def median_ms(func, *args):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+if __name__ == "__main__":
+    collection = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))["the-scientific-collector-bench"]["load_more"]
+    if collection.estimated_document_count() != DOCUMENTS:
+        print(f"Seeding {DOCUMENTS} papers...")
+        seed(collection)
+
+    deep = list(collection.find().sort(keyset_sort(SORT_FIELD)).skip(DEEP_PAGE * PER_PAGE).limit(1))
+    cursors = {"first page": None, f"page {DEEP_PAGE}": encode_cursor(deep[0], SORT_FIELD)}
+
+    print(f"{'':>12} {'before (ms)':>12} {'after (ms)':>12}")
+    for label, cursor in cursors.items():
+        print(f"{label:>12} {median_ms(before, collection, cursor):>12.2f} {median_ms(after, collection, cursor):>12.2f}")
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+import models
+from models import PAGE_SIZE, fetch_window
+
+class FakeSpringer:
+    """Answers fetch_page for a query with `total` results, failing the pages starting at `broken`"""
+
+    def __init__(self, total, broken=()):
+        self.total = total
+        self.broken = set(broken)
+        self.starts = []
+        self.queries = set()
+
+    def __call__(self, query, start):
+        self.queries.add(query)
+        self.starts.append(start)
+        if start in self.broken:
+            raise ConnectionError("503 Service Unavailable")
+        last = min(start + PAGE_SIZE - 1, self.total)
+        return self.total, [{"doi": f"10.1000/{number}"} for number in range(start, last + 1)]
+
+@pytest.fixture
+def springer(monkeypatch):
+    def install(total, broken=()):
+        fake = FakeSpringer(total, broken)
+        monkeypatch.setattr(models, "fetch_page", fake)
+        return fake
+    return install
+
+def dois(papers):
+    return sorted(int(paper["doi"].rsplit("/", 1)[1]) for paper in papers)
+
+def test_every_page_of_the_window_is_fetched(springer):
+    fake = springer(total=75)
+    total, papers, next_offset = fetch_window(date(2026, 10, 17), date(2026, 10, 17))
+
+    assert (total, next_offset) == (75, 75)
+    assert dois(papers) == list(range(1, 76))
+    # The first page sizes the window; the rest are requested after it
+    assert fake.starts[0] == 1 and sorted(fake.starts) == [1, 21, 41, 61]
+
+def test_a_window_resumes_from_its_offset_and_stops_at_max_results(springer):
+    fake = springer(total=200)
+    total, papers, next_offset = fetch_window(date(2026, 10, 17), date(2026, 10, 17), offset=40, max_results=60)
+
+    assert (total, next_offset) == (200, 100)
+    assert dois(papers) == list(range(41, 101))
+    assert sorted(fake.starts) == [41, 61, 81]
+
+def test_a_failed_page_ends_the_window_before_it(springer):
+    springer(total=100, broken={41})
+    total, papers, next_offset = fetch_window(date(2026, 10, 17), date(2026, 10, 17))
+
+    # Pages after the gap are kept, but the next run resumes at the gap
+    assert (total, next_offset) == (100, 40)
+    assert dois(papers) == list(range(1, 41)) + list(range(61, 101))
+
+def test_the_query_covers_the_window_days(springer):
+    fake = springer(total=0)
+    assert fetch_window(date(2026, 10, 1), date(2026, 10, 7)) == (0, [], 0)
+    assert fake.queries == {"onlinedatefrom:2026-10-01 onlinedateto:2026-10-07"}
@@ -0,0 +1,79 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from collector_common.ingest import DUPLICATE_KEY_ERROR
+from collector_common.schema import apply_indexes
+from models import merge_duplicate_papers, papers_collection, store_papers
+from schema import INDEXES
+
+def paper(title, doi, day="2026-10-17", **fields):
+    return dict({"title": title, "doi": doi, "publicationDate": day, "abstract": ""}, **fields)
+
+@pytest.fixture
+def papers():
+    papers_collection.drop()
+    # mongomock drops partialFilterExpression from IndexModels, so the indexes are created one by one
+    for index in INDEXES:
+        options = dict(index.document)
+        papers_collection.create_index(list(options.pop("key").items()), **options)
+    return papers_collection
+
+def test_papers_are_keyed_on_their_doi(papers):
+    assert store_papers([paper("Deep Learning", "10.1000/1"), paper("Deep learning (preprint)", "10.1000/1"), paper("Graphs", "10.1000/2")]) == 2
+    # The first stored copy wins
+    assert papers.find_one({"doi": "10.1000/1"})["title"] == "Deep Learning"
+    assert store_papers([paper("Deep Learning, revised", "10.1000/1")]) == 0
+    assert papers.count_documents({}) == 2
+
+def test_papers_without_a_doi_fall_back_to_title_and_date(papers):
+    assert store_papers([
+        paper("Untracked", None),
+        paper("Untracked", ""),
+        paper("Untracked", "", day="2026-10-18"),
+        {"title": "Untracked", "publicationDate": "2026-10-17"},
+    ]) == 2
+    assert sorted(doc["publicationDate"] for doc in papers.find({"doi": ""})) == ["2026-10-17", "2026-10-18"]
+
+def test_an_upsert_that_loses_a_race_is_retried_as_a_duplicate(papers, monkeypatch):
+    bulk_write = papers.bulk_write
+    calls = []
+
+    def racing_bulk_write(operations, ordered=True):
+        calls.append(len(operations))
+        if len(calls) > 1:
+            return bulk_write(operations, ordered=ordered)
+        # Another worker stores the second paper between our match and our insert
+        papers.insert_one(paper("Graphs (other worker)", "10.1000/2"))
+        result = bulk_write([operations[0]], ordered=ordered)
+        raise BulkWriteError({
+            "writeErrors": [{"index": 1, "code": DUPLICATE_KEY_ERROR, "errmsg": "E11000 duplicate key error"}],
+            "nUpserted": result.upserted_count
+        })
+    monkeypatch.setattr(papers, "bulk_write", racing_bulk_write)
+
+    assert store_papers([paper("Deep Learning", "10.1000/1"), paper("Graphs", "10.1000/2")]) == 1
+    # Only the raced upsert is sent again; it now matches the other worker's paper
+    assert calls == [2, 1]
+    assert papers.find_one({"doi": "10.1000/2"})["title"] == "Graphs (other worker)"
+    assert papers.count_documents({}) == 2
+
+def test_other_write_errors_are_raised(papers, monkeypatch):
+    def failing_bulk_write(operations, ordered=True):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "Document failed validation"}], "nUpserted": 0})
+    monkeypatch.setattr(papers, "bulk_write", failing_bulk_write)
+    with pytest.raises(BulkWriteError):
+        store_papers([paper("Deep Learning", "10.1000/1")])
+
+def test_stored_duplicates_are_merged_before_the_unique_indexes():
+    papers_collection.drop()
+    papers_collection.insert_many([
+        paper("Deep Learning", "10.1000/1"),
+        paper("Deep Learning", "10.1000/1", abstract="Filled in by the later copy"),
+        paper("Untracked", None),
+        paper("Untracked", ""),
+    ])
+
+    assert merge_duplicate_papers(papers_collection) == 2
+    assert apply_indexes(papers_collection, INDEXES) == []
+    assert papers_collection.find_one({"doi": "10.1000/1"})["abstract"] == "Filled in by the later copy"
+    assert papers_collection.count_documents({"doi": ""}) == 1
@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+
+import models
+import worker
+from models import SYNC_CHECKPOINT_ID, fetch_new_papers, load_checkpoint, save_checkpoint
+
+class Today(date):
+    @classmethod
+    def today(cls):
+        return cls(2026, 10, 18)
+
+class FakeWindows:
+    """fetch_window over per-day result totals, serving at most `limit` results per call"""
+
+    def __init__(self, totals, limit=None):
+        self.totals = totals
+        self.limit = limit
+        self.calls = []
+
+    def __call__(self, first_day, last_day, offset=0, max_results=1000):
+        self.calls.append((first_day, offset))
+        total = self.totals.get(first_day, 0)
+        end = min(total, offset + max_results, offset + (self.limit or total))
+        return total, [{"doi": f"{first_day}/{n}"} for n in range(offset, end)], end
+
+@pytest.fixture
+def sync(monkeypatch):
+    models.sync_state_collection.delete_many({})
+    monkeypatch.setattr(models, "date", Today)
+    monkeypatch.setenv("SPRINGER_API_KEY", "test-key")
+    def install(totals, limit=None):
+        windows = FakeWindows(totals, limit)
+        monkeypatch.setattr(models, "fetch_window", windows)
+        return windows
+    return install
+
+def test_the_sync_walks_day_by_day_from_its_checkpoint(sync):
+    windows = sync({date(2026, 10, 16): 3, date(2026, 10, 17): 0, date(2026, 10, 18): 2})
+    save_checkpoint(SYNC_CHECKPOINT_ID, date(2026, 10, 16), 1)
+
+    papers, checkpoint = fetch_new_papers()
+    assert windows.calls == [(date(2026, 10, 16), 1), (date(2026, 10, 17), 0), (date(2026, 10, 18), 0)]
+    assert len(papers) == 4
+    # Today keeps growing, so the sync stays on it
+    assert checkpoint == (date(2026, 10, 18), 2)
+
+def test_the_first_sync_reaches_back_its_initial_days(sync):
+    windows = sync({})
+    fetch_new_papers()
+    assert windows.calls[0] == (date(2026, 10, 11), 0)
+    assert len(windows.calls) == 8
+
+def test_an_unfinished_day_is_resumed_mid_day(sync):
+    sync({date(2026, 10, 16): 50, date(2026, 10, 17): 5}, limit=20)
+    save_checkpoint(SYNC_CHECKPOINT_ID, date(2026, 10, 16), 0)
+
+    papers, checkpoint = fetch_new_papers()
+    assert len(papers) == 20
+    assert checkpoint == (date(2026, 10, 16), 20)
+
+def test_the_run_is_capped_at_max_results(sync):
+    sync({date(2026, 10, 16): 30, date(2026, 10, 17): 30})
+    save_checkpoint(SYNC_CHECKPOINT_ID, date(2026, 10, 16), 0)
+
+    papers, checkpoint = fetch_new_papers(max_results=40)
+    assert len(papers) == 40
+    assert checkpoint == (date(2026, 10, 17), 10)
+
+class FakePipeline:
+    def __init__(self, stored):
+        self.stored = stored
+        self.batches = []
+
+    def put(self, papers, timeout=None):
+        self.batches.append(papers)
+        return True
+
+    def drain(self, timeout=None):
+        return self.stored
+
+@pytest.mark.parametrize("stored", [True, False])
+def test_the_checkpoint_moves_only_once_the_papers_are_stored(sync, monkeypatch, stored):
+    sync({date(2026, 10, 16): 3})
+    save_checkpoint(SYNC_CHECKPOINT_ID, date(2026, 10, 16), 0)
+    monkeypatch.setattr(worker, "pipeline", FakePipeline(stored))
+
+    worker.fetch_papers_job()
+    expected = (date(2026, 10, 18), 0) if stored else (date(2026, 10, 16), 0)
+    assert load_checkpoint(SYNC_CHECKPOINT_ID, None) == expected
@@ -1,30 +1,228 @@
-from config import COLLECTION_NAME
-from app import db
+from config import db
 from datetime import datetime
+from functools import lru_cache
+from collector_common.ingest import bulk_upsert, merge_duplicates
+from collector_common.cache import ResponseCache, SharedGeneration, GENERATION_COLLECTION
+from collector_common.conditional import FeedVersion
+from ranking import refresh_ranking
+from sources import fetch_concurrently
+from dotenv import load_dotenv
+import logging
+import os
 
-trends_collection = db[COLLECTION_NAME]
+# Configure logger
+logger = logging.getLogger(__name__)
 
-def store_trends(source, trends):
+trends_collection = db["trend-collection"]
+SNAPSHOTS_COLLECTION = "trend-snapshots"
+snapshots_collection = db[SNAPSHOTS_COLLECTION]
+# Precomputed velocity ranking behind the hot feed, rebuilt after each fetch
+ranking_collection = db["trend-ranking"]
+
+TREND_KEY_FIELDS = ["name", "source"]
+# Refreshed on every fetch; the rest of a trend keeps the values from when it was first seen
+TREND_LIVE_FIELDS = ["tweet_volume", "lastSeen"]
+
+# Bumped by the worker after each ingest; keys the response cache and ETags of every web process
+cache_generation = SharedGeneration(db[GENERATION_COLLECTION], "the-trend-collector")
+# Most recently refreshed trend marker behind the feed ETags
+feed_version = FeedVersion(trends_collection, "lastSeen", cache_generation)
+response_cache = ResponseCache.from_env("the-trend-collector", cache_generation)
+
+# Lowercase filter values mapped onto the stored source names
+SOURCES = {"twitter": "Twitter", "reddit": "Reddit", "youtube": "YouTube"}
+
+# Load environment variables from keys.env
+load_dotenv('keys.env')
+
+# Get the API keys from the environment variables
+TWITTER_CONSUMER_KEY = os.getenv('TWITTER_CONSUMER_KEY')
+TWITTER_CONSUMER_SECRET = os.getenv('TWITTER_CONSUMER_SECRET')
+TWITTER_ACCESS_TOKEN = os.getenv('TWITTER_ACCESS_TOKEN')
+TWITTER_ACCESS_TOKEN_SECRET = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
+REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
+REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
+YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+
+# Seconds each platform gets per fetch run before it is skipped
+SOURCE_TIMEOUTS = {
+    "Twitter": int(os.getenv('TWITTER_TIMEOUT_SECONDS', 20)),
+    "Reddit": int(os.getenv('REDDIT_TIMEOUT_SECONDS', 20)),
+    "YouTube": int(os.getenv('YOUTUBE_TIMEOUT_SECONDS', 20)),
+}
+
+# Platform clients (and their SDKs) are loaded on first use, so importing
+# this module from the web app neither hits the network nor needs the SDKs
+# installed; the YouTube client in particular downloads its discovery
+# document when built.
+# Each client's socket timeout is its source's fetch timeout: fetch_concurrently
+# stops waiting for a hung source, and the timeout makes its thread give up too
+# instead of piling up behind later runs.
+@lru_cache(maxsize=None)
+def twitter_api():
+    import tweepy
+    auth = tweepy.OAuth1UserHandler(TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_TOKEN_SECRET)
+    return tweepy.API(auth, timeout=SOURCE_TIMEOUTS["Twitter"])
+
+@lru_cache(maxsize=None)
+def reddit_client():
+    import praw  # Reddit API
+    return praw.Reddit(client_id=REDDIT_CLIENT_ID,
+                       client_secret=REDDIT_CLIENT_SECRET,
+                       user_agent=REDDIT_USER_AGENT,
+                       timeout=SOURCE_TIMEOUTS["Reddit"])
+
+@lru_cache(maxsize=None)
+def youtube_client():
+    from googleapiclient.discovery import build  # YouTube API
+    import httplib2
+    return build('youtube', 'v3', developerKey=YOUTUBE_API_KEY, http=httplib2.Http(timeout=SOURCE_TIMEOUTS["YouTube"]))
+
+def fetch_twitter_trends():
+    trends = twitter_api().get_place_trends(id=1)  # WOEID 1 is for worldwide trends
+    if not trends:
+        return []
+    return [
+        {
+            "name": trend["name"],
+            "url": trend["url"],
+            "tweet_volume": trend.get("tweet_volume", "N/A"),
+            "timestamp": datetime.now(),
+            "source": "Twitter"
+        } for trend in trends[0]["trends"]
+    ]
+
+def fetch_reddit_trends():
+    subreddit = reddit_client().subreddit('all')
+    return [
+        {
+            "name": submission.title,
+            "url": submission.url,
+            "tweet_volume": submission.score,
+            "timestamp": datetime.now(),
+            "source": "Reddit"
+        } for submission in subreddit.hot(limit=10)
+    ]
+
+def fetch_youtube_trends():
+    request = youtube_client().videos().list(
+        part="snippet,contentDetails,statistics",
+        chart="mostPopular",
+        regionCode="US",
+        maxResults=10
+    )
+    response = request.execute()
+    return [
+        {
+            "name": item['snippet']['title'],
+            "url": f"https://www.youtube.com/watch?v={item['id']}",
+            "tweet_volume": item['statistics']['viewCount'],
+            "timestamp": datetime.now(),
+            "source": "YouTube"
+        } for item in response['items']
+    ]
+
+def format_trend(trend):
+    """Maps a fetched trend onto the stored document structure"""
+    return {
+        "name": trend.get("name", "N/A"),
+        "url": trend.get("url", "N/A"),
+        "tweet_volume": trend.get("tweet_volume", "N/A"),
+        "timestamp": trend.get("timestamp", datetime.now()),  # Default to now if missing
+        "lastSeen": trend.get("timestamp", datetime.now()),
+        "source": trend["source"]  # Source of the trend (e.g., Twitter, Reddit, YouTube)
+    }
+
+def trend_value(trend):
+    """The numeric popularity of a trend (tweet volume, score or views), or None"""
+    try:
+        return int(trend.get("tweet_volume"))
+    except (TypeError, ValueError):
+        return None
+
+def record_snapshots(trends):
+    """Appends one sample per trend to the time-series collection"""
+    samples = [
+        {"t": trend["lastSeen"], "meta": {"name": trend["name"], "source": trend["source"]}, "value": trend_value(trend)}
+        for trend in trends
+        if trend_value(trend) is not None
+    ]
+    if samples:
+        snapshots_collection.insert_many(samples, ordered=False)
+    return len(samples)
+
+def store_trends(trends):
     """
-    Stores scraped social media trends in MongoDB with the new data structure.
+    Stores trends merged from every source through a single bulk upsert
+    keyed on (name, source). Returns a (inserted, duplicates) tuple.
     """
-    formatted_trends = []
+    formatted_trends = [format_trend(trend) for trend in trends]
+    if not formatted_trends:
+        logger.warning("⚠️ No trends to store")
+        return 0, 0
 
-    for trend in trends:
-        data = {
-            "name": trend.get("name", "N/A"),
-            "url": trend.get("url", "N/A"),
-            "tweet_volume": trend.get("tweet_volume", "N/A"),
-            "timestamp": trend.get("timestamp", datetime.utcnow()),  # Default to now if missing
-            "source": source  # Source of the trend (e.g., Twitter, Reddit, YouTube)
-        }
-        formatted_trends.append(data)
-
-    if formatted_trends:
-        trends_collection.insert_many(formatted_trends)
-        print(f"✅ Successfully inserted {len(formatted_trends)} trends from {source} into MongoDB.")
-    else:
-        print(f"⚠ No valid trends to insert for {source}.")
+    inserted, duplicates = bulk_upsert(trends_collection, formatted_trends, TREND_KEY_FIELDS, TREND_LIVE_FIELDS)
+    logger.info(f"💾 Stored {inserted} new trends, {duplicates} already known")
+
+    try:
+        samples = record_snapshots(formatted_trends)
+        logger.info(f"📈 Recorded {samples} trend samples")
+    except Exception as e:
+        logger.error(f"❌ Failed to record trend samples: {str(e)}")
+    return inserted, duplicates
+
+def merge_duplicate_trends(collection):
+    """
+    One-off cleanup before the unique (name, source) index can be built:
+    each trend stored more than once is merged into its oldest copy.
+    Returns the number of documents removed.
+    """
+    removed = merge_duplicates(collection, TREND_KEY_FIELDS)
+    if removed:
+        logger.info(f"🧹 Merged {removed} duplicate trends into their first copy")
+    return removed
+
+def fetch_and_store_trends():
+    """
+    Fetches every platform concurrently, stores the merged trends in one bulk
+    upsert and rebuilds the velocity ranking. Returns a (inserted, refreshed)
+    tuple; callers bump the response cache when either is non-zero.
+    """
+    trends = fetch_concurrently({
+        "Twitter": fetch_twitter_trends,
+        "Reddit": fetch_reddit_trends,
+        "YouTube": fetch_youtube_trends,
+    }, SOURCE_TIMEOUTS)
+
+    inserted, refreshed = store_trends(trends)
+    # Known trends get fresh values too, so any stored trend changes what the feeds show
+    if inserted or refreshed:
+        try:
+            refresh_ranking(trends_collection, snapshots_collection, ranking_collection)
+        except Exception as e:
+            logger.error(f"❌ Failed to refresh the trend ranking: {str(e)}")
+    return inserted, refreshed
+
+def get_trend_history(trend, since, step_minutes):
+    """
+    Samples of one trend since `since`, averaged into step_minutes buckets.
+    Returns a list of {t, value, max, samples} points in time order.
+    """
+    pipeline = [
+        {"$match": {"meta.source": trend["source"], "meta.name": trend["name"], "t": {"$gte": since}}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$t", "unit": "minute", "binSize": step_minutes}},
+            "value": {"$avg": "$value"},
+            "max": {"$max": "$value"},
+            "samples": {"$sum": 1}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+    return [
+        {"t": point["_id"], "value": point["value"], "max": point["max"], "samples": point["samples"]}
+        for point in snapshots_collection.aggregate(pipeline)
+    ]
 
 def get_latest_trends(limit=50):
     """
@@ -38,3 +236,37 @@ def get_latest_trends(limit=50):
     )
 
     return latest_trends
+
+def search_trends(query="", source="", page=1, page_size=5, sort="new"):
+    """
+    Filters, counts and paginates trends server-side in one aggregation,
+    newest first, or for sort='hot' by velocity score over the ranking
+    collection, so search and source filters apply to either feed.
+    Returns a (trends, total) tuple.
+    """
+    match = {}
+    if query:
+        match["$text"] = {"$search": query}
+    if source:
+        match["source"] = SOURCES.get(source, source)
+    if sort == "hot":
+        collection, order = ranking_collection, {"score": -1, "_id": -1}
+    else:
+        collection, order = trends_collection, {"timestamp": -1}
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": order},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "trends": [
+                {"$skip": (page - 1) * page_size},
+                {"$limit": page_size},
+                {"$project": {"_id": 0}}
+            ]
+        }}
+    ]
+
+    result = next(collection.aggregate(pipeline))
+    total = result["total"][0]["count"] if result["total"] else 0
+    return result["trends"], total
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Only samples this recent feed the velocity score
+RANKING_WINDOW_HOURS = 24
+# A growth spurt loses half its weight every this many hours
+VELOCITY_HALF_LIFE_HOURS = 3
+
+def velocity_score(samples, now, half_life_hours=VELOCITY_HALF_LIFE_HOURS):
+    """
+    Decayed velocity of one series: the relative growth per hour between
+    consecutive samples, each weighted down by its age. Relative growth keeps
+    tweet volumes, Reddit scores and YouTube views comparable.
+    """
+    score = 0.0
+    for previous, current in zip(samples, samples[1:]):
+        hours = (current["t"] - previous["t"]).total_seconds() / 3600
+        if hours <= 0:
+            continue
+        growth = (current["value"] - previous["value"]) / max(previous["value"], 1) / hours
+        age = (now - current["t"]).total_seconds() / 3600
+        score += growth * 0.5 ** (age / half_life_hours)
+    return score
+
+def refresh_ranking(trends_collection, snapshots_collection, ranking_collection, now=None):
+    """
+    Scores every trend seen within the ranking window and replaces the
+    contents of ranking_collection with the result, so the hot feed is a
+    plain indexed range read. Returns the number of ranked trends.
+    """
+    now = now or datetime.now()
+    since = now - timedelta(hours=RANKING_WINDOW_HOURS)
+
+    series = {}
+    for group in snapshots_collection.aggregate([
+        {"$match": {"t": {"$gte": since}}},
+        {"$sort": {"t": 1}},
+        {"$group": {"_id": "$meta", "samples": {"$push": {"t": "$t", "value": "$value"}}}}
+    ]):
+        series[(group["_id"]["name"], group["_id"]["source"])] = group["samples"]
+
+    ranked = []
+    for trend in trends_collection.find({"lastSeen": {"$gte": since}}):
+        samples = series.get((trend["name"], trend["source"]), [])
+        ranked.append({
+            "_id": trend["_id"],
+            "name": trend["name"],
+            "url": trend["url"],
+            "tweet_volume": trend.get("tweet_volume", "N/A"),
+            "timestamp": trend["timestamp"],
+            "source": trend["source"],
+            "score": velocity_score(samples, now),
+            "computedAt": now
+        })
+
+    # Insert this run's scores, then drop the previous run's, so readers never see an empty ranking
+    if ranked:
+        ranking_collection.bulk_write([ReplaceOne({"_id": trend["_id"]}, trend, upsert=True) for trend in ranked], ordered=False)
+    ranking_collection.delete_many({"computedAt": {"$ne": now}})
+
+    logger.info(f"🔥 Ranked {len(ranked)} trends by velocity")
+    return len(ranked)
@@ -1,35 +1,153 @@
-from flask import render_template, request
-from app import app
-from app.models import get_latest_trends
+from flask import Blueprint, render_template, request, jsonify
+from bson import ObjectId
+from bson.errors import InvalidId
+# Aliased, since the /search_trends route below takes the model function's name
+from models import trends_collection, ranking_collection, feed_version, response_cache, get_trend_history, search_trends as find_trends
+from collector_common.pagination import InvalidCursor, keyset_filter, keyset_sort, next_cursor
+from schema import INDEXES
+from collector_common.conditional import conditional_get
+from collector_common.status import status_blueprint, worker_status
+from collector_common.lease import request_run, LEASE_COLLECTION
+from config import INGEST_LEASE_NAME, FETCH_JOB_ID, db
+import datetime
+import logging
 
-PAGE_SIZE = 5  # Number of trends per page
+logger = logging.getLogger(__name__)
 
-@app.route("/")
-def home():
+bp = Blueprint("trends", __name__)
+# /health, /api/metrics/worker, /api/metrics/cache
+status_bp = status_blueprint(trends_collection, INDEXES, db[LEASE_COLLECTION], INGEST_LEASE_NAME, response_cache, http_metrics=False)
+
+def feed(sort):
+    """The collection and sort field behind a feed: velocity ranked for 'hot', newest first otherwise"""
+    if sort == "hot":
+        return ranking_collection, "score"
+    return trends_collection, "timestamp"
+
+@bp.route('/')
+@response_cache.cached
+def index():
     """
-    Fetches the latest social media trends from MongoDB with pagination, search, and source filtering.
+    Trends with search and source filtering computed server-side, newest
+    first or, for sort=hot, by velocity from the ranking.
     """
     query = request.args.get("q", "").strip().lower()  # Get search query
     source = request.args.get("source", "").strip().lower()  # Get source filter
-    page = int(request.args.get("page", 1))  # Get current page, default to 1
+    page = request.args.get("page", 1, type=int)
+    sort = request.args.get("sort", "new")
+    per_page = 5
+
+    trends, total_count = find_trends(query, source, page, per_page, sort)
+    total_pages = (total_count + per_page - 1) // per_page
+
+    return render_template("index.html", trends=trends, query=query, source=source, page=page, total_pages=total_pages, sort=sort)
+
+@bp.route('/update_trends', methods=['GET'])
+def update_trends():
+    """Asks the ingest worker to fetch now; the web app itself never fetches"""
+    if not request_run(db[LEASE_COLLECTION], INGEST_LEASE_NAME, FETCH_JOB_ID):
+        logger.warning("⚠️  No worker holds the ingest lease, nothing to update trends")
+        return jsonify({"status": "error", "message": "No ingest worker is running"}), 503
+    return jsonify({"status": "accepted", "message": "Trends update requested"}), 202
+
+@bp.route('/load_latest_trends')
+@conditional_get(feed_version)
+@response_cache.cached
+def load_latest_trends():
+    latest_trends = list(trends_collection.find().sort("timestamp", -1).limit(5))
+
+    trends_data = [
+        {
+            "id": str(item["_id"]),
+            "name": item["name"],
+            "url": item["url"],
+            "tweet_volume": item.get("tweet_volume", "N/A"),
+            "timestamp": item["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+            "source": item["source"]
+        } for item in latest_trends
+    ]
+
+    return jsonify({"trends": trends_data})
+
+@bp.route('/load_more_trends')
+@conditional_get(feed_version)
+def load_more_trends():
+    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
+    per_page = 10  # Load more trends per scroll
+    collection, sort_field = feed(request.args.get("sort", "new"))
+
+    try:
+        trends_query = collection.find(keyset_filter(sort_field, cursor)).sort(keyset_sort(sort_field))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Without a cursor, fall back to offset pagination
+    if not cursor:
+        trends_query = trends_query.skip((page - 1) * per_page)
+    trends = list(trends_query.limit(per_page))
+
+    trends_data = [
+        {
+            "id": str(item["_id"]),
+            "name": item["name"],
+            "url": item["url"],
+            "tweet_volume": item.get("tweet_volume", "N/A"),
+            "timestamp": item["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+            "source": item["source"]
+        } for item in trends
+    ]
+
+    return jsonify({"trends": trends_data, "page": page, "next_cursor": next_cursor(trends, sort_field, per_page)})
 
-    all_trends = get_latest_trends(limit=50)  # Fetch up to 50 trends
-    filtered_trends = []
+@bp.route('/search_trends')
+def search_trends():
+    query = request.args.get("q", "").lower()
+    trends = list(trends_collection.find({"$text": {"$search": query}} if query else {}).limit(10))
 
-    # Filter trends based on search or source
-    for trend in all_trends:
-        name_match = query in trend["name"].lower() if query else True
-        source_match = trend["source"].lower() == source if source else True
+    trends_data = [
+        {
+            "id": str(item["_id"]),
+            "name": item["name"],
+            "url": item["url"],
+            "tweet_volume": item.get("tweet_volume", "N/A"),
+            "timestamp": item["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+            "source": item["source"]
+        } for item in trends
+    ]
 
-        if name_match and source_match:
-            filtered_trends.append(trend)
+    return jsonify({"trends": trends_data})
 
-    # Pagination logic
-    total_trends = len(filtered_trends)
-    start_idx = (page - 1) * PAGE_SIZE
-    end_idx = start_idx + PAGE_SIZE
-    paginated_trends = filtered_trends[start_idx:end_idx]
+@bp.route('/api/trends/<trend_id>/history')
+def trend_history(trend_id):
+    """Downsampled popularity series of one trend: ?hours= window, ?step= minutes per point"""
+    hours = min(max(request.args.get("hours", 48, type=int), 1), 24 * 30)
+    step = min(max(request.args.get("step", 60, type=int), 1), 24 * 60)
+    try:
+        trend = trends_collection.find_one({"_id": ObjectId(trend_id)}, {"name": 1, "source": 1})
+    except InvalidId:
+        return jsonify({"error": f"Invalid trend id: {trend_id}"}), 400
+    if trend is None:
+        return jsonify({"error": "Trend not found"}), 404
 
-    total_pages = (total_trends // PAGE_SIZE) + (1 if total_trends % PAGE_SIZE > 0 else 0)
+    since = datetime.datetime.now() - datetime.timedelta(hours=hours)
+    points = get_trend_history(trend, since, step)
+    return jsonify({
+        "id": trend_id,
+        "name": trend["name"],
+        "source": trend["source"],
+        "step_minutes": step,
+        "points": [
+            {
+                "timestamp": point["t"].strftime("%Y-%m-%d %H:%M:%S"),
+                "value": point["value"],
+                "max": point["max"],
+                "samples": point["samples"]
+            } for point in points
+        ]
+    })
 
-    return render_template("index.html", trends=paginated_trends, query=query, source=source, page=page, total_pages=total_pages)
+@bp.route('/api/metrics/sources')
+def source_metrics_endpoint():
+    """Per-platform fetch latency, item counts, errors and timeouts, as last reported by the worker"""
+    return jsonify(worker_status(db[LEASE_COLLECTION], INGEST_LEASE_NAME).get("sources", {}))
@@ -0,0 +1,62 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Raw trend samples older than this are dropped by the server
+SNAPSHOT_TTL_SECONDS = 30 * 24 * 3600
+
+# Every index the trends collection relies on, applied once at startup
+INDEXES = [
+    # Unique key behind the bulk upsert in store_trends
+    IndexModel([("name", ASCENDING), ("source", ASCENDING)], unique=True, name="dedup_name_source"),
+    # Keyset pagination for /load_more_trends
+    IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="keyset_timestamp"),
+    # Search on the home page and /search_trends
+    IndexModel([("name", TEXT)], name="name_text"),
+    # Source filtered, time sorted home page
+    IndexModel([("source", ASCENDING), ("timestamp", DESCENDING)], name="source_1_timestamp_-1"),
+    # Feed version marker, moved by every fetch
+    IndexModel([("lastSeen", DESCENDING)], name="lastSeen_-1"),
+]
+
+# Earlier non-unique declarations of the keys above
+RETIRED_INDEXES = ["name_1_source_1"]
+
+# Indexes of the precomputed ranking collection
+RANKING_INDEXES = [
+    # Keyset pagination of the hot feed
+    IndexModel([("score", DESCENDING), ("_id", DESCENDING)], name="keyset_score"),
+    # Search and source filters of the hot home page
+    IndexModel([("name", TEXT)], name="name_text"),
+    IndexModel([("source", ASCENDING), ("score", DESCENDING), ("_id", DESCENDING)], name="source_1_score_-1_id_-1"),
+]
+
+def ensure_snapshot_collection(db, name):
+    """
+    Creates the time-series collection holding one sample per trend per
+    fetch. MongoDB buckets and compresses the samples of each (name, source)
+    series itself and expires them after SNAPSHOT_TTL_SECONDS. A server that
+    cannot create time-series collections gets a regular collection with a
+    TTL index on t instead, created here rather than by the first insert,
+    which would leave samples that never expire. Any other failure raises.
+    """
+    timeseries = False
+    if name in db.list_collection_names():
+        timeseries = "timeseries" in db[name].options()
+    else:
+        try:
+            db.create_collection(
+                name,
+                timeseries={"timeField": "t", "metaField": "meta", "granularity": "minutes"},
+                expireAfterSeconds=SNAPSHOT_TTL_SECONDS
+            )
+            timeseries = True
+            logger.info(f"🗂️  Created time-series collection {name}")
+        except OperationFailure as e:
+            logger.warning(f"⚠️  Could not create time-series collection {name}, falling back to a TTL-indexed collection: {str(e)}")
+            db.create_collection(name)
+    if not timeseries:
+        db[name].create_index([("t", ASCENDING)], expireAfterSeconds=SNAPSHOT_TTL_SECONDS, name="t_ttl")
+    db[name].create_index([("meta.source", ASCENDING), ("meta.name", ASCENDING), ("t", ASCENDING)], name="series_t")
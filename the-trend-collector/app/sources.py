@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class SourceMetrics:
+    """Per-source latency, item counts and failures of the fetch fan-out"""
+
+    def __init__(self):
+        self.sources = {}
+        self.lock = threading.Lock()
+
+    def record(self, source, status, latency, count=0):
+        with self.lock:
+            stats = self.sources.setdefault(source, {
+                "runs": 0, "errors": 0, "timeouts": 0, "items": 0, "total_latency_seconds": 0.0
+            })
+            stats["runs"] += 1
+            stats["items"] += count
+            stats["total_latency_seconds"] += latency
+            if status == "error":
+                stats["errors"] += 1
+            elif status == "timeout":
+                stats["timeouts"] += 1
+            stats["last_status"] = status
+            stats["last_count"] = count
+            stats["last_latency_seconds"] = round(latency, 3)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                source: dict(
+                    stats,
+                    total_latency_seconds=round(stats["total_latency_seconds"], 3),
+                    avg_latency_seconds=round(stats["total_latency_seconds"] / stats["runs"], 3)
+                )
+                for source, stats in self.sources.items()
+            }
+
+source_metrics = SourceMetrics()
+
+def timed(fetcher):
+    """Runs fetcher, returning (items, seconds taken) or raising with the seconds attached"""
+    started = time.monotonic()
+    try:
+        items = fetcher()
+    except Exception as e:
+        e.latency = time.monotonic() - started
+        raise
+    return items, time.monotonic() - started
+
+def fetch_concurrently(fetchers, timeouts, default_timeout=30, metrics=source_metrics):
+    """
+    Runs every source's fetcher on its own thread and merges what comes back.
+    A source that fails or exceeds its timeout contributes nothing to this
+    run; it no longer holds up the others.
+    """
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="trend-source")
+    futures = {source: executor.submit(timed, fetcher) for source, fetcher in fetchers.items()}
+
+    merged = []
+    for source, future in futures.items():
+        timeout = timeouts.get(source, default_timeout)
+        try:
+            # Deadlines count from the shared start, so each source gets exactly its own timeout
+            items, latency = future.result(timeout=max(0, started + timeout - time.monotonic()))
+        except TimeoutError:
+            metrics.record(source, "timeout", timeout)
+            logger.warning(f"⏳ {source} did not answer within {timeout}s, skipping it this run")
+            continue
+        except Exception as e:
+            metrics.record(source, "error", getattr(e, "latency", 0.0))
+            logger.error(f"❌ Failed to fetch {source} trends: {str(e)}")
+            continue
+        items = items or []
+        metrics.record(source, "ok", latency, len(items))
+        logger.info(f"✅ {len(items)} {source} trends fetched in {latency:.2f}s")
+        merged.extend(items)
+
+    # Don't wait on a hung client; the platform clients' socket timeouts end its thread
+    executor.shutdown(wait=False)
+    return merged
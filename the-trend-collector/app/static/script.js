@@ -65,15 +65,21 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     });
 
-    let page = 1;
+    const feedSort = new URLSearchParams(window.location.search).get("sort") || "new";
+    let nextCursor = null;
+    let hasMore = true;
     let loading = false;
 
     async function loadMoreTrends() {
-        if (loading) return;
+        if (loading || !hasMore) return;
         loading = true;
 
-        const response = await fetch(`/load_more_trends?page=${page}`);
+        const params = new URLSearchParams({ sort: feedSort });
+        if (nextCursor) params.set("cursor", nextCursor);
+        const response = await fetch(`/load_more_trends?${params}`);
         const data = await response.json();
+        nextCursor = data.next_cursor;
+        hasMore = !!nextCursor;
 
         if (data.trends.length > 0) {
             const trendsContainer = document.getElementById("trends-container");
@@ -92,10 +98,9 @@ document.addEventListener("DOMContentLoaded", function () {
                 trendsContainer.appendChild(trendCard);
                 setTimeout(() => trendCard.style.opacity = "1", 200);
             });
-
-            page++;
-            loading = false;
         }
+
+        loading = false;
     }
 
     window.addEventListener("scroll", function () {
@@ -0,0 +1,68 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.base import JobLookupError
+from schema import ensure_snapshot_collection, INDEXES, RANKING_INDEXES, RETIRED_INDEXES
+from collector_common.schema import apply_indexes, drop_retired_indexes, missing_indexes
+from models import db, trends_collection, ranking_collection, feed_version, response_cache, fetch_and_store_trends, merge_duplicate_trends, SNAPSHOTS_COLLECTION
+from sources import source_metrics
+from collector_common.logs import configure_logging
+from collector_common.lease import MongoLease, LEASE_COLLECTION, run_exclusively
+from config import INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS, FETCH_JOB_ID
+from datetime import datetime
+import logging
+import signal
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+FETCH_INTERVAL_MINUTES = 60
+
+def fetch_trends_job():
+    try:
+        inserted, refreshed = fetch_and_store_trends()
+        if inserted or refreshed:
+            response_cache.bump()
+            feed_version.refresh()
+    except Exception as e:
+        logger.error(f"🔥 FAILURE: fetch_trends_job Failed: {str(e)}")
+
+# Scheduler
+scheduler = BackgroundScheduler()
+scheduler.add_job(fetch_trends_job, "interval", minutes=FETCH_INTERVAL_MINUTES, next_run_time=datetime.now(), id=FETCH_JOB_ID)
+
+def start():
+    if "dedup_name_source" in missing_indexes(trends_collection, INDEXES):
+        merge_duplicate_trends(trends_collection)
+        drop_retired_indexes(trends_collection, RETIRED_INDEXES)
+    apply_indexes(trends_collection, INDEXES)
+    apply_indexes(ranking_collection, RANKING_INDEXES)
+    ensure_snapshot_collection(db, SNAPSHOTS_COLLECTION)
+    scheduler.start()
+
+def stop():
+    scheduler.shutdown()
+
+def run_now(job):
+    """Runs a scheduled job right away, when the web app's update route asks for it"""
+    try:
+        scheduler.modify_job(job, next_run_time=datetime.now())
+    except JobLookupError:
+        logger.warning(f"⚠️  Ignoring a run request for unknown job {job}")
+
+def status():
+    """Reported with every lease renewal and served by /api/metrics/worker"""
+    return {"sources": source_metrics.snapshot()}
+
+if __name__ == "__main__":
+    configure_logging("trend_worker.log")
+    logger.info("🚜 The Trend Collector worker is starting")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    lease = MongoLease(db[LEASE_COLLECTION], INGEST_LEASE_NAME, WORKER_LEASE_TTL_SECONDS)
+    try:
+        lost = run_exclusively(lease, start, stop, status, stop_event, run_now)
+    except KeyboardInterrupt:
+        lost = False
+    # A non-zero exit lets the supervisor restart the worker as a standby
+    sys.exit(1 if lost else 0)
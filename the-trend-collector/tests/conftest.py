@@ -0,0 +1,46 @@
+import os
+import sys
+
+import mongomock
+import pymongo
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.normpath(os.path.join(HERE, "..", "app"))
+COMMON_DIR = os.path.normpath(os.path.join(HERE, "..", "..", "collector-common"))
+
+# The collectors' app modules share flat names (config, models, routes...),
+# so a repository-wide pytest run swaps this collector's copies in before
+# its test modules are imported and again before each of its tests runs
+FLAT_MODULES = ("app", "backfill", "config", "dedup", "models", "ranking", "rotation", "routes", "schema", "sources", "worker")
+collector_modules = {}
+
+def use_this_collector():
+    for path in (COMMON_DIR, APP_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    for name in FLAT_MODULES:
+        if name in collector_modules:
+            sys.modules[name] = collector_modules[name]
+        else:
+            sys.modules.pop(name, None)
+
+def pytest_pycollect_makemodule(module_path, parent):
+    use_this_collector()
+
+def pytest_itemcollected(item):
+    for name in FLAT_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and os.path.dirname(os.path.abspath(module.__file__)) == APP_DIR:
+            collector_modules[name] = module
+
+@pytest.fixture(autouse=True)
+def this_collector():
+    use_this_collector()
+
+# config.py builds its MongoClient at import time; every client created from
+# here on talks to the same in-memory server. The patch is started once per
+# session, since collector_common binds the first patched class it sees.
+if not pymongo.MongoClient.__module__.startswith("mongomock"):
+    mongomock.patch(servers=(("localhost", 27017),)).start()
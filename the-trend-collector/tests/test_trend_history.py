@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app import create_app
+import models
+
+EPOCH = datetime(2000, 1, 1)
+
+def date_trunc_aggregate(collection):
+    """
+    Evaluates get_trend_history's pipeline in Python: mongomock has no
+    $dateTrunc. Bins are aligned on 2000-01-01, as MongoDB aligns them.
+    """
+    def aggregate(pipeline):
+        match, group, _ = pipeline
+        step = timedelta(minutes=group["$group"]["_id"]["$dateTrunc"]["binSize"])
+        buckets = {}
+        for sample in collection.find(match["$match"]):
+            bucket = EPOCH + (sample["t"] - EPOCH) // step * step
+            buckets.setdefault(bucket, []).append(sample["value"])
+        return [
+            {"_id": bucket, "value": sum(values) / len(values), "max": max(values), "samples": len(values)}
+            for bucket, values in sorted(buckets.items())
+        ]
+    return aggregate
+
+def test_stored_trends_are_sampled_when_their_value_is_numeric():
+    models.snapshots_collection.drop()
+    models.trends_collection.drop()
+    seen = datetime(2026, 10, 18, 12)
+    models.store_trends([
+        {"name": "#python", "source": "Twitter", "tweet_volume": 1200, "timestamp": seen},
+        {"name": "Cat video", "source": "YouTube", "tweet_volume": "98765", "timestamp": seen},
+        {"name": "#quiet", "source": "Twitter", "tweet_volume": "N/A", "timestamp": seen},
+    ])
+
+    samples = list(models.snapshots_collection.find({}, {"_id": 0}).sort("value", 1))
+    assert samples == [
+        {"t": seen, "meta": {"name": "#python", "source": "Twitter"}, "value": 1200},
+        {"t": seen, "meta": {"name": "Cat video", "source": "YouTube"}, "value": 98765},
+    ]
+
+def test_history_is_averaged_into_steps_within_the_window(monkeypatch):
+    models.snapshots_collection.drop()
+    models.trends_collection.drop()
+    monkeypatch.setattr(models.snapshots_collection, "aggregate", date_trunc_aggregate(models.snapshots_collection))
+    trend_id = models.trends_collection.insert_one({"name": "#python", "source": "Twitter"}).inserted_id
+
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    meta = {"name": "#python", "source": "Twitter"}
+    models.snapshots_collection.insert_many([
+        {"t": hour + timedelta(minutes=5), "meta": meta, "value": 100},
+        {"t": hour + timedelta(minutes=35), "meta": meta, "value": 200},
+        {"t": hour + timedelta(minutes=65), "meta": meta, "value": 400},
+        # Outside the 48 hour window
+        {"t": hour - timedelta(hours=60), "meta": meta, "value": 1},
+        # Same name on another platform
+        {"t": hour + timedelta(minutes=5), "meta": {"name": "#python", "source": "Reddit"}, "value": 5},
+    ])
+
+    client = create_app(log_file=None).test_client()
+    body = client.get(f"/api/trends/{trend_id}/history", query_string={"hours": 48, "step": 60}).get_json()
+
+    assert body["step_minutes"] == 60
+    assert body["points"] == [
+        {"timestamp": f"{hour:%Y-%m-%d %H:%M:%S}", "value": 150, "max": 200, "samples": 2},
+        {"timestamp": f"{hour + timedelta(hours=1):%Y-%m-%d %H:%M:%S}", "value": 400, "max": 400, "samples": 1},
+    ]
+
+def test_history_of_an_unknown_trend():
+    client = create_app(log_file=None).test_client()
+    assert client.get(f"/api/trends/{ObjectId()}/history").status_code == 404
+    assert client.get("/api/trends/not-an-id/history").status_code == 400
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import db
+from ranking import RANKING_WINDOW_HOURS, refresh_ranking, velocity_score
+
+NOW = datetime(2026, 10, 18, 12)
+
+def series(*points):
+    """Samples from (hours ago, value) pairs"""
+    return [{"t": NOW - timedelta(hours=hours), "value": value} for hours, value in points]
+
+def test_velocity_is_relative_growth_per_hour():
+    # Doubling within the last hour
+    assert velocity_score(series((1, 100), (0, 200)), NOW) == pytest.approx(1.0)
+    # The same doubling spread over two hours is half as fast
+    assert velocity_score(series((2, 100), (0, 200)), NOW) == pytest.approx(0.5)
+    # Relative growth: a large platform's big numbers don't outrank a small one's
+    assert velocity_score(series((1, 1_000_000), (0, 2_000_000)), NOW) == pytest.approx(1.0)
+
+def test_older_growth_decays_by_half_life():
+    recent = velocity_score(series((1, 100), (0, 200)), NOW)
+    three_hours_old = velocity_score(series((4, 100), (3, 200)), NOW)
+    assert three_hours_old == pytest.approx(recent / 2)
+
+def test_declines_flat_series_and_duplicate_samples():
+    assert velocity_score(series((1, 200), (0, 100)), NOW) < 0
+    assert velocity_score(series((1, 100), (0, 100)), NOW) == 0
+    assert velocity_score(series((0, 100), (0, 500)), NOW) == 0
+    assert velocity_score(series((0, 100)), NOW) == 0
+    # Growth from zero is measured against one
+    assert velocity_score(series((1, 0), (0, 10)), NOW) == pytest.approx(10.0)
+
+def test_the_ranking_is_rebuilt_from_the_window():
+    trends, snapshots, ranking = db["ranking-trends-test"], db["ranking-snapshots-test"], db["ranking-test"]
+    for collection in (trends, snapshots, ranking):
+        collection.drop()
+
+    def add(name, source, last_seen_hours, points):
+        seen = NOW - timedelta(hours=last_seen_hours)
+        trends.insert_one({"name": name, "source": source, "url": "", "tweet_volume": points[-1][1], "timestamp": seen, "lastSeen": seen})
+        snapshots.insert_many([dict(sample, meta={"name": name, "source": source}) for sample in series(*points)])
+
+    add("#rising", "Twitter", 0, [(2, 100), (1, 150), (0, 400)])
+    add("#steady", "Twitter", 0, [(2, 100), (1, 110), (0, 120)])
+    # Same name on another platform is its own series
+    add("#rising", "Reddit", 0, [(2, 100), (0, 100)])
+    add("#gone", "YouTube", RANKING_WINDOW_HOURS + 1, [(RANKING_WINDOW_HOURS + 2, 1), (RANKING_WINDOW_HOURS + 1, 1000)])
+    # Left over from the previous refresh
+    ranking.insert_one({"name": "#stale", "source": "Twitter", "score": 99, "computedAt": NOW - timedelta(minutes=15)})
+
+    assert refresh_ranking(trends, snapshots, ranking, now=NOW) == 3
+    ranked = list(ranking.find().sort([("score", -1), ("_id", -1)]))
+    assert [(trend["name"], trend["source"]) for trend in ranked] == [("#rising", "Twitter"), ("#steady", "Twitter"), ("#rising", "Reddit")]
+    assert ranked[-1]["score"] == 0
+    assert {trend["computedAt"] for trend in ranked} == {NOW}
@@ -0,0 +1,36 @@
+from app import create_app
+import routes
+
+def test_index_searches_and_filters_server_side(monkeypatch):
+    calls = []
+
+    def find_trends(query, source, page, page_size, sort):
+        calls.append((query, source, page, page_size, sort))
+        return [{"name": "Python 3.14", "source": "Reddit", "timestamp": "2026-10-18 08:00:00", "url": ""}], 6
+
+    monkeypatch.setattr(routes, "find_trends", find_trends)
+    client = create_app(log_file=None).test_client()
+
+    response = client.get("/?q=Python&source=reddit&page=2")
+
+    assert response.status_code == 200
+    assert calls == [("python", "reddit", 2, 5, "new")]
+    assert "Python 3.14" in response.get_data(as_text=True)
+
+def test_hot_feed_reads_the_ranking_with_its_filters():
+    routes.ranking_collection.delete_many({})
+    routes.ranking_collection.insert_many([
+        {"name": "Rising", "source": "YouTube", "score": 4.2, "timestamp": "2026-10-18 08:00:00", "url": ""},
+        {"name": "Steady", "source": "Reddit", "score": 0.5, "timestamp": "2026-10-18 08:00:00", "url": ""},
+        {"name": "Climbing", "source": "Reddit", "score": 2.0, "timestamp": "2026-10-18 08:00:00", "url": ""},
+    ])
+    client = create_app(log_file=None).test_client()
+
+    response = client.get("/?sort=hot")
+    assert response.status_code == 200
+    assert "Rising" in response.get_data(as_text=True)
+
+    # The source filter narrows the ranking instead of falling back to newest first
+    page = client.get("/?sort=hot&source=reddit").get_data(as_text=True)
+    assert "Rising" not in page
+    assert page.index("Climbing") < page.index("Steady")
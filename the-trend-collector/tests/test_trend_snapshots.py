@@ -0,0 +1,45 @@
+import pytest
+from pymongo.errors import OperationFailure
+
+from config import db
+from schema import ensure_snapshot_collection, SNAPSHOT_TTL_SECONDS
+
+class WithoutTimeSeries:
+    """A database on a server that cannot create time-series collections"""
+
+    def __init__(self, db, fail_regular=False):
+        self.db = db
+        self.fail_regular = fail_regular
+
+    def __getitem__(self, name):
+        return self.db[name]
+
+    def list_collection_names(self):
+        return self.db.list_collection_names()
+
+    def create_collection(self, name, **options):
+        if "timeseries" in options or self.fail_regular:
+            raise OperationFailure("not authorized to create collections")
+        return self.db.create_collection(name)
+
+def test_snapshots_fall_back_to_a_ttl_indexed_collection():
+    db.drop_collection("snapshots-test")
+    ensure_snapshot_collection(WithoutTimeSeries(db), "snapshots-test")
+
+    indexes = db["snapshots-test"].index_information()
+    assert indexes["t_ttl"]["expireAfterSeconds"] == SNAPSHOT_TTL_SECONDS
+    assert "series_t" in indexes
+
+def test_a_regular_snapshot_collection_gets_its_ttl_index(monkeypatch):
+    # mongomock has no Collection.options(); a regular collection reports no timeseries options
+    monkeypatch.setattr(type(db["snapshots-test"]), "options", lambda self: {}, raising=False)
+    # Auto-created by an insert before the collection was set up
+    db.drop_collection("snapshots-test")
+    db["snapshots-test"].insert_one({"t": None, "meta": {"name": "#python", "source": "Twitter"}, "value": 1})
+    ensure_snapshot_collection(db, "snapshots-test")
+    assert db["snapshots-test"].index_information()["t_ttl"]["expireAfterSeconds"] == SNAPSHOT_TTL_SECONDS
+
+def test_snapshot_setup_fails_loudly():
+    db.drop_collection("snapshots-test")
+    with pytest.raises(OperationFailure):
+        ensure_snapshot_collection(WithoutTimeSeries(db, fail_regular=True), "snapshots-test")
@@ -0,0 +1,56 @@
+import threading
+import time
+from datetime import datetime
+
+import models
+from sources import SourceMetrics, fetch_concurrently
+
+def trend(name, source):
+    return {"name": name, "url": "", "tweet_volume": 10, "timestamp": datetime(2026, 10, 18, 12), "source": source}
+
+def test_failing_and_hung_sources_are_skipped_without_holding_up_the_rest():
+    metrics = SourceMetrics()
+    release = threading.Event()
+
+    def hung():
+        release.wait(5)
+        return [trend("#late", "YouTube")]
+
+    def broken():
+        raise ConnectionError("Reddit is down")
+
+    started = time.monotonic()
+    try:
+        merged = fetch_concurrently({
+            "Twitter": lambda: [trend("#python", "Twitter"), trend("#flask", "Twitter")],
+            "Reddit": broken,
+            "YouTube": hung,
+        }, {"YouTube": 0.2}, default_timeout=5, metrics=metrics)
+    finally:
+        release.set()
+
+    # Only the hung source's own timeout was waited out
+    assert time.monotonic() - started < 2
+    assert [item["name"] for item in merged] == ["#python", "#flask"]
+    stats = metrics.snapshot()
+    assert (stats["Twitter"]["last_status"], stats["Twitter"]["last_count"]) == ("ok", 2)
+    assert (stats["Reddit"]["last_status"], stats["Reddit"]["errors"]) == ("error", 1)
+    assert (stats["YouTube"]["last_status"], stats["YouTube"]["timeouts"]) == ("timeout", 1)
+
+def test_a_source_returning_nothing_counts_as_an_empty_run():
+    metrics = SourceMetrics()
+    assert fetch_concurrently({"Twitter": lambda: None}, {}, metrics=metrics) == []
+    assert metrics.snapshot()["Twitter"]["runs"] == 1
+
+def test_every_source_is_stored_in_one_upsert_despite_a_failure(monkeypatch):
+    models.trends_collection.drop()
+    monkeypatch.setattr(models, "fetch_twitter_trends", lambda: [trend("#python", "Twitter")])
+    monkeypatch.setattr(models, "fetch_reddit_trends", lambda: [trend("#python", "Reddit")])
+    monkeypatch.setattr(models, "fetch_youtube_trends", lambda: 1 / 0)
+    upserts = []
+    bulk_upsert = models.bulk_upsert
+    monkeypatch.setattr(models, "bulk_upsert", lambda *args: upserts.append(args) or bulk_upsert(*args))
+
+    assert models.fetch_and_store_trends() == (2, 0)
+    assert len(upserts) == 1
+    assert sorted(models.trends_collection.distinct("source")) == ["Reddit", "Twitter"]
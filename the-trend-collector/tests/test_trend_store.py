@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from models import merge_duplicate_trends, store_trends, trends_collection
+from collector_common.schema import apply_indexes, drop_retired_indexes
+from schema import INDEXES, RETIRED_INDEXES
+
+def test_duplicate_trends_are_merged_under_a_unique_key():
+    trends_collection.drop()
+    trends_collection.create_index([("name", 1), ("source", 1)], name="name_1_source_1")
+    trends_collection.insert_many([
+        {"name": "#python", "source": "Twitter", "url": "", "tweet_volume": 100, "timestamp": datetime(2026, 10, 17), "lastSeen": datetime(2026, 10, 17)},
+        {"name": "#python", "source": "Twitter", "url": "https://x.com/search?q=python", "tweet_volume": 150, "timestamp": datetime(2026, 10, 18), "lastSeen": datetime(2026, 10, 18)},
+        {"name": "#python", "source": "Reddit", "url": "N/A", "tweet_volume": 7, "timestamp": datetime(2026, 10, 18), "lastSeen": datetime(2026, 10, 18)},
+    ])
+
+    assert merge_duplicate_trends(trends_collection) == 1
+    drop_retired_indexes(trends_collection, RETIRED_INDEXES)
+    assert apply_indexes(trends_collection, INDEXES) == []
+    assert trends_collection.index_information()["dedup_name_source"]["unique"]
+
+    kept = trends_collection.find_one({"name": "#python", "source": "Twitter"})
+    assert kept["timestamp"] == datetime(2026, 10, 17)
+    assert kept["url"] == "https://x.com/search?q=python"
+
+    inserted, duplicates = store_trends([{"name": "#python", "source": "Twitter", "tweet_volume": 200, "timestamp": datetime(2026, 10, 18, 12)}])
+    assert (inserted, duplicates) == (0, 1)
+    assert trends_collection.count_documents({"name": "#python"}) == 2
+    assert trends_collection.find_one({"name": "#python", "source": "Twitter"})["tweet_volume"] == 200